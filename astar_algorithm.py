@@ -3,61 +3,126 @@
 # 导入必要的库
 import heapq
 import math
-import random
-from constants import GAME_X, GAME_Y, GAME_WIDTH, GAME_HEIGHT
-from utils import get_distance, is_collision_free
+import time
+from constants import ARA_INITIAL_WEIGHT, ARA_WEIGHT_STEP, ARA_TIME_BUDGET, USE_OCTILE_HEURISTIC
+from planner_config import DEFAULT_CONFIG
+from utils import get_distance, is_collision_free, add_phase_time
 
 # 游戏坐标转换为网格坐标
-def game_to_grid(pos):
+def game_to_grid(pos, config=DEFAULT_CONFIG):
     """
     将游戏区域坐标转换为网格坐标
     :param pos: 游戏区域坐标 (x, y)
+    :param config: 规划参数配置（提供网格大小和地图位置）
     :return: 网格坐标 (x, y)
     """
-    grid_size = 5  # 统一使用5x5像素的网格大小
-    grid_x = (pos[0] - GAME_X) // grid_size
-    grid_y = (pos[1] - GAME_Y) // grid_size
+    grid_x = (pos[0] - config.game_x) // config.grid_size
+    grid_y = (pos[1] - config.game_y) // config.grid_size
     return (int(grid_x), int(grid_y))
 
 # 将网格坐标转换为游戏区域坐标
-def grid_to_game(grid_pos):
+def grid_to_game(grid_pos, config=DEFAULT_CONFIG):
     """
     将网格坐标转换为游戏区域坐标
     :param grid_pos: 网格坐标 (x, y)
+    :param config: 规划参数配置（提供网格大小和地图位置）
     :return: 游戏区域坐标 (x, y)
     """
-    grid_size = 5  # 统一使用5x5像素的网格大小
-    game_x = grid_pos[0] * grid_size + GAME_X + grid_size // 2
-    game_y = grid_pos[1] * grid_size + GAME_Y + grid_size // 2
+    grid_size = config.grid_size
+    game_x = grid_pos[0] * grid_size + config.game_x + grid_size // 2
+    game_y = grid_pos[1] * grid_size + config.game_y + grid_size // 2
     return (game_x, game_y)
 
 # 检查点是否在障碍物内
-def is_in_obstacle(grid_pos, obstacles):
+def is_in_obstacle(grid_pos, obstacles, config=DEFAULT_CONFIG):
     """
     检查网格点是否在障碍物内
     :param grid_pos: 网格坐标 (x, y)
     :param obstacles: 障碍物列表，每个障碍物是一个坐标点 (x, y)
+    :param config: 规划参数配置（提供网格大小、障碍物半径和可选的栅格占据地图）
     :return: 如果在障碍物内返回 True，否则返回 False
     """
-    game_pos = grid_to_game(grid_pos)
-    OBSTACLE_RADIUS = 10  # 与原始代码保持一致的障碍物半径
+    # 栅格地图中网格覆盖的任一像素被占据时，整个网格视为障碍物
+    if config.occupancy is not None and config.occupancy.is_cell_occupied(grid_pos, config.grid_size):
+        return True
+    game_pos = grid_to_game(grid_pos, config)
+    radius = config.obstacle_radius
     for obstacle in obstacles:
-        if get_distance(game_pos, obstacle) < OBSTACLE_RADIUS:
+        if get_distance(game_pos, obstacle) < radius:
             return True
     return False
 
-# A* 算法的启发函数（使用曼哈顿距离或欧几里得距离）
-def heuristic(a, b, use_manhattan=False):
+# 获取被单个障碍物覆盖的所有网格
+def get_obstacle_cells(obstacle, grid_width, grid_height, config=DEFAULT_CONFIG):
+    """
+    获取被指定障碍物覆盖的网格（判定方式与 is_in_obstacle 完全一致）
+    :param obstacle: 障碍物坐标 (x, y)
+    :param grid_width: 网格宽度
+    :param grid_height: 网格高度
+    :param config: 规划参数配置（提供网格大小和障碍物半径）
+    :return: 被覆盖的网格坐标列表
+    """
+    center = game_to_grid(obstacle, config)
+    radius = config.obstacle_radius
+    reach = radius // config.grid_size + 1  # 只需检查障碍物附近的网格
+    cells = []
+    for gx in range(max(0, center[0] - reach), min(grid_width, center[0] + reach + 1)):
+        for gy in range(max(0, center[1] - reach), min(grid_height, center[1] + reach + 1)):
+            if get_distance(grid_to_game((gx, gy), config), obstacle) < radius:
+                cells.append((gx, gy))
+    return cells
+
+# 构建网格阻挡查找表
+def build_blocked_grid(obstacles, grid_width, grid_height, config=DEFAULT_CONFIG):
+    """
+    一次性预计算每个网格是否被障碍物占据，扩展邻居时只需 O(1) 查表；
+    使用栅格地图时不预计算，查找表在第一次访问某个网格时才从映射的地图中读取
+    :param obstacles: 障碍物列表
+    :param grid_width: 网格宽度
+    :param grid_height: 网格高度
+    :param config: 规划参数配置（提供网格大小、障碍物半径和可选的栅格占据地图）
+    :return: 长度为 grid_width * grid_height 的 bytearray（使用栅格地图时为按相同下标读写的 OccupancyCells），
+             下标为 y * grid_width + x，1 表示被占据
+    """
+    if config.occupancy is not None:
+        blocked_grid = config.occupancy.get_cell_grid(grid_width, grid_height, config.grid_size)
+    else:
+        blocked_grid = bytearray(grid_width * grid_height)
+    for obstacle in obstacles:
+        mark_obstacle(blocked_grid, obstacle, grid_width, grid_height, config)
+    return blocked_grid
+
+# 在查找表中标记新增的障碍物
+def mark_obstacle(blocked_grid, obstacle, grid_width, grid_height, config=DEFAULT_CONFIG):
+    """
+    将单个障碍物覆盖的网格标记为占据，可在绘制障碍物时增量调用
+    :param blocked_grid: build_blocked_grid 返回的查找表
+    :param obstacle: 障碍物坐标 (x, y)
+    :param grid_width: 网格宽度
+    :param grid_height: 网格高度
+    :param config: 规划参数配置（提供网格大小和障碍物半径）
+    """
+    for gx, gy in get_obstacle_cells(obstacle, grid_width, grid_height, config):
+        blocked_grid[gy * grid_width + gx] = 1
+
+# A* 算法的启发函数（使用曼哈顿距离、八方向距离或欧几里得距离）
+def heuristic(a, b, use_manhattan=False, use_octile=USE_OCTILE_HEURISTIC):
     """
     A* 算法的启发函数
     :param a: 点 a 的坐标 (x, y)
     :param b: 点 b 的坐标 (x, y)
-    :param use_manhattan: 是否使用曼哈顿距离（否则使用欧几里得距离）
+    :param use_manhattan: 是否使用曼哈顿距离
+    :param use_octile: 是否使用八方向（octile）距离，否则使用欧几里得距离
     :return: 估计距离值
     """
     if use_manhattan:
         # 曼哈顿距离
         return abs(a[0] - b[0]) + abs(a[1] - b[1])
+    elif use_octile:
+        # 八方向距离：与直线代价1、对角线代价√2完全一致，是无障碍时的精确距离
+        dx = abs(a[0] - b[0])
+        dy = abs(a[1] - b[1])
+        return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
     else:
         # 欧几里得距离（实际距离的估计）
         return ((a[0] - b[0])**2 + (a[1] - b[1])**2)**0.5
@@ -86,7 +151,8 @@ def get_neighbors(node, grid_width, grid_height):
     return neighbors
 
 # A* 算法主函数
-def a_star_step(open_set, closed_set, came_from, g_score, f_score, start_grid, end_grid, obstacles, grid_width, grid_height):
+def a_star_step(open_set, closed_set, came_from, g_score, f_score, start_grid, end_grid, obstacles, grid_width, grid_height,
+                blocked_grid=None, stats=None, changes=None, config=DEFAULT_CONFIG):
     """
     执行单步 A* 算法
     :param open_set: 开放列表（优先队列）
@@ -99,13 +165,26 @@ def a_star_step(open_set, closed_set, came_from, g_score, f_score, start_grid, e
     :param obstacles: 障碍物列表
     :param grid_width: 网格宽度
     :param grid_height: 网格高度
+    :param blocked_grid: 可选的网格阻挡查找表（build_blocked_grid），提供时不再逐个扫描障碍物
+    :param stats: 可选的统计字典，累加 pop、expand 两个阶段的耗时和调用次数以及
+                  'expanded_nodes'、'heap_pushes'、'collision_checks'；为 None 时不做任何统计
+    :param changes: 可选的列表，按发生顺序追加节点状态变化 ('open', 节点) 或 ('closed', 节点)，用于增量绘制
+    :param config: 规划参数配置（没有阻挡查找表时用于逐个扫描障碍物）
     :return: (is_path_found, current) 是否找到路径及当前处理的节点
     """
     if not open_set:
         return False, None  # 开放列表为空，无解
     
+    if stats is not None:
+        phase_start = time.perf_counter()
     # 获取 f 得分最低的节点
     _, _, current = heapq.heappop(open_set)
+    if stats is not None:
+        now = time.perf_counter()
+        add_phase_time(stats, 'pop', now - phase_start)
+        phase_start = now
+        pushes = 0
+        checks = 0
     
     # 如果到达终点，返回成功
     if current == end_grid:
@@ -113,6 +192,8 @@ def a_star_step(open_set, closed_set, came_from, g_score, f_score, start_grid, e
     
     # 将当前节点加入关闭列表
     closed_set.add(current)
+    if changes is not None:
+        changes.append(('closed', current))
     
     # 检查所有相邻节点
     for neighbor in get_neighbors(current, grid_width, grid_height):
@@ -121,7 +202,12 @@ def a_star_step(open_set, closed_set, came_from, g_score, f_score, start_grid, e
             continue
         
         # 检查相邻节点是否在障碍物内，跳过
-        if is_in_obstacle(neighbor, obstacles):
+        if stats is not None:
+            checks += 1
+        if blocked_grid is not None:
+            if blocked_grid[neighbor[1] * grid_width + neighbor[0]]:
+                continue
+        elif is_in_obstacle(neighbor, obstacles, config):
             continue
         
         # 计算从起点经过当前节点到达相邻节点的成本
@@ -137,9 +223,18 @@ def a_star_step(open_set, closed_set, came_from, g_score, f_score, start_grid, e
             # 更新 g 得分和 f 得分
             g_score[neighbor] = tentative_g_score
             f_score[neighbor] = g_score[neighbor] + heuristic(neighbor, end_grid)
-            # 将相邻节点加入开放列表（如果尚未加入）
-            heapq.heappush(open_set, (f_score[neighbor], random.random(), neighbor))
+            # 将相邻节点加入开放列表，f 相同时优先扩展 g 较大（更深）的节点，保证结果可复现
+            heapq.heappush(open_set, (f_score[neighbor], -tentative_g_score, neighbor))
+            if changes is not None:
+                changes.append(('open', neighbor))
+            if stats is not None:
+                pushes += 1
     
+    if stats is not None:
+        add_phase_time(stats, 'expand', time.perf_counter() - phase_start)
+        stats['expanded_nodes'] = stats.get('expanded_nodes', 0) + 1
+        stats['heap_pushes'] = stats.get('heap_pushes', 0) + pushes
+        stats['collision_checks'] = stats.get('collision_checks', 0) + checks
     return False, current
 
 # 从终点回溯路径
@@ -163,10 +258,11 @@ def reconstruct_path(came_from, start_grid, end_grid):
     return path
 
 # 计算路径长度（转换为游戏坐标的实际距离）
-def calculate_path_length(path):
+def calculate_path_length(path, config=DEFAULT_CONFIG):
     """
     计算路径的实际长度（转换为游戏坐标）
     :param path: 路径节点列表（网格坐标）
+    :param config: 规划参数配置（提供网格大小）
     :return: 路径实际长度
     """
     if not path or len(path) <= 1:
@@ -175,9 +271,345 @@ def calculate_path_length(path):
     length = 0
     for i in range(len(path) - 1):
         # 转换为游戏坐标计算实际距离
-        p1 = grid_to_game(path[i])
-        p2 = grid_to_game(path[i + 1])
+        p1 = grid_to_game(path[i], config)
+        p2 = grid_to_game(path[i + 1], config)
         length += get_distance(p1, p2)
         
     return length
-    return path
\ No newline at end of file
+    return path
+
+# ARA*（Anytime Repairing A*）算法
+class ARAStarSearch:
+    """
+    随时可用的加权 A* 搜索：先用膨胀的启发式快速得到一个解，
+    然后逐步减小膨胀系数并复用已有的搜索结果得到更优的解，直到时间预算耗尽
+    """
+
+    def __init__(self, start_grid, end_grid, obstacles, grid_width, grid_height,
+                 initial_weight=ARA_INITIAL_WEIGHT, weight_step=ARA_WEIGHT_STEP, time_budget=ARA_TIME_BUDGET,
+                 config=DEFAULT_CONFIG):
+        """
+        初始化 ARA* 搜索
+        :param start_grid: 起点网格坐标
+        :param end_grid: 终点网格坐标
+        :param obstacles: 障碍物列表
+        :param grid_width: 网格宽度
+        :param grid_height: 网格高度
+        :param initial_weight: 初始启发式膨胀系数（>= 1）
+        :param weight_step: 每轮迭代后膨胀系数的减小量
+        :param time_budget: 搜索的时间预算（秒），只统计搜索本身消耗的时间
+        :param config: 规划参数配置（提供网格大小和障碍物半径）
+        """
+        self.start_grid = start_grid
+        self.end_grid = end_grid
+        self.obstacles = obstacles
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.weight = max(1.0, initial_weight)
+        self.weight_step = weight_step
+        self.time_budget = time_budget
+        self.config = config
+        # 预计算网格阻挡查找表
+        self.blocked_grid = build_blocked_grid(obstacles, grid_width, grid_height, config)
+        # 搜索状态在各轮迭代之间保留
+        self.g_score = {start_grid: 0}
+        self.came_from = {}
+        self.open_set = []          # 优先队列，元素为 (f, -g, 节点)
+        self.open_f = {}            # 节点在开放列表中的有效 f 值（惰性删除）
+        self.closed_set = set()
+        self.incons = set()         # 本轮中已关闭但代价又降低的不一致节点
+        # 已消耗的搜索时间与扩展节点数
+        self.elapsed_time = 0.0
+        self.expanded_nodes = 0
+        # 每轮得到的解：路径、长度、膨胀系数、次优上界和时间戳
+        self.solutions = []
+        self.done = False
+        self._push(start_grid)
+
+    def _fvalue(self, node):
+        """
+        计算节点的加权 f 值：g + weight * h
+        :param node: 网格坐标 (x, y)
+        :return: 加权 f 值
+        """
+        return self.g_score[node] + self.weight * heuristic(node, self.end_grid)
+
+    def _push(self, node):
+        """
+        将节点按当前膨胀系数加入开放列表
+        :param node: 网格坐标 (x, y)
+        """
+        f = self._fvalue(node)
+        self.open_f[node] = f
+        heapq.heappush(self.open_set, (f, -self.g_score[node], node))
+
+    def _improve_path(self, deadline):
+        """
+        在当前膨胀系数下扩展节点，直到终点的代价不大于开放列表中的最小 f 值
+        :param deadline: 截止时间（time.perf_counter 时间）
+        :return: 本轮是否完成（False 表示因截止时间而中断）
+        """
+        goal_g = self.g_score.get(self.end_grid, float('inf'))
+        while self.open_set:
+            f, _, current = self.open_set[0]
+            # 跳过已失效的队列条目
+            if self.open_f.get(current) != f:
+                heapq.heappop(self.open_set)
+                continue
+            if goal_g <= f:
+                return True
+            # 每扩展一批节点检查一次截止时间
+            if self.expanded_nodes % 64 == 0 and time.perf_counter() >= deadline:
+                return False
+            heapq.heappop(self.open_set)
+            del self.open_f[current]
+            self.closed_set.add(current)
+            self.expanded_nodes += 1
+
+            for neighbor in get_neighbors(current, self.grid_width, self.grid_height):
+                if self.blocked_grid[neighbor[1] * self.grid_width + neighbor[0]]:
+                    continue
+                diagonal = abs(neighbor[0] - current[0]) == 1 and abs(neighbor[1] - current[1]) == 1
+                move_cost = math.sqrt(2) if diagonal else 1
+                tentative_g_score = self.g_score[current] + move_cost
+                if tentative_g_score < self.g_score.get(neighbor, float('inf')):
+                    self.came_from[neighbor] = current
+                    self.g_score[neighbor] = tentative_g_score
+                    if neighbor in self.closed_set:
+                        # 本轮已关闭的节点不再重新扩展，留到下一轮处理
+                        self.incons.add(neighbor)
+                    else:
+                        self._push(neighbor)
+            goal_g = self.g_score.get(self.end_grid, float('inf'))
+        return True
+
+    def _suboptimality_bound(self):
+        """
+        计算当前解的次优上界：g(goal) / min(g + h)，取值不超过当前膨胀系数
+        :return: 次优上界
+        """
+        lower_bound = float('inf')
+        for node in list(self.open_f) + list(self.incons):
+            lower_bound = min(lower_bound, self.g_score[node] + heuristic(node, self.end_grid))
+        if lower_bound == float('inf'):
+            return 1.0
+        return max(1.0, min(self.weight, self.g_score[self.end_grid] / lower_bound))
+
+    def _next_iteration(self, bound):
+        """
+        减小膨胀系数，将不一致节点并入开放列表并按新的 f 值重建优先队列
+        :param bound: 当前解的次优上界，新的膨胀系数不会大于该值
+        """
+        self.weight = max(1.0, min(self.weight - self.weight_step, bound))
+        nodes = set(self.open_f) | self.incons
+        self.open_set = []
+        self.open_f = {}
+        self.incons = set()
+        self.closed_set = set()
+        for node in nodes:
+            self._push(node)
+
+    def run(self, time_slice=None):
+        """
+        继续搜索，直到时间片或总时间预算用完
+        :param time_slice: 本次调用最多使用的时间（秒），None 表示使用剩余的全部预算
+        :return: 本次调用中新得到的解列表
+        """
+        if self.done:
+            return []
+        slice_start = time.perf_counter()
+        remaining = self.time_budget - self.elapsed_time
+        limit = remaining if time_slice is None else min(remaining, time_slice)
+        deadline = slice_start + limit
+        new_solutions = []
+
+        while not self.done:
+            if not self._improve_path(deadline):
+                break
+            if self.g_score.get(self.end_grid, float('inf')) == float('inf'):
+                # 开放列表已耗尽仍未到达终点，无解
+                self.done = True
+                break
+            bound = self._suboptimality_bound()
+            previous = self.best_solution()
+            # 只有代价降低或次优上界收紧时才发布新的解
+            if (previous is None or self.g_score[self.end_grid] < previous['cost'] or
+                    bound < previous['bound']):
+                path = reconstruct_path(self.came_from, self.start_grid, self.end_grid)
+                solution = {
+                    'path': path,
+                    'cost': self.g_score[self.end_grid],
+                    'path_length': calculate_path_length(path, self.config),
+                    'weight': self.weight,
+                    'bound': bound,
+                    'time': self.elapsed_time + time.perf_counter() - slice_start
+                }
+                self.solutions.append(solution)
+                new_solutions.append(solution)
+            if self.weight <= 1.0 or bound <= 1.0:
+                # 已证明当前解为最优解
+                self.done = True
+                break
+            self._next_iteration(bound)
+
+        self.elapsed_time += time.perf_counter() - slice_start
+        if self.elapsed_time >= self.time_budget:
+            self.done = True
+        return new_solutions
+
+    def best_solution(self):
+        """
+        获取目前为止最好的解
+        :return: 最后一轮的解，若尚无解返回 None
+        """
+        return self.solutions[-1] if self.solutions else None
+
+# 双向 A* 算法
+class BidirectionalAStarSearch:
+    """
+    双向 A* 搜索：同时从起点和终点扩展，两侧搜索相遇后在满足终止条件时返回最短路径
+    """
+
+    def __init__(self, start_grid, end_grid, obstacles, grid_width, grid_height, config=DEFAULT_CONFIG):
+        """
+        初始化双向 A* 搜索
+        :param start_grid: 起点网格坐标
+        :param end_grid: 终点网格坐标
+        :param obstacles: 障碍物列表
+        :param grid_width: 网格宽度
+        :param grid_height: 网格高度
+        :param config: 规划参数配置（提供网格大小和障碍物半径）
+        """
+        self.start_grid = start_grid
+        self.end_grid = end_grid
+        self.obstacles = obstacles
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        # 预计算网格阻挡查找表
+        self.blocked_grid = build_blocked_grid(obstacles, grid_width, grid_height, config)
+        # 正向搜索朝终点扩展，反向搜索朝起点扩展
+        self.forward = self._init_direction(start_grid, end_grid)
+        self.backward = self._init_direction(end_grid, start_grid)
+        # 目前找到的最短路径代价及两侧搜索的相遇节点
+        self.best_cost = float('inf')
+        self.meeting_node = None
+        self.done = False
+        # 终点本身在障碍物内时正向 A* 永远无法到达，直接判定无解
+        if start_grid != end_grid and self.blocked_grid[end_grid[1] * grid_width + end_grid[0]]:
+            self.done = True
+        elif start_grid == end_grid:
+            self.best_cost = 0
+            self.meeting_node = start_grid
+            self.done = True
+
+    def _init_direction(self, source, target):
+        """
+        创建单个方向的搜索状态
+        :param source: 该方向的出发节点
+        :param target: 该方向的目标节点（用于启发函数）
+        :return: 搜索状态字典
+        """
+        h = heuristic(source, target)
+        return {
+            'open_set': [(h, 0, source)],
+            'closed_set': set(),
+            'came_from': {},
+            'g_score': {source: 0},
+            'target': target,
+            'expanded_nodes': 0
+        }
+
+    def _top_f(self, direction):
+        """
+        清理开放列表顶部已关闭的节点，并返回最小 f 值
+        :param direction: 搜索状态字典
+        :return: 最小 f 值，开放列表为空时返回无穷大
+        """
+        open_set = direction['open_set']
+        while open_set and open_set[0][2] in direction['closed_set']:
+            heapq.heappop(open_set)
+        return open_set[0][0] if open_set else float('inf')
+
+    def step(self, changes=None):
+        """
+        执行单步双向 A*：选择开放列表较小的一侧扩展一个节点
+        :param changes: 可选的列表，按发生顺序追加节点状态变化 ('open', 节点) 或 ('closed', 节点)，用于增量绘制
+        :return: (is_done, is_path_found) 搜索是否结束及是否找到路径
+        """
+        if self.done:
+            return True, self.meeting_node is not None
+
+        top_forward = self._top_f(self.forward)
+        top_backward = self._top_f(self.backward)
+        # 终止条件：任何未找到的路径代价都不小于 max(两侧最小 f 值)，
+        # 因此当前最优代价不大于该下界时即为最短路径
+        if self.best_cost <= max(top_forward, top_backward):
+            self.done = True
+            return True, self.meeting_node is not None
+
+        if len(self.forward['open_set']) <= len(self.backward['open_set']):
+            this_side, other_side = self.forward, self.backward
+        else:
+            this_side, other_side = self.backward, self.forward
+
+        _, _, current = heapq.heappop(this_side['open_set'])
+        this_side['closed_set'].add(current)
+        this_side['expanded_nodes'] += 1
+        if changes is not None:
+            changes.append(('closed', current))
+
+        for neighbor in get_neighbors(current, self.grid_width, self.grid_height):
+            if neighbor in this_side['closed_set']:
+                continue
+            # 反向搜索允许到达起点本身，其余节点与正向搜索一样不能在障碍物内
+            if self.blocked_grid[neighbor[1] * self.grid_width + neighbor[0]] and neighbor != self.start_grid:
+                continue
+            diagonal = abs(neighbor[0] - current[0]) == 1 and abs(neighbor[1] - current[1]) == 1
+            move_cost = math.sqrt(2) if diagonal else 1
+            tentative_g_score = this_side['g_score'][current] + move_cost
+            if tentative_g_score < this_side['g_score'].get(neighbor, float('inf')):
+                this_side['came_from'][neighbor] = current
+                this_side['g_score'][neighbor] = tentative_g_score
+                f = tentative_g_score + heuristic(neighbor, this_side['target'])
+                heapq.heappush(this_side['open_set'], (f, -tentative_g_score, neighbor))
+                # 已被另一侧关闭的节点仍按关闭列表绘制
+                if changes is not None and neighbor not in other_side['closed_set']:
+                    changes.append(('open', neighbor))
+                # 如果另一侧已到达该节点，则更新最短路径代价
+                if neighbor in other_side['g_score']:
+                    total = tentative_g_score + other_side['g_score'][neighbor]
+                    if total < self.best_cost:
+                        self.best_cost = total
+                        self.meeting_node = neighbor
+
+        return False, False
+
+    def get_path(self):
+        """
+        拼接两侧搜索得到的路径
+        :return: 路径节点列表（网格坐标），不存在路径时返回 None
+        """
+        if self.meeting_node is None:
+            return None
+        path = reconstruct_path(self.forward['came_from'], self.start_grid, self.meeting_node)
+        if path is None:
+            return None
+        current = self.meeting_node
+        while current != self.end_grid:
+            current = self.backward['came_from'][current]
+            path.append(current)
+        return path
+
+    def get_open_set(self):
+        """
+        获取两侧的开放列表（用于可视化）
+        :return: 开放列表元素列表
+        """
+        return self.forward['open_set'] + self.backward['open_set']
+
+    def get_closed_set(self):
+        """
+        获取两侧的关闭列表（用于可视化）
+        :return: 关闭列表节点集合
+        """
+        return self.forward['closed_set'] | self.backward['closed_set']
\ No newline at end of file
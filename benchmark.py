@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+
+# 批量性能测试：把（场景 × 算法 × 随机种子）任务分发到进程池中无界面运行，
+# 每个任务有计算时间和内存上限，最后把所有结果汇总成一张表
+
+# 导入必要的库
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import signal
+import statistics
+import sys
+import time
+from constants import (
+    BENCHMARK_TIME_LIMIT, BENCHMARK_TIMEOUT_MARGIN, BENCHMARK_MEMORY_LIMIT_MB, BENCHMARK_RESULTS_FILE, SCENARIO_DIR,
+    RESULTS_DB_FILE
+)
+from planning_engine import plan, PLANNERS
+from planner_config import PlannerConfig, DEFAULT_CONFIG
+from results_db import ResultsDatabase
+from scenario_utils import load_scenario, list_scenarios, fit_scenario_to_config
+
+# resource 模块只在类 Unix 系统上可用，其他系统不限制内存
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# 汇总结果表的列
+RESULT_FIELDS = [
+    'scenario', 'kind', 'scenario_hash', 'algorithm', 'config', 'seed', 'deterministic', 'status', 'success',
+    'path_length', 'cost', 'initial_path_length', 'initial_path_time', 'time_taken', 'post_process_time', 'wall_time', 'iterations', 'expanded_nodes',
+    'raw_points_count', 'optimized_points_count', 'error'
+]
+
+# 收敛曲线表的列（与 planning_engine 中 trace 的列相同）
+TRACE_FIELDS = ['time', 'iteration', 'tree_size', 'cost']
+
+class JobTimeout(BaseException):
+    """
+    测试任务超出强制时间上限。继承 BaseException 而不是 Exception：
+    SIGALRM 几乎总是在 is_collision_free 等带有 except Exception 保护的函数内部触发，
+    继承 Exception 会被这些函数吞掉，而 setitimer 只触发一次，任务就再也没有时间上限
+    """
+    pass
+
+def _raise_timeout(signum, frame):
+    raise JobTimeout()
+
+def init_worker(memory_limit_mb):
+    """
+    进程池工作进程的初始化函数：设置进程的内存上限。
+    限制的是数据段（RLIMIT_DATA，堆和私有可写映射，包括栅格地图的网格状态表），
+    而不是整个地址空间（RLIMIT_AS），否则以只读内存映射方式打开的大型栅格地图文件
+    会按文件大小计入上限而无法加载；共享映射不计入 RLIMIT_DATA
+    :param memory_limit_mb: 内存上限（MB），None 或 0 表示不限制
+    """
+    if resource is not None and memory_limit_mb:
+        limit = int(memory_limit_mb * 1024 * 1024)
+        try:
+            resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+        except (ValueError, OSError) as e:
+            print(f"设置内存上限失败: {e}")
+
+def run_job(job):
+    """
+    运行单个测试任务（在工作进程中执行）
+    :param job: 任务字典，包含 'scenario_file'、'algorithm'、'seed'、'time_limit'、'deterministic'、'instrument'、
+                'config'（PlannerConfig）和 'config_label'（参数扫描时修改的参数）
+    :return: 结果字典（RESULT_FIELDS 中的列，启用统计时还包含各阶段的耗时和计数）
+    """
+    row = {field: None for field in RESULT_FIELDS}
+    row.update({
+        'scenario': os.path.basename(job['scenario_file']),
+        'algorithm': job['algorithm'],
+        'config': job['config_label'],
+        'seed': job['seed'],
+        'deterministic': job['deterministic'],
+        'success': False
+    })
+    # 支持 SIGALRM 的系统上，超出计算时间预算一定时间后强制终止任务
+    use_alarm = hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+    try:
+        try:
+            scenario = load_scenario(job['scenario_file'])
+            row['kind'] = scenario['kind']
+            # 参数扫描改变障碍物半径时，生成的场景按新的半径重新生成（不计入计算时间）
+            scenario = fit_scenario_to_config(scenario, job['config'])
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, job['time_limit'] + BENCHMARK_TIMEOUT_MARGIN)
+            result = plan(scenario, job['algorithm'], budget=job['time_limit'], seed=job['seed'],
+                          deterministic=job['deterministic'], instrument=job['instrument'],
+                          config=job['config'].for_scenario(scenario))
+            for field in RESULT_FIELDS:
+                if field in result:
+                    row[field] = result[field]
+            row.update(result['counters'])
+            row['trace'] = result['trace']
+            row['params'] = dict(result['params'], time_limit=job['time_limit'])
+            row['status'] = 'ok' if result['success'] else 'failed'
+        except MemoryError:
+            row['status'] = 'memory'
+        except Exception as e:
+            row['status'] = 'error'
+            row['error'] = str(e)
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except JobTimeout:
+        # 在外层捕获：在异常处理或取消定时器之前到时也不会让异常逃出工作进程
+        row['status'] = 'timeout'
+    return row
+
+def check_job_timeout(alarm=0.05, duration=1.0):
+    """
+    回归检查：在 is_collision_free 内部触发强制超时，确认超时异常没有被其中的 except Exception 吞掉
+    :param alarm: 定时器时间（秒）
+    :param duration: 不超时时循环调用 is_collision_free 的时间（秒）
+    :return: 超时异常在定时器到时后多久被捕获（秒），没有捕获时返回 None
+    """
+    # 延迟导入，只有运行检查时才需要
+    from utils import is_collision_free
+    obstacles = [(DEFAULT_CONFIG.game_x + x, DEFAULT_CONFIG.game_y + DEFAULT_CONFIG.game_height / 2)
+                 for x in range(0, DEFAULT_CONFIG.game_width, 5)]
+    p1 = (DEFAULT_CONFIG.game_x + 1, DEFAULT_CONFIG.game_y + 1)
+    p2 = (DEFAULT_CONFIG.game_x + DEFAULT_CONFIG.game_width - 1, DEFAULT_CONFIG.game_y + 1)
+    old_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    start = time.perf_counter()
+    try:
+        signal.setitimer(signal.ITIMER_REAL, alarm)
+        while time.perf_counter() - start < duration:
+            is_collision_free(p1, p2, obstacles)
+        return None
+    except JobTimeout:
+        return time.perf_counter() - start - alarm
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old_handler)
+
+def parse_param_sweep(items, base=DEFAULT_CONFIG):
+    """
+    解析参数扫描设置，生成所有参数组合的配置
+    :param items: 字符串列表，每项形如 'step_size=10,20'（逗号分隔多个取值）
+    :param base: 未修改的参数使用的配置
+    :return: (参数说明, PlannerConfig) 列表；没有设置时只包含缺省配置，说明为空字符串
+    """
+    names = []
+    value_lists = []
+    for item in items or ():
+        name, _, values = item.partition('=')
+        if name not in PlannerConfig.FIELDS or not values:
+            raise ValueError(f"无效的参数设置: {item}（可用参数: {', '.join(PlannerConfig.FIELDS)}）")
+        names.append(name)
+        value_lists.append([float(value) if '.' in value else int(value) for value in values.split(',')])
+    configs = []
+    for values in itertools.product(*value_lists):
+        label = ','.join(f"{name}={value}" for name, value in zip(names, values))
+        configs.append((label, base.replace(**dict(zip(names, values)))))
+    return configs
+
+def build_jobs(scenario_files, algorithms, seeds, time_limit, deterministic=False, instrument=False, configs=None):
+    """
+    生成（场景 × 算法 × 参数组合 × 随机种子）任务列表
+    :param scenario_files: 场景文件列表
+    :param algorithms: 算法名称列表
+    :param seeds: 随机种子列表
+    :param time_limit: 每个任务的计算时间预算（秒）
+    :param deterministic: 是否使用可复现模式（结果只由种子决定）
+    :param instrument: 是否统计 A* 和 RRT* 内部各阶段的耗时和计数
+    :param configs: parse_param_sweep 返回的 (参数说明, PlannerConfig) 列表，None 表示只使用缺省配置
+    :return: 任务字典列表
+    """
+    jobs = []
+    for scenario_file in scenario_files:
+        for algorithm in algorithms:
+            for label, config in configs or [('', DEFAULT_CONFIG)]:
+                for seed in seeds:
+                    jobs.append({'scenario_file': scenario_file, 'algorithm': algorithm, 'seed': seed,
+                                 'time_limit': time_limit, 'deterministic': deterministic, 'instrument': instrument,
+                                 'config': config, 'config_label': label})
+    return jobs
+
+def run_benchmark(jobs, workers=None, memory_limit_mb=BENCHMARK_MEMORY_LIMIT_MB):
+    """
+    使用进程池运行所有任务
+    :param jobs: 任务字典列表
+    :param workers: 工作进程数量，None 表示使用全部 CPU 核心
+    :param memory_limit_mb: 每个工作进程的内存上限（MB）
+    :return: 结果字典列表（按场景、算法、种子排序）
+    """
+    rows = []
+    # 每个工作进程只运行一个任务，避免超时或内存超限的任务影响后续任务
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(memory_limit_mb,),
+                              maxtasksperchild=1) as pool:
+        for row in pool.imap_unordered(run_job, jobs):
+            rows.append(row)
+            print(f"[{len(rows)}/{len(jobs)}] {row['scenario']} {row['algorithm']} 种子 {row['seed']}: {row['status']}")
+    rows.sort(key=lambda r: (r['scenario'], r['algorithm'], r['config'], r['seed']))
+    return rows
+
+def save_results(rows, filename=BENCHMARK_RESULTS_FILE):
+    """
+    将所有结果写入一张 CSV 汇总表
+    :param rows: 结果字典列表
+    :param filename: 文件路径
+    """
+    # 各阶段统计只出现在启用统计的行中，追加在固定列之后（收敛曲线另存为单独的文件）
+    counter_fields = sorted({field for row in rows for field in row} - set(RESULT_FIELDS) - {'trace', 'params'})
+    fields = RESULT_FIELDS + counter_fields
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({field: ('' if row.get(field) is None else row[field]) for field in fields})
+
+def get_trace_filename(filename):
+    """
+    根据汇总结果表文件名生成收敛曲线文件名，例如 benchmark_results.csv -> benchmark_results_trace.csv
+    :param filename: 汇总结果表文件路径
+    :return: 收敛曲线文件路径
+    """
+    root, ext = os.path.splitext(filename)
+    return f"{root}_trace{ext or '.csv'}"
+
+def save_traces(rows, filename):
+    """
+    将所有任务的收敛曲线写入一张长表：每行是某个任务的一次路径代价变化
+    :param rows: 结果字典列表
+    :param filename: 文件路径
+    """
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['scenario', 'algorithm', 'seed'] + TRACE_FIELDS)
+        for row in rows:
+            trace = row.get('trace')
+            if not trace:
+                continue
+            for values in zip(*(trace[field] for field in TRACE_FIELDS)):
+                writer.writerow([row['scenario'], row['algorithm'], row['seed']] + list(values))
+
+def summarize_results(rows):
+    """
+    按（场景，算法，参数组合）汇总成功率、路径代价中位数和计算时间中位数
+    :param rows: 结果字典列表
+    :return: 汇总字典列表
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['scenario'], row['algorithm'], row['config']), []).append(row)
+    summary = []
+    for (scenario, algorithm, config), group in sorted(groups.items()):
+        succeeded = [row for row in group if row['success']]
+        summary.append({
+            'scenario': scenario,
+            'algorithm': algorithm,
+            'config': config,
+            'runs': len(group),
+            'success_rate': len(succeeded) / len(group),
+            'median_cost': statistics.median(row['cost'] for row in succeeded) if succeeded else float('inf'),
+            'median_time': statistics.median(row['time_taken'] for row in succeeded) if succeeded else float('inf'),
+            'timeouts': sum(1 for row in group if row['status'] == 'timeout')
+        })
+    return summary
+
+def print_summary(summary):
+    """
+    打印汇总表
+    :param summary: summarize_results 返回的汇总字典列表
+    """
+    print(f"{'场景':<28}{'算法':<10}{'次数':>6}{'成功率':>8}{'代价中位数':>12}{'时间中位数':>12}{'超时':>6}  参数")
+    for item in summary:
+        print(f"{item['scenario']:<28}{item['algorithm']:<10}{item['runs']:>6}{item['success_rate']:>8.0%}"
+              f"{item['median_cost']:>12.2f}{item['median_time']:>12.4f}{item['timeouts']:>6}  {item['config']}")
+
+def main():
+    """
+    命令行入口，例如
+    python benchmark.py --algorithms astar rrt rrtstar --seeds 0 1 2 3 4 --time-limit 5
+    """
+    parser = argparse.ArgumentParser(description="在多个场景上批量比较路径规划算法")
+    parser.add_argument('scenarios', nargs='*', help=f"场景文件或目录（默认使用 {SCENARIO_DIR} 目录）")
+    parser.add_argument('--algorithms', nargs='+', default=['astar', 'rrt', 'rrtstar'], choices=sorted(PLANNERS),
+                        help="参与比较的算法")
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0], help="随机种子列表")
+    parser.add_argument('--time-limit', type=float, default=BENCHMARK_TIME_LIMIT, help="每个任务的计算时间预算（秒）")
+    parser.add_argument('--memory-limit', type=int, default=BENCHMARK_MEMORY_LIMIT_MB, help="每个进程的数据段内存上限（MB，不含内存映射的地图文件），0 表示不限制")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数量（默认使用全部 CPU 核心）")
+    parser.add_argument('--deterministic', action='store_true',
+                        help="可复现模式：RRT* 优化和路径平滑按迭代次数而不是时间结束，同一种子得到相同结果")
+    parser.add_argument('--instrument', action='store_true', help="统计 A* 和 RRT* 内部各阶段的耗时和计数")
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=V1[,V2...]',
+                        help="参数扫描，例如 --param step_size=10,20 --param rewire_radius=40,60（测试所有组合）")
+    parser.add_argument('--output', default=BENCHMARK_RESULTS_FILE, help="汇总结果表文件")
+    parser.add_argument('--db', default=RESULTS_DB_FILE, help="同时写入的 SQLite 结果数据库（空字符串表示不写入）")
+    parser.add_argument('--check-timeout', action='store_true',
+                        help="只运行强制超时的回归检查（在 is_collision_free 内部触发超时），失败时返回非零退出码")
+    args = parser.parse_args()
+
+    if args.check_timeout:
+        if not hasattr(signal, 'setitimer'):
+            print("当前系统不支持 SIGALRM，不使用强制超时")
+            return
+        delay = check_job_timeout()
+        if delay is None:
+            print("强制超时检查失败：超时异常被吞掉，任务没有在时间上限内结束")
+            sys.exit(1)
+        print(f"强制超时检查通过：定时器到时后 {delay * 1000:.1f}ms 结束任务")
+        return
+
+    scenario_files = []
+    for path in args.scenarios or [SCENARIO_DIR]:
+        if os.path.isdir(path):
+            scenario_files.extend(list_scenarios(path))
+        else:
+            scenario_files.append(path)
+    if not scenario_files:
+        print("没有找到场景文件，请先使用 scenario_utils.py 生成场景")
+        return
+
+    configs = parse_param_sweep(args.param)
+    jobs = build_jobs(scenario_files, args.algorithms, args.seeds, args.time_limit, args.deterministic,
+                      args.instrument, configs)
+    print(f"共 {len(jobs)} 个任务（{len(scenario_files)} 个场景 × {len(args.algorithms)} 个算法 × "
+          f"{len(configs)} 组参数 × {len(args.seeds)} 个种子）")
+    benchmark_start = time.perf_counter()
+    rows = run_benchmark(jobs, args.workers, args.memory_limit)
+    save_results(rows, args.output)
+    save_traces(rows, get_trace_filename(args.output))
+    if args.db:
+        # 参数相同的运行在数据库中有相同的参数哈希，可以跨多次测试汇总
+        with ResultsDatabase(args.db) as database:
+            database.insert_runs(rows, 'benchmark')
+        print(f"结果已写入数据库: {args.db}（使用 python results_db.py report 查看汇总报表）")
+    print_summary(summarize_results(rows))
+    print(f"总耗时 {time.perf_counter() - benchmark_start:.1f}秒，结果已保存: {args.output}，"
+          f"收敛曲线已保存: {get_trace_filename(args.output)}")
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,35 @@ GAME_BORDER = 3         # 游戏区域边框宽度为 3 像素
 # 路径优化参数定义
 MAX_OPTIMIZATION_ITERATIONS = 500   # 路径优化的最大迭代次数，防止无限循环
 MAX_OPTIMIZATION_TIME = 3           # 路径优化的最大时间（秒），控制优化时长
+FAST_PATH_REDUCTION = True          # 路径点删减是否使用倍增加二分查找（减少碰撞检测次数）
+MAX_SHORTCUT_TIME = 0.5             # 随机捷径平滑的时间预算（秒），对 A*、RRT、RRT* 路径相同
+DETERMINISTIC_SHORTCUT_ITERATIONS = 1000  # 可复现模式下随机捷径平滑的尝试次数（代替时间预算）
+SHORTCUT_STALL_ATTEMPTS = 300      # 随机捷径平滑连续这么多次尝试都没能缩短路径时提前结束（路径已收敛）
+
+# 随机数种子：None 表示每次运行随机生成一个种子（种子会随结果一起记录，便于复现）
+RANDOM_SEED = None
+
+# 是否统计 A* 和 RRT* 内部各阶段的耗时和计数（关闭时几乎没有额外开销）
+INSTRUMENT_PLANNERS = False
+
+# 图形界面中每帧用于规划计算的时间预算（毫秒），规划器在预算内尽可能多地执行规划步，剩余时间用于绘制
+FRAME_PLANNING_BUDGET_MS = 12
+# 按算法单独设置的每帧时间预算（毫秒），未列出的算法使用 FRAME_PLANNING_BUDGET_MS
+FRAME_PLANNING_BUDGETS_MS = {}
+
+# 后台规划：规划器在单独的进程中运行，界面只绘制其定期发布的快照（规划速度与绘制开销无关）
+BACKGROUND_PLANNING = False
+SNAPSHOT_INTERVAL = 0.05    # 后台规划发布快照的时间间隔（秒）
+
+# 截图与画面序列导出（PNG 编码和写文件在后台线程中进行）
+SCREENSHOT_QUEUE_SIZE = 32          # 等待写入的截图队列长度，画面序列在队列已满时跳过该帧
+STREAM_FRAMES = False               # 启动时是否开始导出画面序列（运行中按 V 键切换）
+STREAM_EVERY_N_FRAMES = 5           # 每隔多少帧导出一帧
+STREAM_DIR = "frame_stream"         # 画面序列保存目录
+
+# 快进模式：不限制帧率，只在状态变化或达到绘制间隔时绘制画面（运行中按 F 键切换）
+FAST_FORWARD = False                # 启动时是否使用快进模式
+FAST_FORWARD_RENDER_INTERVAL = 0.25 # 快进模式下的绘制间隔（秒），设为 float('inf') 时只在状态变化时绘制
 
 # 颜色定义（RGB 格式）
 WHITE = (255, 255, 255)     # 白色
@@ -26,6 +55,7 @@ PATH_COLOR = (20, 200, 20)  # 路径颜色，更亮眼的绿色
 REWIRE_LINE_COLOR = (128, 0, 128)  # 重连时的线颜色，紫色
 OPEN_SET_COLOR = (255, 165, 0)  # 开放列表节点颜色，橙色
 CLOSED_SET_COLOR = (128, 128, 128)  # 关闭列表节点颜色，灰色
+SMOOTHED_PATH_COLOR = (220, 20, 60)  # 平滑后路径颜色，深红色
 
 # RRT* 算法参数定义
 STEP_SIZE = 10          # 扩展步长，控制每次扩展的距离
@@ -35,6 +65,9 @@ OBSTACLE_RADIUS = 10    # 障碍物绘制半径（像素）
 
 # RRT* 特有参数
 REWIRE_RADIUS = 40      # 重连半径，用于寻找邻近节点进行重新连接
+GOAL_SAMPLE_RATE = 0.1  # 直接以终点为采样点的概率
+RRT_MAX_ITERATIONS = 10000  # RRT 搜索初始路径的最大迭代次数
+OPTIMIZATION_STEPS_PER_ITERATION = 5  # 路径优化每次迭代执行的 RRT* 扩展次数
 
 # UI 元素参数定义
 BUTTON_X = 50           # 按钮左上角 x 坐标 - 调整了位置
@@ -42,10 +75,51 @@ BUTTON_Y = 580          # 按钮左上角 y 坐标 - 调整了位置
 BUTTON_WIDTH = 120      # 按钮宽度 - 增大了按钮尺寸
 BUTTON_HEIGHT = 40      # 按钮高度 - 调整了按钮尺寸
 STATUS_TEXT_POS = (200, 600)  # 状态文本位置 - 调整了位置
+TREE_LAYER_REFRESH_INTERVAL = 0.25  # 树中已有的边被重连后，树层整层重绘的最小时间间隔（秒）
 
 # 椭圆约束采样参数
 ELLIPSE_FOCUS_WEIGHT = 0.5  # 椭圆焦点权重
 ELLIPSE_PROBABILITY = 0.9   # 在椭圆内采样的概率
 
 # 网格参数
-GRID_SIZE = 5  # 网格大小，5x5像素
\ No newline at end of file
+GRID_SIZE = 5  # 网格大小，5x5像素
+USE_OCTILE_HEURISTIC = True  # 网格搜索是否使用八方向距离启发函数（否则使用欧几里得距离）
+
+# ARA* 算法参数
+ARA_INITIAL_WEIGHT = 3.0    # 初始启发式膨胀系数
+ARA_WEIGHT_STEP = 0.5       # 每轮迭代后膨胀系数的减小量
+ARA_TIME_BUDGET = 1.0       # ARA* 搜索的时间预算（秒），到期后返回当前最优解
+ARA_TIME_SLICE = 0.005      # ARA* 每个规划步使用的时间片（秒）
+
+# 场景文件与场景生成参数
+SCENARIO_DIR = "scenarios"          # 场景文件保存目录
+SCENARIO_VERSION = 1                # 场景文件格式版本
+CLUTTER_DENSITY = 0.15              # 随机杂乱地图中障碍物覆盖面积的比例
+MAZE_CELL_SIZE = 50                 # 迷宫单元格边长（像素），越小迷宫越密
+NARROW_PASSAGE_WIDTH = 15           # 狭窄通道的可通行宽度（像素）
+NARROW_PASSAGE_WALLS = 3            # 狭窄通道地图中的墙数量
+BUG_TRAP_SIZE = 160                 # 陷阱（U形）的边长（像素）
+
+# 栅格地图参数
+OCCUPANCY_IMAGE_THRESHOLD = 128     # PNG/PGM 图像中灰度低于该值的像素视为障碍物（黑色为障碍物）
+OCCUPANCY_RAW_THRESHOLD = 1         # 原始二进制占据文件中大于等于该值的字节视为障碍物
+
+# 批量性能测试参数
+BENCHMARK_TIME_LIMIT = 10           # 每个测试任务的计算时间预算（秒）
+BENCHMARK_TIMEOUT_MARGIN = 5        # 超出计算时间预算多少秒后强制终止任务（秒）
+BENCHMARK_MEMORY_LIMIT_MB = 1024    # 每个测试进程的内存上限（MB）
+BENCHMARK_RESULTS_FILE = "benchmark_results.csv"  # 汇总结果表文件名
+
+# 结果存储参数
+RESULTS_STORE_FILE = "algorithm_results.jsonl"  # 结果存储文件（每条记录追加一行 JSON），Excel 文件由它导出
+RESULTS_EXCEL_FILE = "algorithm_results.xlsx"  # 按 E 键或 results_store.py export-excel 导出的 Excel 文件
+RESULTS_FSYNC = True                # 每次追加记录后是否调用 fsync（断电也不丢失数据）
+RESULTS_COMPACT_BYTES = None        # 结果存储文件超过该大小（字节）时压缩为 Parquet（需要 pyarrow），None 表示不压缩
+RESULTS_DB_FILE = "algorithm_results.db"  # SQLite 结果数据库（批量测试结果和导入的界面结果，用于汇总报表）
+RESULTS_REPORT_PERCENTILE = 95      # 汇总报表中除中位数外统计的百分位数
+
+# 微基准测试参数
+MICRO_BENCHMARK_BASELINE_FILE = "micro_benchmark_baseline.json"  # 基准结果文件
+MICRO_BENCHMARK_REPEAT = 5          # 每个测试重复测量的次数
+MICRO_BENCHMARK_WARMUP = 1          # 正式测量前的预热次数
+MICRO_BENCHMARK_THRESHOLD = 0.2     # 比基准慢超过该比例时标记为性能退化
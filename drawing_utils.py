@@ -3,17 +3,142 @@
 # 导入必要的库
 import pygame
 import math
+import time
+from itertools import islice
 from constants import (
     WHITE, BLACK, RED, GREEN, BLUE, YELLOW, PATH_COLOR, 
-    OPEN_SET_COLOR, CLOSED_SET_COLOR, GAME_X, GAME_Y, GAME_WIDTH, 
+    OPEN_SET_COLOR, CLOSED_SET_COLOR, SMOOTHED_PATH_COLOR, GAME_X, GAME_Y, GAME_WIDTH, 
     GAME_HEIGHT, GAME_BORDER, NODE_RADIUS, GOAL_RADIUS,
-    OBSTACLE_RADIUS, BUTTON_WIDTH, BUTTON_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT
+    OBSTACLE_RADIUS, BUTTON_WIDTH, BUTTON_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT, TREE_LAYER_REFRESH_INTERVAL
 )
 from classes import GameState
 from astar_algorithm import grid_to_game
 
+def draw_tree_edge(surface, node, parent, tree_color=BLUE):
+    """
+    绘制树中的一条边及其子节点
+    :param surface: 绘制目标表面
+    :param node: 子节点坐标
+    :param parent: 父节点坐标（根节点为 None）
+    :param tree_color: 树的颜色
+    """
+    if parent is not None:
+        # 确保节点和父节点是有效的坐标点
+        if (isinstance(node, tuple) and len(node) == 2 and
+            isinstance(parent, tuple) and len(parent) == 2):
+            pygame.draw.line(surface, tree_color, node, parent, 1)
+            pygame.draw.circle(surface, tree_color, node, NODE_RADIUS)
+
+def make_occupancy_surface(occupancy):
+    """
+    把栅格占据地图转换为 pygame 表面（被占据为黑色，空闲为白色）
+    :param occupancy: 栅格占据地图（occupancy_map.OccupancyGrid），尺寸不超过游戏区域
+    :return: pygame 表面
+    """
+    return pygame.image.frombuffer(occupancy.to_rgb_bytes(), (occupancy.width, occupancy.height), 'RGB').convert()
+
+class SceneLayers:
+    """
+    缓存的离屏绘制层：静态层（背景、栅格地图、边框和障碍物）只在障碍物或地图变化时重绘；
+    树层只增量绘制新增的边，只有已有的边被修改（重连、剪裁）时才整层重绘
+    （重连时最多每 TREE_LAYER_REFRESH_INTERVAL 秒重绘一次，期间新增的边仍然立即绘制）；
+    网格搜索层只绘制状态发生变化的节点
+    """
+
+    def __init__(self):
+        self.static_layer = None
+        self.drawn_obstacles = None     # 静态层上已绘制的障碍物
+        self.drawn_occupancy = None     # 静态层上已绘制的栅格地图
+        self.tree_layer = None
+        self.tree_source = None         # 树层对应的树结构字典
+        self.tree_revision = None       # 树层对应的树结构修改次数
+        self.drawn_edges = 0            # 树层上已绘制的边数（按字典的插入顺序）
+        self.tree_redraw_time = 0.0     # 树层上次整层重绘的时间
+        self.grid_layer = None
+        self.grid_seeded = False        # 网格搜索层是否已经绘制了当前搜索的完整状态
+
+    def draw_static(self, screen, obstacles, occupancy=None):
+        """
+        把静态层绘制到屏幕上，障碍物或栅格地图变化时先重绘静态层
+        :param screen: pygame 屏幕对象
+        :param obstacles: 障碍物列表
+        :param occupancy: 可选的栅格占据地图
+        """
+        if self.static_layer is None:
+            self.static_layer = pygame.Surface(screen.get_size())
+        if obstacles != self.drawn_obstacles or occupancy is not self.drawn_occupancy:
+            self.static_layer.fill(WHITE)
+            if occupancy is not None:
+                self.static_layer.blit(make_occupancy_surface(occupancy), occupancy.origin)
+            self.drawn_occupancy = occupancy
+            pygame.draw.rect(self.static_layer, BLACK, (GAME_X, GAME_Y, GAME_WIDTH, GAME_HEIGHT), GAME_BORDER)
+            for obstacle in obstacles:
+                pygame.draw.circle(self.static_layer, BLACK, obstacle, OBSTACLE_RADIUS)
+            self.drawn_obstacles = list(obstacles)
+        screen.blit(self.static_layer, (0, 0))
+
+    def draw_tree(self, screen, parent_map, tree_revision=0):
+        """
+        把树层绘制到屏幕上：新增的边追加在字典末尾，只绘制这些边；
+        换了一棵树、已有的边被修改或树变小时整层重绘
+        :param screen: pygame 屏幕对象
+        :param parent_map: 树结构字典
+        :param tree_revision: 树中已有的边被修改的次数（规划器的 tree_revision）
+        """
+        if self.tree_layer is None:
+            self.tree_layer = pygame.Surface(screen.get_size())
+            # 白色作为透明色，只显示树
+            self.tree_layer.set_colorkey(WHITE)
+            self.tree_source = None
+        now = time.perf_counter()
+        rewired = (tree_revision != self.tree_revision and
+                   now - self.tree_redraw_time >= TREE_LAYER_REFRESH_INTERVAL)
+        if parent_map is not self.tree_source or rewired or len(parent_map) < self.drawn_edges:
+            self.tree_layer.fill(WHITE)
+            self.tree_redraw_time = now
+            self.tree_source = parent_map
+            self.tree_revision = tree_revision
+            self.drawn_edges = 0
+        if len(parent_map) > self.drawn_edges:
+            for node, parent in islice(parent_map.items(), self.drawn_edges, None):
+                draw_tree_edge(self.tree_layer, node, parent)
+            self.drawn_edges = len(parent_map)
+        screen.blit(self.tree_layer, (0, 0))
+
+    def reset_grid(self):
+        """开始新的网格搜索时调用，下一次绘制时先绘制完整的开放列表和关闭列表"""
+        self.grid_seeded = False
+
+    def draw_grid_search(self, screen, open_set, closed_set, changes):
+        """
+        把网格搜索层绘制到屏幕上：第一次绘制时绘制完整的开放列表和关闭列表，
+        之后只按顺序绘制状态发生变化的节点（关闭列表中的节点覆盖开放列表的颜色）
+        :param screen: pygame 屏幕对象
+        :param open_set: 开放列表，元素为 (f, -g, 节点)
+        :param closed_set: 关闭列表
+        :param changes: 上一帧之后的节点状态变化，元素为 ('open', 节点) 或 ('closed', 节点)
+        """
+        if self.grid_layer is None:
+            self.grid_layer = pygame.Surface(screen.get_size())
+            # 白色作为透明色，只显示搜索节点
+            self.grid_layer.set_colorkey(WHITE)
+        if not self.grid_seeded:
+            self.grid_layer.fill(WHITE)
+            for node in closed_set:
+                pygame.draw.circle(self.grid_layer, CLOSED_SET_COLOR, grid_to_game(node), NODE_RADIUS)
+            for _, _, node in open_set:
+                if node not in closed_set:
+                    pygame.draw.circle(self.grid_layer, OPEN_SET_COLOR, grid_to_game(node), NODE_RADIUS)
+            self.grid_seeded = True
+        else:
+            for state, node in changes:
+                color = CLOSED_SET_COLOR if state == 'closed' else OPEN_SET_COLOR
+                pygame.draw.circle(self.grid_layer, color, grid_to_game(node), NODE_RADIUS)
+        screen.blit(self.grid_layer, (0, 0))
+
 # 重绘整个场景
-def redraw_scene(screen, obstacles, parent_map, cost_map, open_set, closed_set, path, start_node, end_node, game_state, algorithm_type=None):
+def redraw_scene(screen, obstacles, parent_map, cost_map, open_set, closed_set, path, start_node, end_node, game_state, algorithm_type=None,
+                 smoothed_path=None, layers=None, tree_revision=0, grid_changes=None, occupancy=None):
     """
     重新绘制整个场景
     :param screen: pygame 屏幕对象
@@ -26,18 +151,32 @@ def redraw_scene(screen, obstacles, parent_map, cost_map, open_set, closed_set,
     :param start_node: 起点坐标
     :param end_node: 终点坐标
     :param game_state: 当前游戏状态
-    :param algorithm_type: 使用的算法类型 ('astar' 或 'rrtstar')
+    :param algorithm_type: 使用的算法类型 ('astar'、'arastar'、'biastar'、'dstar'、'rrt' 或 'rrtstar')
+    :param smoothed_path: 平滑后的路径 (游戏坐标，用于A*)
+    :param layers: 可选的 SceneLayers 对象，提供时使用缓存的静态层和树层，否则每帧从头绘制
+    :param tree_revision: 树中已有的边被修改的次数（用于判断树层是否需要整层重绘）
+    :param grid_changes: 网格搜索上一帧之后的节点状态变化（规划器的 pop_changes），
+                         与 layers 同时提供时只绘制变化的节点，否则每帧绘制完整的开放列表和关闭列表
+    :param occupancy: 可选的栅格占据地图（绘制在障碍物下方）
     """
     try:
-        # 填充背景色为白色
-        screen.fill(WHITE)
-        
-        # 绘制游戏区域边框
-        pygame.draw.rect(screen, BLACK, (GAME_X, GAME_Y, GAME_WIDTH, GAME_HEIGHT), GAME_BORDER)
-        
-        # 绘制所有障碍物
-        for obstacle in obstacles:
-            pygame.draw.circle(screen, BLACK, obstacle, OBSTACLE_RADIUS)
+        if layers is not None:
+            # 背景、栅格地图、边框和障碍物来自缓存的静态层
+            layers.draw_static(screen, obstacles, occupancy)
+        else:
+            # 填充背景色为白色
+            screen.fill(WHITE)
+
+            # 绘制栅格地图
+            if occupancy is not None:
+                screen.blit(make_occupancy_surface(occupancy), occupancy.origin)
+
+            # 绘制游戏区域边框
+            pygame.draw.rect(screen, BLACK, (GAME_X, GAME_Y, GAME_WIDTH, GAME_HEIGHT), GAME_BORDER)
+
+            # 绘制所有障碍物
+            for obstacle in obstacles:
+                pygame.draw.circle(screen, BLACK, obstacle, OBSTACLE_RADIUS)
         
         # 绘制起点和终点（如果已设置）
         if start_node:
@@ -46,20 +185,24 @@ def redraw_scene(screen, obstacles, parent_map, cost_map, open_set, closed_set,
             pygame.draw.circle(screen, GREEN, end_node, GOAL_RADIUS)
         
         # 绘制 A* 搜索状态
-        if game_state in [GameState.RUNNING_ASTAR, GameState.PATH_FOUND, GameState.QUIT] or algorithm_type == 'astar':
-            # 绘制关闭列表中的节点
-            for node in closed_set:
-                game_pos = grid_to_game(node)
-                pygame.draw.circle(screen, CLOSED_SET_COLOR, game_pos, NODE_RADIUS)
-            
-            # 绘制开放列表中的节点
-            open_nodes = set()
-            for _, _, node in open_set:
-                open_nodes.add(node)
-            for node in open_nodes:
-                if node not in closed_set:  # 确保不重复绘制
+        if game_state in [GameState.RUNNING_ASTAR, GameState.PATH_FOUND, GameState.QUIT] or algorithm_type in ['astar', 'arastar', 'biastar', 'dstar']:
+            if layers is not None and grid_changes is not None:
+                # 增量绘制：只绘制状态发生变化的节点
+                layers.draw_grid_search(screen, open_set, closed_set, grid_changes)
+            else:
+                # 绘制关闭列表中的节点
+                for node in closed_set:
                     game_pos = grid_to_game(node)
-                    pygame.draw.circle(screen, OPEN_SET_COLOR, game_pos, NODE_RADIUS)
+                    pygame.draw.circle(screen, CLOSED_SET_COLOR, game_pos, NODE_RADIUS)
+
+                # 绘制开放列表中的节点
+                open_nodes = set()
+                for _, _, node in open_set:
+                    open_nodes.add(node)
+                for node in open_nodes:
+                    if node not in closed_set:  # 确保不重复绘制
+                        game_pos = grid_to_game(node)
+                        pygame.draw.circle(screen, OPEN_SET_COLOR, game_pos, NODE_RADIUS)
             
             # 如果找到路径，绘制路径
             if path and game_state in [GameState.PATH_FOUND, GameState.QUIT]:
@@ -67,22 +210,21 @@ def redraw_scene(screen, obstacles, parent_map, cost_map, open_set, closed_set,
                     p1 = grid_to_game(path[i])
                     p2 = grid_to_game(path[i + 1])
                     pygame.draw.line(screen, PATH_COLOR, p1, p2, 3)
+            
+            # 如果有平滑后的路径，叠加绘制
+            if smoothed_path and game_state in [GameState.PATH_FOUND, GameState.QUIT]:
+                for i in range(len(smoothed_path) - 1):
+                    pygame.draw.line(screen, SMOOTHED_PATH_COLOR, smoothed_path[i], smoothed_path[i + 1], 2)
         
         # 绘制 RRT/RRT* 树（如果正在运行算法或已完成优化）
         elif game_state in [GameState.RUNNING_RRT, GameState.RUNNING_RRT_STAR, GameState.PATH_FOUND, GameState.OPTIMIZING_PATH, 
                           GameState.PATH_OPTIMIZED, GameState.QUIT] or algorithm_type in ['rrt', 'rrtstar']:
-            # 统一使用RRT*的蓝色作为节点颜色
-            tree_color = BLUE
-            
-            # 安全地绘制树结构
-            for node in parent_map:
-                parent = parent_map.get(node)
-                if parent is not None:
-                    # 确保节点和父节点是有效的坐标点
-                    if (isinstance(node, tuple) and len(node) == 2 and 
-                        isinstance(parent, tuple) and len(parent) == 2):
-                        pygame.draw.line(screen, tree_color, node, parent, 1)
-                        pygame.draw.circle(screen, tree_color, node, NODE_RADIUS)
+            # 安全地绘制树结构（统一使用RRT*的蓝色作为节点颜色）
+            if layers is not None:
+                layers.draw_tree(screen, parent_map, tree_revision)
+            else:
+                for node, parent in parent_map.items():
+                    draw_tree_edge(screen, node, parent)
             
             # 如果找到路径，绘制路径（在优化中和优化完成后都显示）
             if (game_state in [GameState.OPTIMIZING_PATH, GameState.PATH_OPTIMIZED, GameState.QUIT] 
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+
+# 导入必要的库
+import argparse
+import heapq
+import math
+import random
+import sys
+from astar_algorithm import heuristic, get_neighbors, get_obstacle_cells, game_to_grid
+from constants import USE_OCTILE_HEURISTIC
+from planner_config import DEFAULT_CONFIG
+
+# √2 累加产生的浮点误差会让本应相等的键值相差一个 ULP，堆的顺序和终止条件因此可能把
+# 欠一致节点排在起点之后，导致提前终止、起点 g 值过期。键值统一舍入到固定小数位，
+# g/rhs 的一致性判断使用同样量级的容差
+KEY_DECIMALS = 6
+KEY_EPSILON = 1e-6
+
+# D* Lite 增量式重规划算法
+class DStarLite:
+    """
+    D* Lite 规划器：从终点向起点反向搜索，并在障碍物增删后只修复受影响的节点，
+    而不是像 A* 那样从头重新搜索。
+    首次规划的扩展数与从终点出发的 A* 相当；起点被困在凹形障碍内（bug_trap、迷宫）时
+    反向搜索会比正向 A* 多扩展数倍节点，这是为了起点移动后复用搜索结果而付出的代价
+    """
+
+    def __init__(self, start_grid, end_grid, obstacles, grid_width, grid_height, config=DEFAULT_CONFIG,
+                 use_octile=USE_OCTILE_HEURISTIC):
+        """
+        初始化 D* Lite 规划器
+        :param start_grid: 起点网格坐标
+        :param end_grid: 终点网格坐标
+        :param obstacles: 障碍物列表，每个障碍物是一个坐标点 (x, y)
+        :param grid_width: 网格宽度
+        :param grid_height: 网格高度
+        :param config: 规划参数配置（提供网格大小、障碍物半径和可选的栅格占据地图）
+        :param use_octile: 是否使用八方向（octile）距离作为启发函数，否则使用欧几里得距离
+        """
+        self.start_grid = start_grid
+        self.end_grid = end_grid
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.config = config
+        self.use_octile = use_octile
+        self.obstacles = []
+        # 记录每个网格被多少个障碍物覆盖，删除障碍物时只有计数归零才解除阻挡
+        self.cover_count = {}
+        # 栅格地图的阻挡查找表（按需从地图读取），障碍物增删只影响 cover_count
+        self.occupancy_cells = (config.occupancy.get_cell_grid(grid_width, grid_height, config.grid_size)
+                                if config.occupancy is not None else None)
+        # g 值与 rhs 值，缺省为无穷大
+        self.g = {}
+        self.rhs = {}
+        # 起点移动时累计的启发值偏移量
+        self.km = 0
+        # 优先队列（惰性删除），open_keys 记录每个节点当前有效的键值
+        self.open_heap = []
+        self.open_keys = {}
+        # 统计节点扩展次数
+        self.expanded_nodes = 0
+
+        for obstacle in obstacles:
+            self._cover_cells(obstacle, 1)
+            self.obstacles.append(obstacle)
+
+        # 终点的 rhs 为 0，作为反向搜索的起点
+        self.rhs[self.end_grid] = 0
+        self._push(self.end_grid)
+
+    def _cover_cells(self, obstacle, delta):
+        """
+        增加或减少障碍物对网格的覆盖计数
+        :param obstacle: 障碍物坐标 (x, y)
+        :param delta: 计数变化量（+1 表示添加，-1 表示删除）
+        :return: 阻挡状态发生变化的网格列表
+        """
+        changed = []
+        for cell in get_obstacle_cells(obstacle, self.grid_width, self.grid_height, self.config):
+            old_count = self.cover_count.get(cell, 0)
+            new_count = old_count + delta
+            if new_count > 0:
+                self.cover_count[cell] = new_count
+            else:
+                self.cover_count.pop(cell, None)
+            if (old_count > 0) != (new_count > 0):
+                changed.append(cell)
+        return changed
+
+    def is_blocked(self, cell):
+        """
+        检查网格是否被障碍物占据
+        :param cell: 网格坐标 (x, y)
+        :return: 如果被占据返回 True，否则返回 False
+        """
+        if cell in self.cover_count:
+            return True
+        return self.occupancy_cells is not None and self.occupancy_cells[cell[1] * self.grid_width + cell[0]] == 1
+
+    def _cost(self, u, v):
+        """
+        计算从 u 移动到相邻网格 v 的成本，对角线为√2，直线为1，
+        v 被阻挡时为无穷大（与 A* 只检查相邻节点的做法一致）
+        :param u: 网格坐标 (x, y)
+        :param v: 相邻网格坐标 (x, y)
+        :return: 移动成本
+        """
+        if self.is_blocked(v):
+            return float('inf')
+        diagonal = abs(u[0] - v[0]) == 1 and abs(u[1] - v[1]) == 1
+        return math.sqrt(2) if diagonal else 1
+
+    @staticmethod
+    def _is_close(a, b):
+        """
+        在容差范围内比较两个代价是否相等（两个无穷大视为相等）
+        :param a: 代价
+        :param b: 代价
+        :return: 相等返回 True，否则返回 False
+        """
+        return a == b or abs(a - b) <= KEY_EPSILON
+
+    def _calculate_key(self, node):
+        """
+        计算节点在优先队列中的键值。k1 相同时欠一致节点优先（保证终止时起点不依赖过期的 g 值），
+        其余节点按 g 值从大到小打破平局，与 A* 偏向较大 g 值的做法一致，避免在启发值平台上大范围扩展
+        :param node: 网格坐标 (x, y)
+        :return: 键值 (k1, 是否非欠一致, ±min(g, rhs))
+        """
+        g = self.g.get(node, float('inf'))
+        rhs = self.rhs.get(node, float('inf'))
+        g_rhs = min(g, rhs)
+        k1 = round(g_rhs + heuristic(self.start_grid, node, use_octile=self.use_octile) + self.km, KEY_DECIMALS)
+        g_rhs = round(g_rhs, KEY_DECIMALS)
+        if g < rhs and not self._is_close(g, rhs):
+            return (k1, 0, g_rhs)
+        return (k1, 1, -g_rhs)
+
+    def _push(self, node):
+        """
+        将节点加入（或重新加入）优先队列
+        :param node: 网格坐标 (x, y)
+        """
+        key = self._calculate_key(node)
+        self.open_keys[node] = key
+        heapq.heappush(self.open_heap, (key, node))
+
+    def _top_key(self):
+        """
+        获取优先队列中最小的有效键值，同时清理过期条目
+        :return: 最小键值，队列为空时返回 (inf, inf, inf)
+        """
+        while self.open_heap:
+            key, node = self.open_heap[0]
+            if self.open_keys.get(node) == key:
+                return key
+            heapq.heappop(self.open_heap)
+        return (float('inf'), float('inf'), float('inf'))
+
+    def _update_vertex(self, node):
+        """
+        根据后继节点重新计算 rhs 值，并维护节点在优先队列中的状态
+        :param node: 网格坐标 (x, y)
+        """
+        if node != self.end_grid:
+            best = float('inf')
+            for succ in get_neighbors(node, self.grid_width, self.grid_height):
+                cost = self._cost(node, succ) + self.g.get(succ, float('inf'))
+                if cost < best:
+                    best = cost
+            self.rhs[node] = best
+        self.open_keys.pop(node, None)
+        if not self._is_close(self.g.get(node, float('inf')), self.rhs.get(node, float('inf'))):
+            self._push(node)
+
+    def compute_shortest_path(self):
+        """
+        扩展局部不一致的节点，直到起点的代价重新一致
+        :return: 本次调用扩展的节点数
+        """
+        expanded = 0
+        while (self._top_key() < self._calculate_key(self.start_grid) or
+               not self._is_close(self.rhs.get(self.start_grid, float('inf')),
+                                  self.g.get(self.start_grid, float('inf')))):
+            if not self.open_heap:
+                break
+            k_old, node = heapq.heappop(self.open_heap)
+            del self.open_keys[node]
+            expanded += 1
+            k_new = self._calculate_key(node)
+            if k_old < k_new:
+                # 键值已过期，按新键值重新入队
+                self._push(node)
+            elif self.g.get(node, float('inf')) > self.rhs.get(node, float('inf')):
+                # 过一致：降低 g 值并通知前驱节点
+                self.g[node] = self.rhs[node]
+                for pred in get_neighbors(node, self.grid_width, self.grid_height):
+                    self._update_vertex(pred)
+            else:
+                # 欠一致：重置 g 值并重新计算自身和前驱节点
+                self.g[node] = float('inf')
+                self._update_vertex(node)
+                for pred in get_neighbors(node, self.grid_width, self.grid_height):
+                    self._update_vertex(pred)
+        self.expanded_nodes += expanded
+        return expanded
+
+    def _on_cells_changed(self, cells):
+        """
+        网格阻挡状态变化后，更新受影响的节点
+        :param cells: 阻挡状态发生变化的网格列表
+        """
+        affected = set()
+        for cell in cells:
+            affected.add(cell)
+            affected.update(get_neighbors(cell, self.grid_width, self.grid_height))
+        for node in affected:
+            self._update_vertex(node)
+
+    def add_obstacle(self, obstacle):
+        """
+        添加一个障碍物，只更新其覆盖网格及相邻节点
+        :param obstacle: 障碍物坐标 (x, y)
+        :return: 阻挡状态发生变化的网格列表
+        """
+        self.obstacles.append(obstacle)
+        changed = self._cover_cells(obstacle, 1)
+        self._on_cells_changed(changed)
+        return changed
+
+    def remove_obstacle(self, obstacle):
+        """
+        删除一个障碍物，只更新其覆盖网格及相邻节点
+        :param obstacle: 障碍物坐标 (x, y)
+        :return: 阻挡状态发生变化的网格列表
+        """
+        if obstacle not in self.obstacles:
+            return []
+        self.obstacles.remove(obstacle)
+        changed = self._cover_cells(obstacle, -1)
+        self._on_cells_changed(changed)
+        return changed
+
+    def update_start(self, new_start_grid):
+        """
+        移动起点（例如机器人沿路径前进后），保留已有的搜索结果
+        :param new_start_grid: 新的起点网格坐标
+        """
+        self.km += heuristic(self.start_grid, new_start_grid, use_octile=self.use_octile)
+        self.start_grid = new_start_grid
+
+    def get_path(self):
+        """
+        沿 g 值下降方向从起点走到终点，提取当前最短路径
+        :return: 路径节点列表（网格坐标），不存在路径时返回 None
+        """
+        if self.g.get(self.start_grid, float('inf')) == float('inf'):
+            return None
+        path = [self.start_grid]
+        current = self.start_grid
+        # 防止在不一致状态下出现死循环
+        max_steps = self.grid_width * self.grid_height
+        while current != self.end_grid and len(path) <= max_steps:
+            best_node = None
+            best_cost = float('inf')
+            for succ in get_neighbors(current, self.grid_width, self.grid_height):
+                cost = self._cost(current, succ) + self.g.get(succ, float('inf'))
+                if cost < best_cost:
+                    best_cost = cost
+                    best_node = succ
+            if best_node is None:
+                return None
+            path.append(best_node)
+            current = best_node
+        return path if current == self.end_grid else None
+
+    def get_visited_nodes(self):
+        """
+        获取已计算出有限 g 值的节点（用于可视化）
+        :return: 节点集合
+        """
+        return {node for node, value in self.g.items() if value != float('inf')}
+
+
+def check_incremental_replanning(runs=200, edits=30, scenario_kind='clutter', seed=0, config=DEFAULT_CONFIG,
+                                 use_octile=USE_OCTILE_HEURISTIC):
+    """
+    一致性检查：随机逐个添加（偶尔删除）障碍物并增量重规划，每次都与从头规划的结果比较
+    :param runs: 运行次数（每次使用不同的场景和编辑序列）
+    :param edits: 每次运行的障碍物编辑次数
+    :param scenario_kind: 场景类型
+    :param seed: 第一次运行的随机种子
+    :param config: 规划参数配置
+    :param use_octile: 是否使用八方向距离启发函数
+    :return: 结果不一致的 (运行序号, 编辑序号, 增量代价, 重新规划代价) 列表
+    """
+    # 延迟导入，避免 scenario_utils -> planning_engine -> 本模块的循环导入
+    from scenario_utils import generate_scenario
+
+    failures = []
+    for run in range(runs):
+        rng = random.Random(seed + run)
+        scenario = generate_scenario(scenario_kind, seed=seed + run)
+        start_grid = game_to_grid(scenario['start'], config)
+        end_grid = game_to_grid(scenario['end'], config)
+        obstacles = list(scenario['obstacles'])
+        search = DStarLite(start_grid, end_grid, obstacles, config.grid_width, config.grid_height, config, use_octile)
+        search.compute_shortest_path()
+        added = []
+        for edit in range(edits):
+            if added and rng.random() < 0.2:
+                obstacle = added.pop(rng.randrange(len(added)))
+                obstacles.remove(obstacle)
+                search.remove_obstacle(obstacle)
+            else:
+                obstacle = (config.game_x + rng.uniform(0, config.game_width),
+                            config.game_y + rng.uniform(0, config.game_height))
+                cells = get_obstacle_cells(obstacle, config.grid_width, config.grid_height, config)
+                if start_grid in cells or end_grid in cells:
+                    continue
+                added.append(obstacle)
+                obstacles.append(obstacle)
+                search.add_obstacle(obstacle)
+            search.compute_shortest_path()
+
+            scratch = DStarLite(start_grid, end_grid, obstacles, config.grid_width, config.grid_height, config,
+                                use_octile)
+            scratch.compute_shortest_path()
+            incremental_cost = _path_cost(search, search.get_path())
+            scratch_cost = _path_cost(scratch, scratch.get_path())
+            if not DStarLite._is_close(incremental_cost, scratch_cost):
+                failures.append((run, edit, incremental_cost, scratch_cost))
+                break
+    return failures
+
+def _path_cost(search, path):
+    """
+    按网格移动成本计算路径代价
+    :param search: DStarLite 对象
+    :param path: 路径节点列表，None 表示无路径
+    :return: 路径代价，无路径时为无穷大
+    """
+    if path is None:
+        return float('inf')
+    return sum(search._cost(path[i], path[i + 1]) for i in range(len(path) - 1))
+
+def main():
+    """
+    命令行入口，例如
+    python dstar_lite_algorithm.py --runs 200 --edits 30    # 两种启发函数各检查一遍，不一致时返回非零退出码
+    """
+    parser = argparse.ArgumentParser(description="检查 D* Lite 增量重规划与从头规划的结果是否一致")
+    parser.add_argument('--runs', type=int, default=200, help="运行次数")
+    parser.add_argument('--edits', type=int, default=30, help="每次运行的障碍物编辑次数")
+    parser.add_argument('--scenario', default='clutter', help="场景类型")
+    parser.add_argument('--seed', type=int, default=0, help="第一次运行的随机种子")
+    parser.add_argument('--heuristic', choices=['octile', 'euclidean', 'both'], default='both', help="启发函数")
+    args = parser.parse_args()
+
+    heuristics = ['octile', 'euclidean'] if args.heuristic == 'both' else [args.heuristic]
+    failed = False
+    for name in heuristics:
+        failures = check_incremental_replanning(args.runs, args.edits, args.scenario, args.seed,
+                                                use_octile=(name == 'octile'))
+        for run, edit, incremental_cost, scratch_cost in failures:
+            print(f"[{name}] 运行 {run} 第 {edit} 次编辑后不一致: 增量 {incremental_cost:.6f}，从头规划 {scratch_cost:.6f}")
+        if failures:
+            print(f"[{name}] {len(failures)}/{args.runs} 次运行不一致")
+            failed = True
+        else:
+            print(f"[{name}] {args.runs} 次运行全部一致")
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,53 +1,99 @@
-import pandas as pd
 import os
-import pandas as pd
+from constants import RESULTS_STORE_FILE, RESULTS_EXCEL_FILE
+from results_store import ResultsStore
 
 class ExcelLogger:
-    def __init__(self, file_path=None):
+    def __init__(self, file_path=None, store_path=RESULTS_STORE_FILE):
         """初始化ExcelLogger类
         
+        每条记录在记录时立即追加到结果存储文件中（程序崩溃也不会丢失），
+        Excel文件只是从结果存储导出的报表，只在明确要求时导出（界面中按E键）
+        
         Args:
             file_path: Excel文件保存路径，如果为None则使用固定文件名
+            store_path: 结果存储文件路径（JSON Lines）
         """
         if file_path is None:
             # 使用固定文件名
-            file_path = "algorithm_results.xlsx"
+            file_path = RESULTS_EXCEL_FILE
         self.file_path = file_path
+        self.store = ResultsStore(store_path)
         
-        # 初始化数据存储结构
+        # 本次运行记录的数据（用于在最近的记录中补充信息）
         self.results = {
             'astar': [],
             'rrt': [],
-            'rrtstar': []
+            'rrtstar': [],
+            'arastar': [],
+            'biastar': [],
+            'dstar': []
         }
         
-        # 检查文件是否存在，如果存在则读取已有数据
-        if os.path.exists(self.file_path):
-            try:
-                existing_df = pd.read_excel(self.file_path)
-                # 按算法类型整理数据
-                for algo in self.results.keys():
-                    algo_data = existing_df[existing_df['algorithm'] == algo]
-                    if not algo_data.empty:
-                        self.results[algo] = algo_data.to_dict('records')
-            except Exception as e:
-                print(f"读取现有Excel文件失败: {e}")
-                # 如果读取失败，从头开始记录
-                pass
+        # 结果存储还不存在时，把旧版本保存在Excel文件中的数据导入结果存储（只执行一次）
+        if (os.path.exists(self.file_path) and not os.path.exists(self.store.filename) and
+                not os.path.exists(self.store.parquet_filename)):
+            self.import_excel(self.file_path)
+    
+    def import_excel(self, file_path):
+        """把Excel文件中的记录和收敛曲线导入结果存储
+        
+        Args:
+            file_path: Excel文件路径
+        """
+        # pandas只在需要读写Excel时才导入
+        import pandas as pd
+        try:
+            records = pd.read_excel(file_path).to_dict('records')
+            for record in records:
+                self.store.append({key: value for key, value in record.items() if not pd.isna(value)})
+            print(f"已从Excel文件导入{len(records)}条记录到结果存储: {self.store.filename}")
+        except Exception as e:
+            print(f"读取现有Excel文件失败: {e}")
+        try:
+            self.store.append_trace(pd.read_excel(file_path, sheet_name='convergence').to_dict('records'))
+        except Exception:
+            # 旧文件中没有收敛曲线工作表
+            pass
+    
+    def _add_record(self, algorithm, record):
+        """记录一条结果并立即追加到结果存储
+        
+        Args:
+            algorithm: 算法名称
+            record: 记录字典
+        """
+        self.results[algorithm].append(record)
+        try:
+            self.store.append(record)
+        except Exception as e:
+            print(f"写入结果存储失败: {e}")
     
-    def log_astar_result(self, path_length, time_taken):
+    def _update_record(self, record):
+        """已记录的结果被补充信息后，把新版本追加到结果存储
+        
+        Args:
+            record: 已记录的记录字典
+        """
+        try:
+            self.store.update(record)
+        except Exception as e:
+            print(f"写入结果存储失败: {e}")
+    
+    def log_astar_result(self, path_length, time_taken, expanded_nodes=None):
         """记录A*算法结果
         
         Args:
             path_length: 路径长度
             time_taken: 算法耗时(秒)
+            expanded_nodes: 扩展的节点数(可选)
         """
         record = {
             'algorithm': 'astar',
             'path_length': path_length,
-            'time_taken': time_taken
+            'time_taken': time_taken,
+            'expanded_nodes': expanded_nodes
         }
-        self.results['astar'].append(record)
+        self._add_record('astar', record)
         print(f"已记录A*算法结果: 路径长度={path_length:.2f}, 耗时={time_taken:.2f}秒")
     
     def log_rrt_result(self, path_length, time_taken):
@@ -62,7 +108,7 @@ class ExcelLogger:
             'path_length': path_length,
             'time_taken': time_taken
         }
-        self.results['rrt'].append(record)
+        self._add_record('rrt', record)
         print(f"已记录RRT算法结果: 路径长度={path_length:.2f}, 耗时={time_taken:.2f}秒")
     
     def log_rrtstar_result(self, path_length, time_taken, improvement_percentage=None):
@@ -79,12 +125,70 @@ class ExcelLogger:
             'time_taken': time_taken,
             'improvement_percentage': improvement_percentage
         }
-        self.results['rrtstar'].append(record)
+        self._add_record('rrtstar', record)
         if improvement_percentage is not None:
             print(f"已记录RRT*算法结果: 路径长度={path_length:.2f}, 耗时={time_taken:.2f}秒, 改善百分比={improvement_percentage:.2f}%")
         else:
             print(f"已记录RRT*算法结果: 路径长度={path_length:.2f}, 耗时={time_taken:.2f}秒")
     
+    def log_bidirectional_astar_result(self, path_length, time_taken, forward_expanded, backward_expanded):
+        """记录双向A*算法结果
+        
+        Args:
+            path_length: 路径长度
+            time_taken: 算法耗时(秒)
+            forward_expanded: 正向搜索扩展的节点数
+            backward_expanded: 反向搜索扩展的节点数
+        """
+        record = {
+            'algorithm': 'biastar',
+            'path_length': path_length,
+            'time_taken': time_taken,
+            'expanded_nodes': forward_expanded + backward_expanded,
+            'forward_expanded': forward_expanded,
+            'backward_expanded': backward_expanded
+        }
+        self._add_record('biastar', record)
+        print(f"已记录双向A*算法结果: 路径长度={path_length:.2f}, 耗时={time_taken:.2f}秒, 正向扩展={forward_expanded}, 反向扩展={backward_expanded}")
+    
+    def log_arastar_result(self, path_length, time_taken, weight, bound):
+        """记录ARA*算法的一个中间解
+        
+        Args:
+            path_length: 路径长度
+            time_taken: 得到该解时已消耗的搜索时间(秒)
+            weight: 得到该解时的启发式膨胀系数
+            bound: 该解的次优上界
+        """
+        record = {
+            'algorithm': 'arastar',
+            'path_length': path_length,
+            'time_taken': time_taken,
+            'weight': weight,
+            'suboptimality_bound': bound
+        }
+        self._add_record('arastar', record)
+        print(f"已记录ARA*算法结果: 路径长度={path_length:.2f}, 耗时={time_taken:.2f}秒, 次优上界={bound:.3f}")
+    
+    def log_dstar_result(self, path_length, time_taken, expanded_nodes, is_replan=False):
+        """记录D* Lite算法结果
+        
+        Args:
+            path_length: 路径长度
+            time_taken: 算法耗时(秒)
+            expanded_nodes: 本次规划扩展的节点数
+            is_replan: 是否为障碍物变化后的增量重规划
+        """
+        record = {
+            'algorithm': 'dstar',
+            'path_length': path_length,
+            'time_taken': time_taken,
+            'expanded_nodes': expanded_nodes,
+            'is_replan': is_replan
+        }
+        self._add_record('dstar', record)
+        print(f"已记录D* Lite算法结果: 路径长度={path_length:.2f}, 耗时={time_taken:.2f}秒, 扩展节点={expanded_nodes}")
+    
     def log_point_optimization(self, algorithm, original_points_count, optimized_points_count, original_path_length, optimized_path_length):
         """记录路径点优化结果
         
@@ -109,31 +213,74 @@ class ExcelLogger:
                 'original_path_length': original_path_length,
                 'optimized_path_length': optimized_path_length
             })
+            self._update_record(last_record)
             point_reduction = ((original_points_count - optimized_points_count) / original_points_count) * 100 if original_points_count > 0 else 0
             print(f"已记录{algorithm.upper()}算法路径点优化结果: 原始点数={original_points_count}, 优化后点数={optimized_points_count}, 点数减少={point_reduction:.2f}%")
         else:
             print(f"警告: 没有找到{algorithm.upper()}算法的记录，优化结果未记录")
     
+    def log_run_details(self, algorithm, details):
+        """在最近的记录中添加本次运行的附加信息(例如随机种子)
+        
+        Args:
+            algorithm: 算法名称
+            details: 附加信息字典，键为列名
+        """
+        if algorithm not in self.results or not self.results[algorithm]:
+            print(f"警告: 没有找到{algorithm}算法的记录，附加信息未记录")
+            return
+        self.results[algorithm][-1].update(details)
+        self._update_record(self.results[algorithm][-1])
+    
+    def log_convergence_trace(self, algorithm, seed, trace):
+        """记录一次运行的收敛曲线
+        
+        Args:
+            algorithm: 算法名称
+            seed: 本次运行的随机种子
+            trace: 按列存储的收敛曲线，包含 'time'、'iteration'、'tree_size'、'cost' 四列
+        """
+        rows = []
+        for time_taken, iteration, tree_size, cost in zip(trace['time'], trace['iteration'], trace['tree_size'], trace['cost']):
+            rows.append({
+                'algorithm': algorithm,
+                'seed': seed,
+                'time': time_taken,
+                'iteration': iteration,
+                'tree_size': tree_size,
+                'cost': cost
+            })
+        try:
+            self.store.append_trace(rows)
+        except Exception as e:
+            print(f"写入结果存储失败: {e}")
+        print(f"已记录{algorithm.upper()}算法收敛曲线: {len(trace['cost'])}个数据点")
+    
     def save_to_excel(self):
-        """将所有记录保存到Excel文件"""
+        """把结果存储中的所有记录（包括以前的运行）导出到Excel文件"""
         try:
-            # 合并所有算法的结果
-            all_results = []
-            for algo_results in self.results.values():
-                all_results.extend(algo_results)
-            
-            if not all_results:
+            # 保存到Excel，收敛曲线保存在单独的工作表中
+            if not self.store.export_excel(self.file_path):
                 print("没有数据可保存到Excel")
                 return
-            
-            # 创建DataFrame
-            df = pd.DataFrame(all_results)
-            
-            # 保存到Excel
-            df.to_excel(self.file_path, index=False)
             print(f"所有结果已成功保存到Excel文件: {self.file_path}")
         except Exception as e:
             print(f"保存到Excel文件失败: {e}")
 
-# 创建一个全局的ExcelLogger实例，方便在main.py中使用
-excel_logger = ExcelLogger()
\ No newline at end of file
+_excel_logger = None
+
+def get_excel_logger():
+    """获取全局的ExcelLogger实例，第一次调用时才创建"""
+    global _excel_logger
+    if _excel_logger is None:
+        _excel_logger = ExcelLogger()
+    return _excel_logger
+
+class LazyExcelLogger:
+    """全局ExcelLogger的代理：第一次记录或导出结果时才创建ExcelLogger，导入本模块时不做任何文件读写"""
+    
+    def __getattr__(self, name):
+        return getattr(get_excel_logger(), name)
+
+# 创建一个全局的ExcelLogger代理，方便在main.py中使用
+excel_logger = LazyExcelLogger()
\ No newline at end of file
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+
+# 微基准测试：测量几何计算和搜索中最常调用的基本函数在不同障碍物数量和树规模下的耗时，
+# 可以把结果保存为基准文件，之后再次运行时与基准比较并标记性能退化
+
+# 导入必要的库
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from constants import (
+    GAME_X, GAME_Y, GAME_WIDTH, GAME_HEIGHT, GRID_SIZE, STEP_SIZE, REWIRE_RADIUS, MICRO_BENCHMARK_BASELINE_FILE,
+    MICRO_BENCHMARK_REPEAT, MICRO_BENCHMARK_WARMUP, MICRO_BENCHMARK_THRESHOLD
+)
+from utils import get_distance, get_line_points, is_collision_free, get_random_point_in_game_area
+from astar_algorithm import (
+    game_to_grid, heuristic, is_in_obstacle, get_neighbors, a_star_step, build_blocked_grid
+)
+from rrt_star_algorithm import run_rrt_star_step, update_descendant_costs
+
+# 测试参数：障碍物数量和 RRT* 树规模
+OBSTACLE_COUNTS = [0, 50, 200, 800]
+TREE_SIZES = [100, 500, 1000]
+# 线段长度：RRT 扩展步长、重连半径和长距离连线（路径删减）
+SEGMENT_LENGTHS = [STEP_SIZE, REWIRE_RADIUS, 200]
+# 随机数种子，保证每次运行的测试输入相同
+BENCHMARK_SEED = 0
+
+def measure(func, setup=None, number=100, repeat=MICRO_BENCHMARK_REPEAT, warmup=MICRO_BENCHMARK_WARMUP):
+    """
+    测量函数的单次调用耗时
+    :param func: 被测函数，参数为 setup 返回的状态和调用序号
+    :param setup: 每轮测量前调用的准备函数，返回传给 func 的状态（不计入耗时）
+    :param number: 每轮调用 func 的次数
+    :param repeat: 正式测量的轮数
+    :param warmup: 预热的轮数（不记录结果）
+    :return: 统计字典（单次调用耗时，单位为秒）
+    """
+    samples = []
+    for round_index in range(warmup + repeat):
+        state = setup() if setup else None
+        start_time = time.perf_counter()
+        for i in range(number):
+            func(state, i)
+        elapsed = (time.perf_counter() - start_time) / number
+        if round_index >= warmup:
+            samples.append(elapsed)
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'number': number,
+        'repeat': repeat
+    }
+
+def random_obstacles(rng, count):
+    """
+    在游戏区域内生成随机障碍物
+    :param rng: 随机数生成器
+    :param count: 障碍物数量
+    :return: 障碍物列表
+    """
+    return [(rng.randint(GAME_X, GAME_X + GAME_WIDTH - 1), rng.randint(GAME_Y, GAME_Y + GAME_HEIGHT - 1))
+            for _ in range(count)]
+
+def random_segments(rng, count, length):
+    """
+    在游戏区域内生成指定长度的随机线段
+    :param rng: 随机数生成器
+    :param count: 线段数量
+    :param length: 线段长度
+    :return: 线段列表 [(p1, p2), ...]
+    """
+    segments = []
+    while len(segments) < count:
+        p1 = (rng.randint(GAME_X, GAME_X + GAME_WIDTH - 1), rng.randint(GAME_Y, GAME_Y + GAME_HEIGHT - 1))
+        dx = rng.uniform(-1, 1)
+        dy = rng.uniform(-1, 1)
+        norm = (dx * dx + dy * dy) ** 0.5
+        if norm == 0:
+            continue
+        p2 = (int(p1[0] + dx / norm * length), int(p1[1] + dy / norm * length))
+        if GAME_X <= p2[0] < GAME_X + GAME_WIDTH and GAME_Y <= p2[1] < GAME_Y + GAME_HEIGHT:
+            segments.append((p1, p2))
+    return segments
+
+# 已构建的 RRT* 树缓存，键为障碍物数量
+_tree_cache = {}
+
+def get_rrt_star_trees(obstacle_count):
+    """
+    使用 RRT* 在随机障碍物地图上构建一棵树，并在树达到 TREE_SIZES 中的每个规模时保存快照；
+    结果会被缓存，多个测试共用同一组树
+    :param obstacle_count: 障碍物数量
+    :return: (obstacles, start_node, end_node, trees)，trees 的键为树规模，值为 (parent_map, cost_map)
+    """
+    if obstacle_count in _tree_cache:
+        return _tree_cache[obstacle_count]
+    obstacles = random_obstacles(random.Random(BENCHMARK_SEED + obstacle_count), obstacle_count)
+    tree_rng = random.Random(BENCHMARK_SEED)
+    start_node = (GAME_X + 20, GAME_Y + 20)
+    end_node = (GAME_X + GAME_WIDTH - 20, GAME_Y + GAME_HEIGHT - 20)
+    obstacles = [obstacle for obstacle in obstacles if get_distance(obstacle, start_node) > 30]
+    parent_map = {start_node: None}
+    cost_map = {start_node: 0}
+    trees = {}
+    for size in sorted(TREE_SIZES):
+        while len(parent_map) < size:
+            run_rrt_star_step(parent_map, cost_map, get_random_point_in_game_area(tree_rng), STEP_SIZE, REWIRE_RADIUS,
+                              obstacles, start_node, end_node)
+        trees[size] = (dict(parent_map), dict(cost_map))
+    _tree_cache[obstacle_count] = (obstacles, start_node, end_node, trees)
+    return _tree_cache[obstacle_count]
+
+def benchmark_get_distance(rng):
+    points = [((rng.randint(0, 800), rng.randint(0, 600)), (rng.randint(0, 800), rng.randint(0, 600))) for _ in range(1000)]
+    yield 'get_distance', {}, measure(lambda s, i: get_distance(*points[i]), number=1000)
+
+def benchmark_get_line_points(rng):
+    for length in SEGMENT_LENGTHS:
+        segments = random_segments(rng, 500, length)
+        yield 'get_line_points', {'length': length}, measure(lambda s, i: get_line_points(*segments[i]), number=500)
+
+def benchmark_is_collision_free(rng):
+    for count in OBSTACLE_COUNTS:
+        obstacles = random_obstacles(rng, count)
+        for length in SEGMENT_LENGTHS:
+            segments = random_segments(rng, 50, length)
+            yield ('is_collision_free', {'obstacles': count, 'length': length},
+                   measure(lambda s, i: is_collision_free(segments[i][0], segments[i][1], obstacles), number=50))
+
+def benchmark_is_in_obstacle(rng):
+    grid_width = GAME_WIDTH // GRID_SIZE
+    grid_height = GAME_HEIGHT // GRID_SIZE
+    cells = [(rng.randrange(grid_width), rng.randrange(grid_height)) for _ in range(1000)]
+    for count in OBSTACLE_COUNTS:
+        obstacles = random_obstacles(rng, count)
+        yield ('is_in_obstacle', {'obstacles': count},
+               measure(lambda s, i: is_in_obstacle(cells[i], obstacles), number=1000))
+
+def benchmark_get_neighbors(rng):
+    grid_width = GAME_WIDTH // GRID_SIZE
+    grid_height = GAME_HEIGHT // GRID_SIZE
+    cells = [(rng.randrange(grid_width), rng.randrange(grid_height)) for _ in range(1000)]
+    yield 'get_neighbors', {}, measure(lambda s, i: get_neighbors(cells[i], grid_width, grid_height), number=1000)
+
+def benchmark_a_star_step(rng):
+    grid_width = GAME_WIDTH // GRID_SIZE
+    grid_height = GAME_HEIGHT // GRID_SIZE
+    start_node = (GAME_X + 20, GAME_Y + 20)
+    end_node = (GAME_X + GAME_WIDTH - 20, GAME_Y + GAME_HEIGHT - 20)
+    start_grid = game_to_grid(start_node)
+    end_grid = game_to_grid(end_node)
+
+    def setup():
+        f = heuristic(start_grid, end_grid)
+        return {'open_set': [(f, 0, start_grid)], 'closed_set': set(), 'came_from': {},
+                'g_score': {start_grid: 0}, 'f_score': {start_grid: f}}
+
+    for count in OBSTACLE_COUNTS:
+        obstacles = [obstacle for obstacle in random_obstacles(rng, count)
+                     if get_distance(obstacle, start_node) > 30 and get_distance(obstacle, end_node) > 30]
+        blocked_grid = build_blocked_grid(obstacles, grid_width, grid_height)
+        for use_blocked_grid in (False, True):
+            grid = blocked_grid if use_blocked_grid else None
+
+            def step(s, i, grid=grid, obstacles=obstacles):
+                a_star_step(s['open_set'], s['closed_set'], s['came_from'], s['g_score'], s['f_score'],
+                            start_grid, end_grid, obstacles, grid_width, grid_height, grid)
+
+            # 从头开始扩展 200 个节点，测量每步的平均耗时
+            yield ('a_star_step', {'obstacles': count, 'blocked_grid': use_blocked_grid},
+                   measure(step, setup, number=200))
+
+def benchmark_run_rrt_star_step(rng):
+    for count in OBSTACLE_COUNTS[:3]:
+        obstacles, start_node, end_node, trees = get_rrt_star_trees(count)
+        for size in TREE_SIZES:
+            parent_map, cost_map = trees[size]
+            targets = [(rng.randint(GAME_X + 1, GAME_X + GAME_WIDTH - 1), rng.randint(GAME_Y + 1, GAME_Y + GAME_HEIGHT - 1))
+                       for _ in range(20)]
+
+            def setup(parent_map=parent_map, cost_map=cost_map):
+                # 每轮从相同的树开始扩展
+                return dict(parent_map), dict(cost_map)
+
+            def step(s, i, targets=targets, obstacles=obstacles, start_node=start_node, end_node=end_node):
+                run_rrt_star_step(s[0], s[1], targets[i], STEP_SIZE, REWIRE_RADIUS, obstacles, start_node, end_node)
+
+            yield ('run_rrt_star_step', {'obstacles': count, 'tree_size': size}, measure(step, setup, number=20))
+
+def benchmark_update_descendant_costs(rng):
+    count = OBSTACLE_COUNTS[1]
+    obstacles, start_node, _, trees = get_rrt_star_trees(count)
+    for size in TREE_SIZES:
+        parent_map, cost_map = trees[size]
+        nodes = [node for node in parent_map if node != start_node]
+        chosen = [rng.choice(nodes) for _ in range(20)]
+
+        def setup(cost_map=cost_map):
+            return dict(cost_map)
+
+        def step(s, i, parent_map=parent_map, chosen=chosen, obstacles=obstacles):
+            # 降低节点成本，使其所有后代都需要更新
+            node = chosen[i]
+            s[node] -= 1
+            update_descendant_costs(node, parent_map, s, obstacles)
+
+        yield ('update_descendant_costs', {'obstacles': count, 'tree_size': size}, measure(step, setup, number=20))
+
+# 所有微基准测试
+BENCHMARKS = [
+    benchmark_get_distance,
+    benchmark_get_line_points,
+    benchmark_is_collision_free,
+    benchmark_is_in_obstacle,
+    benchmark_get_neighbors,
+    benchmark_a_star_step,
+    benchmark_run_rrt_star_step,
+    benchmark_update_descendant_costs
+]
+
+def get_case_name(name, params):
+    """
+    生成测试用例名称，例如 is_collision_free[obstacles=200,length=10]
+    :param name: 被测函数名称
+    :param params: 参数字典
+    :return: 用例名称
+    """
+    if not params:
+        return name
+    return name + '[' + ','.join(f"{key}={value}" for key, value in params.items()) + ']'
+
+def run_benchmarks(name_filter=None):
+    """
+    运行所有（或名称匹配的）微基准测试
+    :param name_filter: 只运行名称包含该字符串的测试，None 表示全部运行
+    :return: 字典，键为用例名称，值为统计字典
+    """
+    results = {}
+    for benchmark in BENCHMARKS:
+        if name_filter and name_filter not in benchmark.__name__:
+            continue
+        # 每个测试使用独立的随机数生成器，结果与运行的测试子集无关
+        rng = random.Random(BENCHMARK_SEED)
+        for name, params, stats in benchmark(rng):
+            case = get_case_name(name, params)
+            results[case] = stats
+            print(f"{case:<60}{stats['min'] * 1e6:>12.2f}µs{stats['median'] * 1e6:>12.2f}µs ±{stats['stdev'] * 1e6:.2f}")
+    return results
+
+def compare_with_baseline(results, baseline, threshold=MICRO_BENCHMARK_THRESHOLD):
+    """
+    与基准结果比较（使用每轮最小耗时，受系统噪声影响最小）
+    :param results: 本次测试结果
+    :param baseline: 基准测试结果
+    :param threshold: 变慢超过该比例时标记为退化
+    :return: 退化的用例列表 [(用例名称, 基准耗时, 本次耗时), ...]
+    """
+    regressions = []
+    for case, stats in results.items():
+        if case not in baseline:
+            continue
+        old_time = baseline[case]['min']
+        new_time = stats['min']
+        ratio = new_time / old_time if old_time > 0 else 1.0
+        if ratio > 1 + threshold:
+            regressions.append((case, old_time, new_time))
+            mark = "退化"
+        elif ratio < 1 - threshold:
+            mark = "改善"
+        else:
+            mark = ""
+        print(f"{case:<60}{old_time * 1e6:>12.2f}µs -> {new_time * 1e6:>10.2f}µs {ratio:>6.2f}x {mark}")
+    return regressions
+
+def main():
+    """
+    命令行入口，例如
+    python micro_benchmark.py --save-baseline      # 保存基准
+    python micro_benchmark.py                      # 与基准比较，存在退化时返回非零退出码
+    """
+    parser = argparse.ArgumentParser(description="几何计算和搜索基本函数的微基准测试")
+    parser.add_argument('--baseline', default=MICRO_BENCHMARK_BASELINE_FILE, help="基准结果文件")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果保存为新的基准")
+    parser.add_argument('--threshold', type=float, default=MICRO_BENCHMARK_THRESHOLD, help="判定为退化的变慢比例")
+    parser.add_argument('--filter', default=None, help="只运行名称包含该字符串的测试")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter)
+
+    if args.save_baseline:
+        baseline = {}
+        # 只运行部分测试时保留其他用例的基准
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"基准已保存: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"没有找到基准文件 {args.baseline}，请先使用 --save-baseline 保存基准")
+        return
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n与基准比较（阈值 {args.threshold:.0%}）：")
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"发现 {len(regressions)} 个性能退化的用例")
+        sys.exit(1)
+    print("没有发现性能退化")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,562 @@
+# -*- coding: utf-8 -*-
+
+# 栅格占据地图：从 PNG/PGM 图像或原始二进制占据文件导入障碍物。
+# PGM（P5）和原始文件通过 numpy.memmap 映射，碰撞检测和网格搜索只读取实际访问到的像素，
+# 数十亿像素的场地地图也不需要整体载入内存；PNG 是压缩格式，只能逐行解码到内存中，
+# 大图可以先用 convert 命令逐行转换为 PGM 再映射
+
+# 导入必要的库
+import argparse
+import mmap
+import os
+import struct
+import zlib
+import numpy as np
+from constants import GAME_X, GAME_Y, SCENARIO_DIR, OCCUPANCY_IMAGE_THRESHOLD, OCCUPANCY_RAW_THRESHOLD
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# PNG 颜色类型对应的通道数（0 灰度、2 RGB、3 调色板、4 灰度+透明度、6 RGBA）
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# 解码 PNG 时每次最多解压的字节数，避免高压缩比的大图一次解压出巨大的缓冲区
+PNG_DECOMPRESS_CHUNK = 1 << 20
+# 根据扩展名判断地图格式，其他扩展名按原始二进制占据文件处理
+MAP_FORMATS = {'.png': 'png', '.pgm': 'pgm'}
+
+class OccupancyGrid:
+    """
+    栅格占据地图：data 是形状为 (height, width) 的 uint8 数组（numpy.memmap 或内存中的数组），
+    occupied 是 256 项的查找表，把像素值映射为是否被占据；地图左上角位于游戏坐标 origin，一个像素对应一个游戏坐标单位
+    """
+
+    def __init__(self, data, occupied, source, filename=None, offset=0, origin=(GAME_X, GAME_Y)):
+        """
+        :param data: 像素数组，形状为 (height, width)
+        :param occupied: 长度为 256 的布尔数组，occupied[像素值] 表示该像素是否被占据
+        :param source: 读取参数字典（'file'、'format'、'threshold' 等），保存场景时写入场景文件
+        :param filename: 映射的文件路径，None 表示像素数据在内存中
+        :param offset: 像素数据在映射文件中的起始位置（字节）
+        :param origin: 地图左上角的游戏坐标
+        """
+        self.data = data
+        self.height, self.width = data.shape
+        self.occupied = occupied
+        self.source = source
+        self.filename = filename
+        self.offset = offset
+        self.origin = origin
+
+    def __getstate__(self):
+        # 传给后台进程时只传递映射参数，在子进程中重新映射文件，而不是复制整个数组
+        state = self.__dict__.copy()
+        if self.filename is not None:
+            state['data'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.data is None:
+            self.data = map_file(self.filename, self.width, self.height, self.offset)
+
+    def is_occupied(self, x, y):
+        """
+        检查游戏坐标处的像素是否被占据
+        :param x: x 坐标
+        :param y: y 坐标
+        :return: 被占据或位于地图外时返回 True
+        """
+        x -= self.origin[0]
+        y -= self.origin[1]
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True
+        return bool(self.occupied[self.data[y, x]])
+
+    def are_points_free(self, points):
+        """
+        检查一组点是否全部位于地图内的空闲像素上（只读取这些点所在的像素）
+        :param points: 游戏坐标点列表（例如 get_line_points 的结果）
+        :return: 全部空闲返回 True，否则返回 False
+        """
+        points = np.asarray(points)
+        xs = points[:, 0] - self.origin[0]
+        ys = points[:, 1] - self.origin[1]
+        if xs.min() < 0 or ys.min() < 0 or xs.max() >= self.width or ys.max() >= self.height:
+            return False
+        return not self.occupied[self.data[ys, xs]].any()
+
+    def is_region_occupied(self, x0, y0, x1, y1):
+        """
+        检查游戏坐标矩形 [x0, x1) x [y0, y1) 内是否有被占据的像素
+        :return: 有被占据的像素或矩形超出地图时返回 True
+        """
+        x0 -= self.origin[0]
+        x1 -= self.origin[0]
+        y0 -= self.origin[1]
+        y1 -= self.origin[1]
+        if x0 < 0 or y0 < 0 or x1 > self.width or y1 > self.height:
+            return True
+        return bool(self.occupied[self.data[y0:y1, x0:x1]].any())
+
+    def is_cell_occupied(self, grid_pos, grid_size):
+        """
+        检查网格覆盖的像素中是否有被占据的像素（网格原点与地图左上角重合）
+        :param grid_pos: 网格坐标 (x, y)
+        :param grid_size: 网格边长（像素）
+        :return: 被占据返回 True
+        """
+        x0 = self.origin[0] + grid_pos[0] * grid_size
+        y0 = self.origin[1] + grid_pos[1] * grid_size
+        return self.is_region_occupied(x0, y0, x0 + grid_size, y0 + grid_size)
+
+    def get_cell_grid(self, grid_width, grid_height, grid_size):
+        """
+        创建按需读取地图的网格阻挡查找表
+        :param grid_width: 网格宽度
+        :param grid_height: 网格高度
+        :param grid_size: 网格边长（像素）
+        :return: OccupancyCells 对象
+        """
+        return OccupancyCells(self, grid_width, grid_height, grid_size)
+
+    def count_occupied(self, block_pixels=1 << 24):
+        """
+        分块统计被占据的像素数（每次只读取约 block_pixels 个像素）
+        :param block_pixels: 每块的像素数
+        :return: 被占据的像素数
+        """
+        block_rows = max(1, block_pixels // self.width)
+        total = 0
+        for y in range(0, self.height, block_rows):
+            total += int(np.count_nonzero(self.occupied[self.data[y:y + block_rows]]))
+        return total
+
+    def to_rgb_bytes(self):
+        """
+        转换为 RGB 像素数据（被占据为黑色，空闲为白色），用于在界面中绘制整幅地图
+        :return: 长度为 width * height * 3 的 bytes
+        """
+        gray = np.where(self.occupied[self.data], 0, 255).astype(np.uint8)
+        return np.repeat(gray[:, :, None], 3, axis=2).tobytes()
+
+    def to_record(self, directory=''):
+        """
+        转换为场景文件中的 'map' 项，地图文件路径保存为相对于场景文件所在目录的路径
+        :param directory: 场景文件所在目录
+        :return: 读取参数字典
+        """
+        record = dict(self.source)
+        try:
+            record['file'] = os.path.relpath(record['file'], directory or '.')
+        except ValueError:
+            # Windows 上地图与场景文件不在同一个驱动器时保存绝对路径
+            record['file'] = os.path.abspath(record['file'])
+        return record
+
+    def get_fingerprint(self):
+        """
+        用于计算场景哈希的地图标识（文件名、格式、阈值和尺寸，不读取像素数据）
+        :return: 字典
+        """
+        return dict(self.source, file=os.path.basename(self.source['file']), width=self.width, height=self.height)
+
+class OccupancyCells:
+    """
+    网格搜索使用的阻挡查找表：与 build_blocked_grid 返回的 bytearray 一样按下标 y * grid_width + x 读写，
+    但第一次访问某个网格时才从占据地图读取该网格覆盖的像素，结果缓存在状态表中
+    （0 未读取、1 空闲、2 占据）。状态表是私有匿名内存映射，初始内容为零且不逐页清零，
+    操作系统只在第一次写入某个内存页时才为它分配物理内存；私有映射计入 RLIMIT_DATA，
+    批量测试的内存上限同样约束这张表（Windows 上没有 MAP_PRIVATE，使用默认的匿名映射）
+    """
+
+    def __init__(self, occupancy, grid_width, grid_height, grid_size):
+        """
+        :param occupancy: OccupancyGrid 对象
+        :param grid_width: 网格宽度
+        :param grid_height: 网格高度
+        :param grid_size: 网格边长（像素）
+        """
+        self.occupancy = occupancy
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.grid_size = grid_size
+        # bytearray(n) 会立即清零并占用全部 n 字节，大地图的网格数可达数千万；
+        # 默认的匿名映射是 MAP_SHARED（共享内存），不计入 RLIMIT_DATA，因此显式使用私有映射
+        size = max(1, grid_width * grid_height)
+        if hasattr(mmap, 'MAP_PRIVATE'):
+            self.states = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+        else:
+            self.states = mmap.mmap(-1, size)
+
+    def __len__(self):
+        return self.grid_width * self.grid_height
+
+    def __getitem__(self, index):
+        state = self.states[index]
+        if not state:
+            cell = (index % self.grid_width, index // self.grid_width)
+            state = 2 if self.occupancy.is_cell_occupied(cell, self.grid_size) else 1
+            self.states[index] = state
+        return state >> 1
+
+    def __setitem__(self, index, value):
+        # 标记手绘障碍物覆盖的网格；清除标记后下次访问时重新从地图读取
+        self.states[index] = 2 if value else 0
+
+# 地图读取
+
+def map_file(filename, width, height, offset=0):
+    """
+    把文件中的像素数据映射为只读数组，只有被访问的部分才会从磁盘读取
+    :param filename: 文件路径
+    :param width: 地图宽度（像素）
+    :param height: 地图高度（像素）
+    :param offset: 像素数据的起始位置（字节）
+    :return: 形状为 (height, width) 的 numpy.memmap
+    """
+    size = os.path.getsize(filename)
+    if size < offset + width * height:
+        raise ValueError(f"文件 {filename} 只有 {size} 字节，不足 {width}x{height} 像素")
+    return np.memmap(filename, dtype=np.uint8, mode='r', offset=offset, shape=(height, width))
+
+def make_lookup(threshold, below, maxval=255):
+    """
+    创建像素值到占据状态的查找表
+    :param threshold: 阈值
+    :param below: True 表示低于阈值的像素被占据（图像，黑色为障碍物），False 表示大于等于阈值的像素被占据（原始文件）
+    :param maxval: 像素的最大值，图像像素先按比例换算到 0~255 再与阈值比较
+    :return: 长度为 256 的布尔数组
+    """
+    values = np.arange(256)
+    if below:
+        return values * 255 // maxval < threshold
+    return values >= threshold
+
+def read_pgm_header(f):
+    """
+    读取二进制 PGM（P5）文件头
+    :param f: 以二进制模式打开的文件
+    :return: (width, height, maxval, offset)，offset 为像素数据的起始位置
+    """
+    data = f.read(4096)
+    tokens = []
+    pos = 0
+    while len(tokens) < 4:
+        # 跳过空白和注释
+        while pos < len(data) and (data[pos:pos + 1].isspace() or data[pos:pos + 1] == b'#'):
+            if data[pos:pos + 1] == b'#':
+                pos = data.find(b'\n', pos)
+                if pos < 0:
+                    raise ValueError("PGM 文件头不完整")
+            pos += 1
+        start = pos
+        while pos < len(data) and not data[pos:pos + 1].isspace():
+            pos += 1
+        if pos <= start or pos >= len(data):
+            raise ValueError("PGM 文件头不完整")
+        tokens.append(data[start:pos])
+    if tokens[0] != b'P5':
+        raise ValueError(f"只支持二进制 PGM（P5）文件，文件类型为 {tokens[0]!r}")
+    width, height, maxval = (int(token) for token in tokens[1:])
+    if not 0 < maxval < 256:
+        raise ValueError(f"只支持 8 位 PGM 文件，最大像素值为 {maxval}")
+    # 最大像素值之后恰好有一个空白字符
+    return width, height, maxval, pos + 1
+
+def load_pgm(filename, threshold=OCCUPANCY_IMAGE_THRESHOLD):
+    """
+    映射 PGM 图像（黑色为障碍物）
+    :param filename: 文件路径
+    :param threshold: 灰度低于该值的像素视为障碍物
+    :return: OccupancyGrid 对象
+    """
+    with open(filename, 'rb') as f:
+        width, height, maxval, offset = read_pgm_header(f)
+    data = map_file(filename, width, height, offset)
+    source = {'file': filename, 'format': 'pgm', 'threshold': threshold}
+    return OccupancyGrid(data, make_lookup(threshold, True, maxval), source, filename, offset)
+
+def load_raw(filename, width, height, offset=0, threshold=OCCUPANCY_RAW_THRESHOLD):
+    """
+    映射原始二进制占据文件（每个像素一个字节，按行存储，没有文件头）
+    :param filename: 文件路径
+    :param width: 地图宽度（像素）
+    :param height: 地图高度（像素）
+    :param offset: 像素数据的起始位置（字节）
+    :param threshold: 大于等于该值的字节视为障碍物
+    :return: OccupancyGrid 对象
+    """
+    data = map_file(filename, width, height, offset)
+    source = {'file': filename, 'format': 'raw', 'threshold': threshold, 'width': width, 'height': height,
+              'offset': offset}
+    return OccupancyGrid(data, make_lookup(threshold, False), source, filename, offset)
+
+def read_png_chunk(f):
+    """
+    读取一个 PNG 数据块并校验 CRC
+    :param f: 以二进制模式打开的文件
+    :return: (chunk_type, data)
+    """
+    header = f.read(8)
+    if len(header) < 8:
+        raise ValueError("PNG 文件不完整")
+    length, chunk_type = struct.unpack('>I4s', header)
+    data = f.read(length)
+    crc = f.read(4)
+    if len(data) < length or len(crc) < 4 or zlib.crc32(chunk_type + data) != struct.unpack('>I', crc)[0]:
+        raise ValueError(f"PNG 数据块 {chunk_type!r} 损坏")
+    return chunk_type, data
+
+def rgb_to_gray(rgb):
+    """
+    把 RGB 像素转换为灰度
+    :param rgb: 形状为 (n, 3) 的 uint8 数组
+    :return: 长度为 n 的 uint8 数组
+    """
+    rgb = rgb.astype(np.uint32)
+    return ((rgb[:, 0] * 299 + rgb[:, 1] * 587 + rgb[:, 2] * 114) // 1000).astype(np.uint8)
+
+def unfilter_png_row(filter_type, row, previous, bpp):
+    """
+    还原一行的 PNG 滤波（原地修改 row）
+    :param filter_type: 滤波类型（0 None、1 Sub、2 Up、3 Average、4 Paeth）
+    :param row: 本行滤波后的字节（uint8 数组）
+    :param previous: 上一行还原后的字节
+    :param bpp: 一个像素的字节数（不足一个字节时为 1）
+    """
+    if filter_type == 0:
+        return
+    if filter_type == 1:
+        # 每个通道分别累加，uint8 加法自动按 256 取模
+        row[:] = np.cumsum(row.reshape(-1, bpp), axis=0, dtype=np.uint8).reshape(-1)
+        return
+    if filter_type == 2:
+        row += previous
+        return
+    if filter_type not in (3, 4):
+        raise ValueError(f"未知的 PNG 滤波类型: {filter_type}")
+    # Average 和 Paeth 依赖本行左侧已还原的字节，只能逐字节计算
+    r = row.tolist()
+    p = previous.tolist()
+    for i in range(len(r)):
+        a = r[i - bpp] if i >= bpp else 0
+        b = p[i]
+        if filter_type == 3:
+            r[i] = (r[i] + ((a + b) >> 1)) & 0xFF
+            continue
+        c = p[i - bpp] if i >= bpp else 0
+        pa = abs(b - c)
+        pb = abs(a - c)
+        pc = abs(a + b - 2 * c)
+        if pa <= pb and pa <= pc:
+            r[i] = (r[i] + a) & 0xFF
+        elif pb <= pc:
+            r[i] = (r[i] + b) & 0xFF
+        else:
+            r[i] = (r[i] + c) & 0xFF
+    row[:] = r
+
+def png_row_to_gray(row, width, bit_depth, color_type, palette):
+    """
+    把还原后的一行像素转换为 8 位灰度（透明度通道被忽略，16 位采样只保留高字节）
+    :return: 长度为 width 的 uint8 数组
+    """
+    if bit_depth < 8:
+        shifts = np.arange(8 - bit_depth, -1, -bit_depth, dtype=np.uint8)
+        values = ((row[:, None] >> shifts) & ((1 << bit_depth) - 1)).reshape(-1)[:width]
+        if color_type == 3:
+            return palette[values]
+        return values * (255 // ((1 << bit_depth) - 1))
+    if bit_depth == 16:
+        row = row[0::2]
+    pixels = row.reshape(width, PNG_CHANNELS[color_type])
+    if color_type == 3:
+        return palette[pixels[:, 0]]
+    if color_type in (0, 4):
+        return pixels[:, 0].copy()
+    return rgb_to_gray(pixels[:, :3])
+
+def read_png(filename):
+    """
+    读取 PNG 图像，按行解码并转换为 8 位灰度（支持所有颜色类型和色深，不支持隔行扫描）
+    :param filename: 文件路径
+    :return: (width, height, rows)，rows 是逐行生成 uint8 灰度数组的生成器
+    """
+    f = open(filename, 'rb')
+    try:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError(f"不是 PNG 文件: {filename}")
+        chunk_type, data = read_png_chunk(f)
+        if chunk_type != b'IHDR':
+            raise ValueError("PNG 文件缺少 IHDR 数据块")
+        width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', data)
+        if color_type not in PNG_CHANNELS or bit_depth not in (1, 2, 4, 8, 16) or (
+                bit_depth < 8 and color_type not in (0, 3)):
+            raise ValueError(f"不支持的 PNG 格式: 颜色类型 {color_type}，色深 {bit_depth}")
+        if interlace:
+            raise ValueError("不支持隔行扫描的 PNG 图像")
+    except Exception:
+        f.close()
+        raise
+    return width, height, _iter_png_rows(f, width, height, bit_depth, color_type)
+
+def _iter_png_rows(f, width, height, bit_depth, color_type):
+    """
+    逐块解压 IDAT 数据并逐行还原，内存中最多只保留一个解压块和上一行
+    :return: uint8 灰度数组生成器
+    """
+    bits_per_pixel = bit_depth * PNG_CHANNELS[color_type]
+    bpp = max(1, bits_per_pixel // 8)
+    stride = (width * bits_per_pixel + 7) // 8
+    palette = None
+    decompressor = zlib.decompressobj()
+    pending = bytearray()
+    previous = np.zeros(stride, dtype=np.uint8)
+    produced = 0
+    with f:
+        while produced < height:
+            chunk_type, data = read_png_chunk(f)
+            if chunk_type == b'PLTE':
+                palette = np.zeros(256, dtype=np.uint8)
+                colors = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+                palette[:len(colors)] = rgb_to_gray(colors)
+            elif chunk_type == b'IDAT':
+                if color_type == 3 and palette is None:
+                    raise ValueError("PNG 调色板图像缺少 PLTE 数据块")
+                while data and produced < height:
+                    pending += decompressor.decompress(data, PNG_DECOMPRESS_CHUNK)
+                    data = decompressor.unconsumed_tail
+                    while len(pending) > stride and produced < height:
+                        row = np.array(pending[1:stride + 1], dtype=np.uint8)
+                        unfilter_png_row(pending[0], row, previous, bpp)
+                        del pending[:stride + 1]
+                        previous = row
+                        produced += 1
+                        yield png_row_to_gray(row, width, bit_depth, color_type, palette)
+            elif chunk_type == b'IEND':
+                raise ValueError(f"PNG 图像数据不完整: 只有 {produced}/{height} 行")
+
+def load_png(filename, threshold=OCCUPANCY_IMAGE_THRESHOLD):
+    """
+    解码 PNG 图像到内存（黑色为障碍物）；超出内存的大图请先用 convert_png_to_pgm 转换为 PGM
+    :param filename: 文件路径
+    :param threshold: 灰度低于该值的像素视为障碍物
+    :return: OccupancyGrid 对象
+    """
+    width, height, rows = read_png(filename)
+    data = np.empty((height, width), dtype=np.uint8)
+    for y, row in enumerate(rows):
+        data[y] = row
+    source = {'file': filename, 'format': 'png', 'threshold': threshold}
+    return OccupancyGrid(data, make_lookup(threshold, True), source)
+
+def convert_png_to_pgm(src, dst):
+    """
+    把 PNG 图像逐行转换为 8 位 PGM（之后可以用 load_pgm 映射），转换过程中内存中只保留一行
+    :param src: PNG 文件路径
+    :param dst: PGM 文件路径
+    :return: (width, height)
+    """
+    width, height, rows = read_png(src)
+    temp_filename = dst + '.tmp'
+    with open(temp_filename, 'wb') as f:
+        f.write(f"P5\n{width} {height}\n255\n".encode('ascii'))
+        for row in rows:
+            f.write(row.tobytes())
+    os.replace(temp_filename, dst)
+    return width, height
+
+def load_occupancy_map(filename, fmt=None, threshold=None, width=None, height=None, offset=0):
+    """
+    按格式读取占据地图
+    :param filename: 文件路径
+    :param fmt: 'png'、'pgm' 或 'raw'，None 表示按扩展名判断（.png、.pgm 以外的文件视为原始占据文件）
+    :param threshold: 占据阈值，None 表示使用 constants.py 中对应格式的缺省值
+    :param width: 原始占据文件的宽度（像素）
+    :param height: 原始占据文件的高度（像素）
+    :param offset: 原始占据文件中像素数据的起始位置（字节）
+    :return: OccupancyGrid 对象
+    """
+    fmt = fmt or MAP_FORMATS.get(os.path.splitext(filename)[1].lower(), 'raw')
+    if fmt == 'png':
+        return load_png(filename, OCCUPANCY_IMAGE_THRESHOLD if threshold is None else threshold)
+    if fmt == 'pgm':
+        return load_pgm(filename, OCCUPANCY_IMAGE_THRESHOLD if threshold is None else threshold)
+    if fmt == 'raw':
+        if width is None or height is None:
+            raise ValueError("原始占据文件需要指定宽度和高度")
+        return load_raw(filename, width, height, offset, OCCUPANCY_RAW_THRESHOLD if threshold is None else threshold)
+    raise ValueError(f"未知的地图格式: {fmt}")
+
+def load_map_record(record, directory=''):
+    """
+    根据场景文件中的 'map' 项读取地图
+    :param record: to_record 返回的读取参数字典
+    :param directory: 场景文件所在目录（相对路径相对于该目录）
+    :return: OccupancyGrid 对象
+    """
+    filename = record['file']
+    if not os.path.isabs(filename):
+        filename = os.path.join(directory, filename)
+    return load_occupancy_map(filename, record.get('format'), record.get('threshold'), record.get('width'),
+                              record.get('height'), record.get('offset', 0))
+
+def parse_point(text):
+    """
+    解析命令行中的坐标，例如 "40,60"
+    :param text: 坐标字符串
+    :return: 坐标 (x, y)
+    """
+    x, y = text.split(',')
+    return (int(x), int(y))
+
+def main():
+    """
+    命令行入口，例如
+    python occupancy_map.py convert site.png site.pgm
+    python occupancy_map.py scenario site.pgm --start 40,40 --end 1800,1200
+    """
+    parser = argparse.ArgumentParser(description="导入栅格占据地图")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    info_parser = subparsers.add_parser('info', help="显示地图尺寸和障碍物比例")
+    convert_parser = subparsers.add_parser('convert', help="把 PNG 图像逐行转换为可以映射的 PGM 文件")
+    convert_parser.add_argument('src', help="PNG 文件")
+    convert_parser.add_argument('dst', help="输出的 PGM 文件")
+    scenario_parser = subparsers.add_parser('scenario', help="创建使用该地图的场景文件")
+    scenario_parser.add_argument('--start', type=parse_point, required=True, help="起点（地图像素坐标 x,y）")
+    scenario_parser.add_argument('--end', type=parse_point, required=True, help="终点（地图像素坐标 x,y）")
+    scenario_parser.add_argument('--out', default=SCENARIO_DIR, help="输出目录")
+    for sub in (info_parser, scenario_parser):
+        sub.add_argument('map', help="地图文件（.png、.pgm 或原始占据文件）")
+        sub.add_argument('--format', choices=['png', 'pgm', 'raw'], help="地图格式（默认按扩展名判断）")
+        sub.add_argument('--threshold', type=int, help="占据阈值")
+        sub.add_argument('--width', type=int, help="原始占据文件的宽度")
+        sub.add_argument('--height', type=int, help="原始占据文件的高度")
+        sub.add_argument('--offset', type=int, default=0, help="原始占据文件中像素数据的起始位置（字节）")
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        width, height = convert_png_to_pgm(args.src, args.dst)
+        print(f"已转换: {args.dst}（{width}x{height}）")
+        return
+
+    occupancy = load_occupancy_map(args.map, args.format, args.threshold, args.width, args.height, args.offset)
+    if args.command == 'info':
+        occupied = occupancy.count_occupied()
+        print(f"{args.map}: {occupancy.source['format']} {occupancy.width}x{occupancy.height}，"
+              f"{'内存映射' if occupancy.filename else '已载入内存'}，障碍物像素比例 {occupied / (occupancy.width * occupancy.height):.1%}")
+        return
+
+    # 场景工具依赖规划引擎，只在创建场景时导入
+    from scenario_utils import make_scenario_record, save_scenario
+    start_node = (args.start[0] + occupancy.origin[0], args.start[1] + occupancy.origin[1])
+    end_node = (args.end[0] + occupancy.origin[0], args.end[1] + occupancy.origin[1])
+    for name, point in (('起点', start_node), ('终点', end_node)):
+        if occupancy.is_occupied(*point):
+            raise SystemExit(f"{name} {point} 位于障碍物内或地图外")
+    scenario = make_scenario_record([], start_node, end_node, kind='map', occupancy=occupancy)
+    filename = os.path.join(args.out, f"map_{os.path.splitext(os.path.basename(args.map))[0]}.json")
+    save_scenario(scenario, filename)
+    print(f"场景已保存: {filename}（地图 {occupancy.width}x{occupancy.height}）")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+# 规划参数配置：每次运行使用一个 PlannerConfig 对象，传给规划器和所有几何、碰撞检测函数，
+# 因此可以在同一个进程中用不同的参数或更大的地图运行，而不需要修改 constants.py 或重新加载模块
+
+# 导入必要的库
+from constants import (
+    GAME_X, GAME_Y, GAME_WIDTH, GAME_HEIGHT, GAME_BORDER, GRID_SIZE, STEP_SIZE, REWIRE_RADIUS, GOAL_RADIUS,
+    OBSTACLE_RADIUS, GOAL_SAMPLE_RATE, MAX_OPTIMIZATION_TIME, MAX_OPTIMIZATION_ITERATIONS
+)
+
+class PlannerConfig:
+    """一次运行的规划参数，缺省值来自 constants.py"""
+
+    # 参数名称（构造函数的关键字参数，也是 to_dict 的键）
+    FIELDS = (
+        'game_x', 'game_y', 'game_width', 'game_height', 'game_border', 'grid_size', 'step_size', 'rewire_radius',
+        'goal_radius', 'obstacle_radius', 'goal_sample_rate', 'max_optimization_time', 'max_optimization_iterations'
+    )
+
+    def __init__(self, game_x=GAME_X, game_y=GAME_Y, game_width=GAME_WIDTH, game_height=GAME_HEIGHT,
+                 game_border=GAME_BORDER, grid_size=GRID_SIZE, step_size=STEP_SIZE, rewire_radius=REWIRE_RADIUS,
+                 goal_radius=GOAL_RADIUS, obstacle_radius=OBSTACLE_RADIUS, goal_sample_rate=GOAL_SAMPLE_RATE,
+                 max_optimization_time=MAX_OPTIMIZATION_TIME, max_optimization_iterations=MAX_OPTIMIZATION_ITERATIONS,
+                 occupancy=None):
+        """
+        :param game_x: 地图左上角的 x 坐标（像素）
+        :param game_y: 地图左上角的 y 坐标（像素）
+        :param game_width: 地图宽度（像素）
+        :param game_height: 地图高度（像素）
+        :param game_border: 随机采样时避开的地图边框宽度（像素）
+        :param grid_size: 网格搜索类算法的网格边长（像素）
+        :param step_size: RRT/RRT* 的扩展步长
+        :param rewire_radius: RRT* 的重连半径
+        :param goal_radius: 到达终点的判定半径
+        :param obstacle_radius: 障碍物半径（碰撞检测和网格占据判定）
+        :param goal_sample_rate: RRT/RRT* 直接以终点为采样点的概率
+        :param max_optimization_time: RRT* 优化阶段的最大计算时间（秒）
+        :param max_optimization_iterations: RRT* 优化阶段的最大迭代次数
+        :param occupancy: 栅格占据地图（occupancy_map.OccupancyGrid），None 表示只有圆形障碍物；
+                          它是场景的一部分而不是可扫描的参数，因此不包含在 to_dict 中
+        """
+        if grid_size <= 0 or step_size <= 0 or obstacle_radius <= 0:
+            raise ValueError("grid_size、step_size 和 obstacle_radius 必须为正数")
+        if game_width <= 0 or game_height <= 0:
+            raise ValueError(f"地图尺寸必须为正数: {game_width}x{game_height}")
+        self.game_x = game_x
+        self.game_y = game_y
+        self.game_width = game_width
+        self.game_height = game_height
+        self.game_border = game_border
+        self.grid_size = grid_size
+        self.step_size = step_size
+        self.rewire_radius = rewire_radius
+        self.goal_radius = goal_radius
+        self.obstacle_radius = obstacle_radius
+        self.goal_sample_rate = goal_sample_rate
+        self.max_optimization_time = max_optimization_time
+        self.max_optimization_iterations = max_optimization_iterations
+        self.occupancy = occupancy
+
+    @property
+    def grid_width(self):
+        """网格的列数"""
+        return self.game_width // self.grid_size
+
+    @property
+    def grid_height(self):
+        """网格的行数"""
+        return self.game_height // self.grid_size
+
+    def replace(self, **changes):
+        """
+        复制当前配置并修改部分参数（用于参数扫描）
+        :param changes: 要修改的参数
+        :return: 新的 PlannerConfig 对象
+        """
+        values = self.to_dict()
+        values['occupancy'] = self.occupancy
+        values.update(changes)
+        return PlannerConfig(**values)
+
+    def for_scenario(self, scenario):
+        """
+        按场景中记录的地图尺寸调整地图范围（场景没有记录尺寸时返回自身）；
+        使用栅格地图的场景，地图范围和占据地图都来自地图本身
+        :param scenario: 场景字典，可以包含 'width'、'height'、'occupancy'
+        :return: PlannerConfig 对象
+        """
+        occupancy = scenario.get('occupancy')
+        if occupancy is not None:
+            if occupancy is self.occupancy:
+                return self
+            return self.replace(game_x=occupancy.origin[0], game_y=occupancy.origin[1], game_width=occupancy.width,
+                                game_height=occupancy.height, occupancy=occupancy)
+        width = scenario.get('width') or self.game_width
+        height = scenario.get('height') or self.game_height
+        if (width, height) == (self.game_width, self.game_height):
+            return self
+        return self.replace(game_width=width, game_height=height)
+
+    def to_dict(self):
+        """
+        转换为参数字典（随结果一起记录）
+        :return: 参数字典
+        """
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __eq__(self, other):
+        return (isinstance(other, PlannerConfig) and self.to_dict() == other.to_dict() and
+                self.occupancy is other.occupancy)
+
+    def __hash__(self):
+        return hash(tuple(self.to_dict().items()))
+
+    def __repr__(self):
+        return "PlannerConfig(" + ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items()) + ")"
+
+# 缺省配置（与 constants.py 中的值相同），没有传入配置的函数和规划器使用它
+DEFAULT_CONFIG = PlannerConfig()
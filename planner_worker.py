@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+# 后台规划：规划器在单独的进程中运行并定期发布不可变快照，界面进程只绘制最新的快照，
+# 因此规划速度与绘制开销无关，测得的计算时间也只包含算法本身
+
+# 导入必要的库
+import multiprocessing
+import queue
+import time
+from constants import SNAPSHOT_INTERVAL
+from planning_engine import create_planner, new_seed, get_scenario_hash, PlannerPhase
+from planner_config import DEFAULT_CONFIG
+
+def run_planner_worker(messages, algorithm, scenario, seed, deterministic, instrument, interval, config=None):
+    """
+    后台规划进程的入口：运行规划器直到结束，每隔 interval 秒或阶段变化时发布一次快照，结束后发送完整的规划器
+    :param messages: 发送消息的队列，消息为 ('snapshot', 快照, 新解列表)、('done', 规划器, 新解列表) 或 ('error', 错误信息)
+    :param algorithm: 算法名称
+    :param scenario: 场景字典
+    :param seed: 随机种子
+    :param deterministic: 是否使用可复现模式
+    :param instrument: 是否统计搜索内部各阶段的耗时和计数
+    :param interval: 发布快照的时间间隔（秒）
+    :param config: 规划参数配置（PlannerConfig），None 表示使用缺省配置
+    """
+    try:
+        planner = create_planner(algorithm, scenario, seed, deterministic, instrument, config)
+        # 快照中只包含上次发布之后的变化（网格搜索的节点状态变化、树中新增和重连的边），界面增量绘制
+        if hasattr(planner, 'track_changes'):
+            planner.track_changes()
+        worker_start = time.perf_counter()
+        last_publish = worker_start
+        phase = planner.phase
+        new_solutions = []              # 上次发布后 ARA* 得到的新解
+        while True:
+            planner.step()
+            new_solutions.extend(getattr(planner, 'new_solutions', ()))
+            if planner.phase == PlannerPhase.DONE:
+                break
+            now = time.perf_counter()
+            if planner.phase != phase or now - last_publish >= interval:
+                snapshot = planner.snapshot()
+                snapshot['steps_per_second'] = planner.iterations / (now - worker_start)
+                messages.put(('snapshot', snapshot, new_solutions))
+                # 快照只读取变化，发布之后再取出，下一份快照只包含之后的变化
+                if hasattr(planner, 'pop_changes'):
+                    planner.pop_changes()
+                new_solutions = []
+                phase = planner.phase
+                last_publish = now
+        # 规划结束后发送整个规划器，界面进程可以直接进行后处理、记录结果和 D* Lite 增量重规划
+        messages.put(('done', planner, new_solutions))
+    except Exception as e:
+        messages.put(('error', str(e)))
+
+class BackgroundPlanner:
+    """
+    后台规划器的代理对象：规划进行中从最新快照读取进度和绘制数据，
+    规划结束后把所有属性和方法转发给后台进程发回的规划器
+    """
+
+    def __init__(self, algorithm, scenario, seed=None, deterministic=False, instrument=False,
+                 interval=SNAPSHOT_INTERVAL, config=None):
+        """
+        启动后台规划进程
+        :param algorithm: 算法名称
+        :param scenario: 场景字典
+        :param seed: 随机种子，None 表示随机生成一个
+        :param deterministic: 是否使用可复现模式
+        :param instrument: 是否统计搜索内部各阶段的耗时和计数
+        :param interval: 发布快照的时间间隔（秒）
+        :param config: 规划参数配置（PlannerConfig），None 表示使用缺省配置
+        """
+        self.algorithm = algorithm
+        self.seed = seed if seed is not None else new_seed()
+        self.scenario = scenario
+        self.deterministic = deterministic
+        self.instrument = instrument
+        self.config = config if config is not None else DEFAULT_CONFIG
+        self.end_node = tuple(scenario['end'])
+        self.scenario_hash = get_scenario_hash(scenario)
+        self.finished = None            # 后台进程发回的已完成的规划器
+        self.new_solutions = []         # 最近一次 poll 收到的 ARA* 新解
+        self._parent_map = {}           # 由快照中新增和重连的边更新的树结构（保持同一个字典，便于增量绘制）
+        self._changes = []              # 尚未取出的节点状态变化
+        # 第一份快照到达之前使用尚未开始的规划器的快照
+        initial = create_planner(algorithm, scenario, self.seed, deterministic, instrument, self.config)
+        if hasattr(initial, 'track_changes'):
+            initial.track_changes()
+        self.snapshot = initial.snapshot()
+        self.snapshot['steps_per_second'] = 0.0
+        self._parent_map.update(self.snapshot.get('tree_edges', ()))
+        self._messages = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=run_planner_worker,
+            args=(self._messages, algorithm, scenario, self.seed, deterministic, instrument, interval, self.config),
+            daemon=True
+        )
+        self._process.start()
+
+    def poll(self):
+        """
+        读取后台进程发布的所有消息，只保留最新的快照；快照中的变化（树边、节点状态变化）和 ARA* 新解全部累积
+        :return: 最新的快照
+        """
+        self.new_solutions = []
+        while self.finished is None:
+            try:
+                message = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'snapshot':
+                self.snapshot = message[1]
+                self.new_solutions.extend(message[2])
+                # 每份快照只包含上一份之后的变化，必须按顺序全部应用
+                self._parent_map.update(message[1].get('tree_edges', ()))
+                if message[1].get('changes'):
+                    self._changes.extend(message[1]['changes'])
+            elif message[0] == 'done':
+                self.finished = message[1]
+                self.new_solutions.extend(message[2])
+                self._process.join()
+            else:
+                # 后台规划出错时结束本次运行（视为未找到路径）
+                print(f"后台规划出错: {message[1]}")
+                self.finished = create_planner(self.algorithm, self.scenario, self.seed, self.deterministic,
+                                               self.instrument, self.config)
+                self.finished.finish()
+        return self.snapshot
+
+    def close(self):
+        """终止仍在运行的后台进程（重置或退出时调用）"""
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+
+    @property
+    def steps_per_second(self):
+        """后台进程每秒执行的规划步数"""
+        return self.snapshot['steps_per_second']
+
+    @property
+    def parent_map(self):
+        """树结构（重连的边覆盖旧值，新增的边按原顺序追加在末尾）"""
+        if self.finished is not None:
+            return getattr(self.finished, 'parent_map', {})
+        return self._parent_map
+
+    @property
+    def cost_map(self):
+        """节点成本（快照中只包含终点的成本，用于绘制椭圆约束区域）"""
+        if self.finished is not None:
+            return getattr(self.finished, 'cost_map', {})
+        goal_cost = self.snapshot.get('goal_cost')
+        return {self.end_node: goal_cost} if goal_cost is not None else {}
+
+    def get_open_set(self):
+        if self.finished is not None:
+            return self.finished.get_open_set()
+        return self.snapshot.get('open_set', ())
+
+    def get_closed_set(self):
+        if self.finished is not None:
+            return self.finished.get_closed_set()
+        return self.snapshot.get('closed_set', frozenset())
+
+    def pop_changes(self):
+        """
+        取出并清空上次调用之后收到的节点状态变化（结束后再加上规划器中剩余的变化）
+        :return: 节点状态变化列表，规划器不支持记录时返回 None
+        """
+        if self.finished is not None:
+            remaining = self.finished.pop_changes() if hasattr(self.finished, 'pop_changes') else None
+            if remaining is None:
+                return None
+            changes = self._changes + remaining
+        elif self.snapshot.get('changes') is None:
+            return None
+        else:
+            changes = self._changes
+        self._changes = []
+        return changes
+
+    def get_optimization_elapsed(self):
+        if self.finished is not None:
+            return self.finished.get_optimization_elapsed()
+        return self.snapshot.get('optimization_elapsed', 0.0)
+
+    def __getattr__(self, name):
+        # 只有在实例和类中都找不到属性时才会调用：结束后转发给规划器，进行中从快照读取
+        finished = self.__dict__.get('finished')
+        if finished is not None:
+            return getattr(finished, name)
+        snapshot = self.__dict__.get('snapshot')
+        if snapshot is not None and name in snapshot:
+            return snapshot[name]
+        raise AttributeError(name)
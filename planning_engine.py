@@ -0,0 +1,865 @@
+# -*- coding: utf-8 -*-
+
+# 无界面规划引擎：与 pygame 解耦，供图形界面和批量测试共同使用
+
+# 导入必要的库
+import hashlib
+import json
+import random
+import time
+from array import array
+from enum import Enum
+from itertools import islice
+from constants import (
+    RRT_MAX_ITERATIONS, OPTIMIZATION_STEPS_PER_ITERATION, ARA_TIME_BUDGET, ARA_TIME_SLICE, FAST_PATH_REDUCTION,
+    MAX_SHORTCUT_TIME, DETERMINISTIC_SHORTCUT_ITERATIONS, FRAME_PLANNING_BUDGET_MS, FRAME_PLANNING_BUDGETS_MS
+)
+from utils import (
+    get_distance, is_collision_free, get_random_point_in_game_area, get_adaptive_random_point,
+    reduce_path_points, shortcut_path, get_path_length
+)
+from astar_algorithm import (
+    game_to_grid, grid_to_game, heuristic, a_star_step, reconstruct_path, calculate_path_length,
+    build_blocked_grid, ARAStarSearch, BidirectionalAStarSearch
+)
+from planner_config import DEFAULT_CONFIG
+from rrt_star_algorithm import run_rrt_step, run_rrt_star_step
+from dstar_lite_algorithm import DStarLite
+
+# 规划器所处阶段
+class PlannerPhase(Enum):
+    SEARCHING = 0       # 正在搜索初始路径
+    OPTIMIZING = 1      # 已找到初始路径，正在优化（仅 RRT*）
+    DONE = 2            # 规划结束（成功或失败）
+
+def new_seed():
+    """
+    生成一个新的随机种子（未指定种子时使用，生成的种子会随结果一起记录）
+    :return: 随机种子
+    """
+    return random.SystemRandom().randrange(2 ** 32)
+
+def make_scenario(obstacles, start_node, end_node, occupancy=None):
+    """
+    创建场景字典
+    :param obstacles: 障碍物列表，每个障碍物是一个坐标点 (x, y)
+    :param start_node: 起点坐标 (x, y)
+    :param end_node: 终点坐标 (x, y)
+    :param occupancy: 可选的栅格占据地图（occupancy_map.OccupancyGrid）
+    :return: 场景字典
+    """
+    return {
+        'obstacles': [tuple(obstacle) for obstacle in obstacles],
+        'start': tuple(start_node),
+        'end': tuple(end_node),
+        'occupancy': occupancy
+    }
+
+def get_scenario_hash(scenario):
+    """
+    计算场景的哈希值（只与障碍物集合、起点、终点和栅格地图标识有关），用于在结果数据库中识别同一个场景
+    :param scenario: 场景字典，包含 'obstacles'、'start'、'end'，可以包含 'occupancy'
+    :return: 16 位十六进制字符串
+    """
+    payload = {
+        'obstacles': sorted([int(obstacle[0]), int(obstacle[1])] for obstacle in scenario['obstacles']),
+        'start': [int(value) for value in scenario['start']],
+        'end': [int(value) for value in scenario['end']]
+    }
+    # 栅格地图只按文件名、格式、阈值和尺寸识别，不读取像素数据
+    if scenario.get('occupancy') is not None:
+        payload['map'] = scenario['occupancy'].get_fingerprint()
+    content = json.dumps(payload, separators=(',', ':'))
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+def extract_tree_path(parent_map, start_node, end_node):
+    """
+    沿父节点从终点回溯到起点，提取树上的路径
+    :param parent_map: 存储树结构的字典
+    :param start_node: 起点坐标
+    :param end_node: 终点坐标
+    :return: 路径点列表（从起点到终点），回溯失败时返回 None
+    """
+    if end_node not in parent_map:
+        return None
+    path_points = []
+    current = end_node
+    # 路径长度不应该超过节点总数，防止出现循环
+    while current != start_node:
+        if current is None or len(path_points) > len(parent_map):
+            return None
+        path_points.append(current)
+        current = parent_map.get(current)
+    path_points.append(start_node)
+    path_points.reverse()
+    return path_points
+
+def path_to_tree(path_points):
+    """
+    把路径点列表转换为只包含该路径的树结构（用于显示优化后的路径）
+    :param path_points: 路径点列表（从起点到终点）
+    :return: (parent_map, cost_map)
+    """
+    parent_map = {path_points[0]: None}
+    cost_map = {path_points[0]: 0}
+    for i in range(1, len(path_points)):
+        parent_map[path_points[i]] = path_points[i - 1]
+        cost_map[path_points[i]] = cost_map[path_points[i - 1]] + get_distance(path_points[i - 1], path_points[i])
+    return parent_map, cost_map
+
+class BasePlanner:
+    """
+    规划器基类：step() 执行一个规划步，只统计 step 内部的计算时间（使用 time.perf_counter），
+    因此测得的时间不包含界面绘制；所有随机数都来自每次运行独立的 self.rng，相同的种子得到相同的搜索过程
+    """
+
+    algorithm = None
+
+    def __init__(self, scenario, seed=None, deterministic=False, instrument=False, config=None):
+        """
+        初始化规划器
+        :param scenario: 场景字典，包含 'obstacles'、'start'、'end'
+        :param seed: 随机种子，None 表示随机生成一个
+        :param deterministic: 可复现模式，按迭代次数而不是时间预算结束优化和随机捷径平滑，
+                              使整个运行结果只由种子决定
+        :param instrument: 是否统计搜索内部各阶段的耗时和计数（A* 和 RRT*），结果附加在 result() 的 'counters' 中
+        :param config: 规划参数配置（PlannerConfig），None 表示使用 constants.py 中的缺省值
+        """
+        self.config = config if config is not None else DEFAULT_CONFIG
+        # 使用栅格地图的场景，地图范围和占据地图来自场景；大于配置中地图范围的场景使用场景自身的尺寸
+        if (scenario.get('occupancy') is not None or
+                scenario.get('width', 0) > self.config.game_width or
+                scenario.get('height', 0) > self.config.game_height):
+            self.config = self.config.for_scenario(scenario)
+        self.seed = seed if seed is not None else new_seed()
+        self.rng = random.Random(self.seed)
+        self.deterministic = deterministic
+        self.stats = {} if instrument else None
+        self.obstacles = list(scenario['obstacles'])
+        self.start_node = tuple(scenario['start'])
+        self.end_node = tuple(scenario['end'])
+        self.scenario_hash = get_scenario_hash(scenario)
+        self.phase = PlannerPhase.SEARCHING
+        self._step_start = time.perf_counter()
+        self.success = False
+        self.iterations = 0
+        # 计算时间统计（秒）
+        self.compute_time = 0.0
+        self.initial_path_time = None
+        # 路径长度统计
+        self.initial_path_length = float('inf')
+        self.path_length = float('inf')
+        # 后处理（路径点删减 + 随机捷径平滑）结果
+        self.optimized_path = None
+        self.optimized_path_length = float('inf')
+        self.post_process_time = 0.0
+        self.post_process_stats = {}
+        # 收敛曲线：每次路径代价变化时记录一行（计算时间、规划步数、树规模、路径代价），按列存储
+        self.trace = {
+            'time': array('d'),
+            'iteration': array('l'),
+            'tree_size': array('l'),
+            'cost': array('d')
+        }
+
+    def step(self):
+        """
+        执行一个规划步并累计计算时间
+        :return: 当前阶段
+        """
+        if self.phase == PlannerPhase.DONE:
+            return self.phase
+        self._step_start = time.perf_counter()
+        self._step()
+        self.compute_time += time.perf_counter() - self._step_start
+        self.iterations += 1
+        return self.phase
+
+    def _step(self):
+        """子类实现的单个规划步"""
+        raise NotImplementedError
+
+    def get_tree_size(self):
+        """
+        获取当前搜索树的规模（网格搜索为扩展节点数，RRT/RRT* 为树的节点数）
+        :return: 节点数
+        """
+        return 0
+
+    def _record_trace(self, cost, elapsed=None):
+        """
+        在收敛曲线中追加一行
+        :param cost: 当前最优路径代价
+        :param elapsed: 计算时间（秒），None 表示使用当前累计计算时间
+        """
+        self.trace['time'].append(self.get_elapsed() if elapsed is None else elapsed)
+        self.trace['iteration'].append(self.iterations)
+        self.trace['tree_size'].append(self.get_tree_size())
+        self.trace['cost'].append(cost)
+
+    def _on_path_found(self, path_length):
+        """
+        记录找到的路径
+        :param path_length: 路径长度
+        """
+        if path_length != self.path_length:
+            self._record_trace(path_length)
+        if self.initial_path_time is None:
+            self.initial_path_time = self.get_elapsed()
+            self.initial_path_length = path_length
+        self.path_length = path_length
+        self.success = True
+
+    def get_elapsed(self):
+        """
+        获取到目前为止的累计计算时间，包括正在执行的规划步
+        :return: 计算时间（秒）
+        """
+        return self.compute_time + time.perf_counter() - self._step_start
+
+    def finish(self):
+        """
+        提前结束规划（例如超出时间预算），已找到的路径仍然有效
+        """
+        self.phase = PlannerPhase.DONE
+
+    def get_path_points(self):
+        """
+        获取当前路径（游戏坐标）
+        :return: 路径点列表，不存在路径时返回 None
+        """
+        raise NotImplementedError
+
+    def post_process(self, time_budget=MAX_SHORTCUT_TIME):
+        """
+        对找到的路径进行路径点删减和限时随机捷径平滑
+        :param time_budget: 随机捷径平滑的时间预算（秒），可复现模式下改为固定尝试次数
+        :return: 平滑后的路径点列表，不存在路径时返回 None
+        """
+        path_points = self.get_path_points() if self.success else None
+        if not path_points:
+            return None
+        process_start = time.perf_counter()
+        self.post_process_stats = {}
+        reduced = reduce_path_points(path_points, self.obstacles, fast=FAST_PATH_REDUCTION,
+                                     stats=self.post_process_stats, config=self.config)
+        if self.deterministic:
+            self.optimized_path = shortcut_path(reduced, self.obstacles, None, rng=self.rng, stats=self.post_process_stats,
+                                                max_iterations=DETERMINISTIC_SHORTCUT_ITERATIONS, config=self.config)
+        else:
+            self.optimized_path = shortcut_path(reduced, self.obstacles, time_budget, rng=self.rng,
+                                                stats=self.post_process_stats, config=self.config)
+        self.optimized_path_length = get_path_length(self.optimized_path)
+        self.post_process_time = time.perf_counter() - process_start
+        return self.optimized_path
+
+    def snapshot(self):
+        """
+        生成当前规划状态的不可变快照（只包含元组、冻结集合和数值），用于后台规划时在界面进程中绘制和显示进度；
+        生成快照不修改规划器的状态，增量数据只由 pop_changes 取出
+        :return: 快照字典
+        """
+        return {
+            'algorithm': self.algorithm,
+            'seed': self.seed,
+            'phase': self.phase,
+            'success': self.success,
+            'iterations': self.iterations,
+            'compute_time': self.compute_time,
+            'initial_path_time': self.initial_path_time,
+            'initial_path_length': self.initial_path_length,
+            'path_length': self.path_length,
+            'tree_size': self.get_tree_size(),
+            'stats': dict(self.stats) if self.stats is not None else None
+        }
+
+    def result(self):
+        """
+        汇总规划结果
+        :return: 结果字典
+        """
+        path_points = self.get_path_points() if self.success else None
+        return {
+            'algorithm': self.algorithm,
+            'scenario_hash': self.scenario_hash,
+            'seed': self.seed,
+            'deterministic': self.deterministic,
+            'counters': dict(self.stats) if self.stats is not None else {},
+            'trace': {name: list(column) for name, column in self.trace.items()},
+            'success': self.success,
+            'path': self.optimized_path if self.optimized_path else path_points,
+            'cost': self.optimized_path_length if self.optimized_path else self.path_length,
+            'path_length': self.path_length,
+            'raw_points_count': len(path_points) if path_points else 0,
+            'optimized_points_count': len(self.optimized_path) if self.optimized_path else 0,
+            'initial_path_length': self.initial_path_length,
+            'initial_path_time': self.initial_path_time,
+            'time_taken': self.compute_time,
+            'post_process_time': self.post_process_time,
+            'iterations': self.iterations,
+            'params': self.config.to_dict()
+        }
+
+class GridPlanner(BasePlanner):
+    """网格搜索规划器的公共部分"""
+
+    def __init__(self, scenario, seed=None, deterministic=False, instrument=False, config=None):
+        super().__init__(scenario, seed, deterministic, instrument, config)
+        self.grid_width = self.config.grid_width
+        self.grid_height = self.config.grid_height
+        self.start_grid = game_to_grid(self.start_node, self.config)
+        self.end_grid = game_to_grid(self.end_node, self.config)
+        self.path = []                  # 网格坐标路径
+        self.expanded_nodes = 0
+        # 节点状态变化列表（调用 track_changes 后记录），元素为 ('open', 节点) 或 ('closed', 节点)
+        self.changes = None
+
+    def get_path_points(self):
+        return [grid_to_game(node, self.config) for node in self.path] if self.path else None
+
+    def get_tree_size(self):
+        return self.expanded_nodes
+
+    def get_open_set(self):
+        """获取开放列表（用于可视化），元素为 (f, -g, 节点)"""
+        return []
+
+    def get_closed_set(self):
+        """获取关闭列表（用于可视化）"""
+        return set()
+
+    def track_changes(self):
+        """
+        开始记录节点状态变化（用于增量绘制开放列表和关闭列表）
+        :return: 是否支持记录（目前只有 A* 和双向 A*）
+        """
+        return False
+
+    def pop_changes(self):
+        """
+        取出并清空上次调用之后的节点状态变化（唯一会清空变化的调用，snapshot 只读取）
+        :return: 节点状态变化列表，未记录时返回 None
+        """
+        if self.changes is None:
+            return None
+        changes = self.changes
+        self.changes = []
+        return changes
+
+    def snapshot(self):
+        """
+        记录节点状态变化时，快照中只包含上次 pop_changes 之后的变化（'changes'），不复制完整的开放列表和关闭列表；
+        不支持记录变化的规划器才包含完整的列表
+        """
+        record = super().snapshot()
+        record['expanded_nodes'] = self.expanded_nodes
+        record['path'] = tuple(self.path)
+        if self.changes is not None:
+            record['changes'] = tuple(self.changes)
+        else:
+            record['changes'] = None
+            record['open_set'] = tuple(self.get_open_set())
+            record['closed_set'] = frozenset(self.get_closed_set())
+        return record
+
+    def result(self):
+        record = super().result()
+        record['expanded_nodes'] = self.expanded_nodes
+        return record
+
+class AStarPlanner(GridPlanner):
+    """A* 规划器，每个规划步扩展一个节点"""
+
+    algorithm = 'astar'
+
+    def __init__(self, scenario, seed=None, deterministic=False, instrument=False, config=None):
+        super().__init__(scenario, seed, deterministic, instrument, config)
+        self.open_set = []
+        self.closed_set = set()
+        self.came_from = {}
+        self.g_score = {self.start_grid: 0}
+        self.f_score = {self.start_grid: heuristic(self.start_grid, self.end_grid)}
+        self.open_set.append((self.f_score[self.start_grid], 0, self.start_grid))
+        self.blocked_grid = None
+
+    def _step(self):
+        # 第一次扩展前一次性预计算网格阻挡查找表（计入计算时间）
+        if self.blocked_grid is None:
+            self.blocked_grid = build_blocked_grid(self.obstacles, self.grid_width, self.grid_height, self.config)
+        found, _ = a_star_step(self.open_set, self.closed_set, self.came_from, self.g_score, self.f_score,
+                               self.start_grid, self.end_grid, self.obstacles, self.grid_width, self.grid_height,
+                               self.blocked_grid, self.stats, self.changes, self.config)
+        self.expanded_nodes = len(self.closed_set)
+        if found:
+            self.path = reconstruct_path(self.came_from, self.start_grid, self.end_grid)
+            self._on_path_found(calculate_path_length(self.path, self.config))
+            self.phase = PlannerPhase.DONE
+        elif not self.open_set:
+            self.phase = PlannerPhase.DONE
+
+    def get_open_set(self):
+        return self.open_set
+
+    def get_closed_set(self):
+        return self.closed_set
+
+    def track_changes(self):
+        if self.changes is None:
+            self.changes = []
+        return True
+
+class ARAStarPlanner(GridPlanner):
+    """ARA* 规划器，每个规划步使用一个时间片（总是按时间预算结束）"""
+
+    algorithm = 'arastar'
+
+    def __init__(self, scenario, time_budget=ARA_TIME_BUDGET, seed=None, deterministic=False, instrument=False,
+                 config=None):
+        super().__init__(scenario, seed, deterministic, instrument, config)
+        self.search = ARAStarSearch(self.start_grid, self.end_grid, self.obstacles,
+                                    self.grid_width, self.grid_height, time_budget=time_budget, config=self.config)
+        self.new_solutions = []         # 最近一个规划步得到的新解
+
+    @property
+    def weight(self):
+        """当前的启发式膨胀系数"""
+        return self.search.weight
+
+    def _step(self):
+        self.new_solutions = self.search.run(ARA_TIME_SLICE)
+        self.expanded_nodes = self.search.expanded_nodes
+        for solution in self.new_solutions:
+            self._record_trace(solution['path_length'], solution['time'])
+            self.path = solution['path']
+            if self.initial_path_time is None:
+                self.initial_path_time = solution['time']
+                self.initial_path_length = solution['path_length']
+            self.path_length = solution['path_length']
+            self.success = True
+        if self.search.done:
+            self.phase = PlannerPhase.DONE
+
+    def get_open_set(self):
+        return self.search.open_set
+
+    def get_closed_set(self):
+        return self.search.closed_set
+
+    def snapshot(self):
+        record = super().snapshot()
+        record['weight'] = self.search.weight
+        return record
+
+    def result(self):
+        record = super().result()
+        best = self.search.best_solution()
+        record['suboptimality_bound'] = best['bound'] if best else None
+        return record
+
+class BidirectionalAStarPlanner(GridPlanner):
+    """双向 A* 规划器，每个规划步在一侧扩展一个节点"""
+
+    algorithm = 'biastar'
+
+    def __init__(self, scenario, seed=None, deterministic=False, instrument=False, config=None):
+        super().__init__(scenario, seed, deterministic, instrument, config)
+        self.search = BidirectionalAStarSearch(self.start_grid, self.end_grid, self.obstacles,
+                                               self.grid_width, self.grid_height, self.config)
+
+    def _step(self):
+        done, found = self.search.step(self.changes)
+        self.expanded_nodes = self.search.forward['expanded_nodes'] + self.search.backward['expanded_nodes']
+        if done:
+            if found:
+                self.path = self.search.get_path()
+                self._on_path_found(calculate_path_length(self.path, self.config))
+            self.phase = PlannerPhase.DONE
+
+    def get_open_set(self):
+        return self.search.get_open_set()
+
+    def get_closed_set(self):
+        return self.search.get_closed_set()
+
+    def track_changes(self):
+        if self.changes is None:
+            self.changes = []
+        return True
+
+    def result(self):
+        record = super().result()
+        record['forward_expanded'] = self.search.forward['expanded_nodes']
+        record['backward_expanded'] = self.search.backward['expanded_nodes']
+        return record
+
+class DStarLitePlanner(GridPlanner):
+    """D* Lite 规划器，障碍物变化后再次调用 step 即可增量重规划"""
+
+    algorithm = 'dstar'
+
+    def __init__(self, scenario, seed=None, deterministic=False, instrument=False, config=None):
+        super().__init__(scenario, seed, deterministic, instrument, config)
+        self.search = DStarLite(self.start_grid, self.end_grid, self.obstacles, self.grid_width, self.grid_height,
+                                self.config)
+        self.last_expanded = 0          # 最近一次（重）规划扩展的节点数
+        self.replan_count = 0
+
+    def _step(self):
+        self.last_expanded = self.search.compute_shortest_path()
+        self.expanded_nodes = self.search.expanded_nodes
+        self.path = self.search.get_path() or []
+        if self.path:
+            self._on_path_found(calculate_path_length(self.path, self.config))
+        else:
+            if self.path_length != float('inf'):
+                self._record_trace(float('inf'))
+            self.success = False
+            self.path_length = float('inf')
+        self.phase = PlannerPhase.DONE
+
+    def add_obstacle(self, obstacle):
+        """
+        添加障碍物，下一次 step 时增量重规划
+        :param obstacle: 障碍物坐标 (x, y)
+        """
+        self.obstacles.append(obstacle)
+        self.search.add_obstacle(obstacle)
+        self.replan_count += 1
+        self.phase = PlannerPhase.SEARCHING
+
+    def remove_obstacle(self, obstacle):
+        """
+        删除障碍物，下一次 step 时增量重规划
+        :param obstacle: 障碍物坐标 (x, y)
+        """
+        if obstacle in self.obstacles:
+            self.obstacles.remove(obstacle)
+        self.search.remove_obstacle(obstacle)
+        self.replan_count += 1
+        self.phase = PlannerPhase.SEARCHING
+
+    def get_closed_set(self):
+        return self.search.get_visited_nodes()
+
+class RRTPlanner(BasePlanner):
+    """RRT 规划器，每个规划步进行一次采样扩展"""
+
+    algorithm = 'rrt'
+
+    def __init__(self, scenario, max_iterations=RRT_MAX_ITERATIONS, seed=None, deterministic=False, instrument=False,
+                 config=None):
+        super().__init__(scenario, seed, deterministic, instrument, config)
+        self.parent_map = {self.start_node: None}
+        self.cost_map = {}
+        self.max_iterations = max_iterations
+        # 树中已有的边每被修改（重连）一次加一；只新增边时不变，用于增量绘制树
+        self.tree_revision = 0
+        # 记录树的变化时（调用 track_changes 后）：上次 pop_changes 时树中的边数，以及之后重连了父节点的节点
+        self.popped_edges = 0
+        self.rewired_nodes = None
+
+    def _sample(self):
+        """有一定几率直接以终点为采样点，否则在游戏区域内随机采样"""
+        if self.rng.random() < self.config.goal_sample_rate:
+            return self.end_node
+        return get_random_point_in_game_area(self.rng, self.config)
+
+    def _extend(self, rand_point):
+        """执行一步树扩展"""
+        return run_rrt_step(self.parent_map, rand_point, self.config.step_size, self.obstacles, self.start_node,
+                            self.end_node, self.config)
+
+    def _try_connect_goal(self, new_node):
+        """
+        如果新节点到达终点区域且可以无碰撞连接，则把终点加入树中
+        :param new_node: 新扩展的节点
+        :return: 是否连接成功
+        """
+        # 新节点恰好落在终点上时终点已经在树中，不能再把它的父节点设为自身
+        if new_node == self.end_node:
+            return True
+        if (get_distance(new_node, self.end_node) < self.config.goal_radius and
+                is_collision_free(new_node, self.end_node, self.obstacles, self.config)):
+            self.parent_map[self.end_node] = new_node
+            return True
+        return False
+
+    def _step(self):
+        if self.iterations >= self.max_iterations:
+            # 达到最大迭代次数，无法找到路径
+            self.phase = PlannerPhase.DONE
+            return
+        success, new_node = self._extend(self._sample())
+        if success and self._try_connect_goal(new_node):
+            path_points = extract_tree_path(self.parent_map, self.start_node, self.end_node)
+            self._on_path_found(get_path_length(path_points) if path_points else float('inf'))
+            self.phase = PlannerPhase.DONE
+
+    def get_path_points(self):
+        return extract_tree_path(self.parent_map, self.start_node, self.end_node)
+
+    def get_tree_size(self):
+        return len(self.parent_map)
+
+    def track_changes(self):
+        """
+        开始记录树的变化（新增和重连的边），后台规划时快照中只发布这些变化
+        :return: 是否支持记录
+        """
+        if self.rewired_nodes is None:
+            self.popped_edges = 0
+            self.rewired_nodes = set()
+        return True
+
+    def get_tree_changes(self):
+        """
+        获取上次 pop_changes 之后新增或重连的边（不清空）；新增的边按插入顺序排列，便于增量绘制
+        :return: (节点, 父节点) 元组，未记录树的变化时返回整棵树
+        """
+        if self.rewired_nodes is None:
+            return tuple(self.parent_map.items())
+        new_edges = tuple(islice(self.parent_map.items(), self.popped_edges, None))
+        return new_edges + tuple((node, self.parent_map[node]) for node in self.rewired_nodes)
+
+    def pop_changes(self):
+        """
+        取出并清空上次调用之后新增或重连的边（唯一会清空变化的调用，snapshot 只读取）
+        :return: (节点, 父节点) 列表，未记录树的变化时返回 None
+        """
+        if self.rewired_nodes is None:
+            return None
+        changes = list(self.get_tree_changes())
+        self.popped_edges = len(self.parent_map)
+        self.rewired_nodes = set()
+        return changes
+
+    def snapshot(self):
+        """记录树的变化时，快照中的 'tree_edges' 只包含上次 pop_changes 之后新增或重连的边"""
+        record = super().snapshot()
+        record['tree_edges'] = self.get_tree_changes()
+        record['tree_revision'] = self.tree_revision
+        record['goal_cost'] = self.cost_map.get(self.end_node)
+        return record
+
+    def result(self):
+        record = super().result()
+        record['tree_size'] = len(self.parent_map)
+        return record
+
+class RRTStarPlanner(RRTPlanner):
+    """
+    RRT* 规划器：找到初始路径后在时间预算内继续进行椭圆约束采样优化（可复现模式下只按迭代次数结束）；
+    搜索初始路径的阶段与 RRT 一样受最大迭代次数限制
+    """
+
+    algorithm = 'rrtstar'
+
+    def __init__(self, scenario, optimization_time=None, max_optimization_iterations=None, seed=None,
+                 deterministic=False, instrument=False, config=None, max_iterations=RRT_MAX_ITERATIONS):
+        # max_iterations 只限制搜索初始路径的阶段，无解的地图上也能结束
+        super().__init__(scenario, max_iterations=max_iterations, seed=seed, deterministic=deterministic,
+                         instrument=instrument, config=config)
+        self.cost_map = {self.start_node: 0}
+        # 未指定时使用配置中的优化时间和迭代次数
+        self.optimization_time = (optimization_time if optimization_time is not None
+                                  else self.config.max_optimization_time)
+        self.max_optimization_iterations = (max_optimization_iterations if max_optimization_iterations is not None
+                                            else self.config.max_optimization_iterations)
+        self.optimization_iterations = 0
+        self.optimization_start_time = None     # 进入优化阶段时的累计计算时间
+
+    def _extend(self, rand_point):
+        rewired = []
+        result = run_rrt_star_step(self.parent_map, self.cost_map, rand_point, self.config.step_size,
+                                   self.config.rewire_radius, self.obstacles, self.start_node, self.end_node,
+                                   self.stats, rewired, self.config)
+        self.tree_revision += len(rewired)
+        if self.rewired_nodes is not None:
+            self.rewired_nodes.update(rewired)
+        return result
+
+    def _try_connect_goal(self, new_node):
+        if super()._try_connect_goal(new_node):
+            self.cost_map[self.end_node] = self.cost_map[new_node] + get_distance(new_node, self.end_node)
+            return True
+        return False
+
+    def get_optimization_elapsed(self):
+        """
+        获取优化阶段已消耗的计算时间
+        :return: 优化时间（秒）
+        """
+        if self.optimization_start_time is None:
+            return 0.0
+        return self.compute_time - self.optimization_start_time
+
+    def _step(self):
+        if self.phase == PlannerPhase.SEARCHING:
+            if self.iterations >= self.max_iterations:
+                # 达到最大迭代次数，无法找到初始路径
+                self.phase = PlannerPhase.DONE
+                return
+            success, new_node = self._extend(self._sample())
+            if success and self._try_connect_goal(new_node):
+                self._on_path_found(self.cost_map[self.end_node])
+                self.optimization_start_time = self.get_elapsed()
+                self.phase = PlannerPhase.OPTIMIZING
+            return
+
+        # 检查是否达到优化限制
+        if (self.optimization_iterations >= self.max_optimization_iterations or
+                (not self.deterministic and self.get_optimization_elapsed() >= self.optimization_time)):
+            self.phase = PlannerPhase.DONE
+            return
+
+        # 每次优化迭代在椭圆约束区域内执行多次 RRT* 扩展
+        self.optimization_iterations += 1
+        for _ in range(OPTIMIZATION_STEPS_PER_ITERATION):
+            rand_point = get_adaptive_random_point(self.start_node, self.end_node, self.cost_map[self.end_node],
+                                                   rng=self.rng, config=self.config)
+            self._extend(rand_point)
+        if self.cost_map[self.end_node] < self.path_length:
+            self._record_trace(self.cost_map[self.end_node])
+            self.path_length = self.cost_map[self.end_node]
+
+    def snapshot(self):
+        record = super().snapshot()
+        record['optimization_iterations'] = self.optimization_iterations
+        record['optimization_elapsed'] = self.get_optimization_elapsed()
+        return record
+
+    def result(self):
+        record = super().result()
+        record['optimization_iterations'] = self.optimization_iterations
+        record['optimization_time'] = self.get_optimization_elapsed()
+        if self.success and self.initial_path_length > 0:
+            record['improvement_percentage'] = ((self.initial_path_length - self.path_length) /
+                                                self.initial_path_length) * 100
+        return record
+
+# 算法名称与规划器类的对应关系
+PLANNERS = {
+    'astar': AStarPlanner,
+    'arastar': ARAStarPlanner,
+    'biastar': BidirectionalAStarPlanner,
+    'dstar': DStarLitePlanner,
+    'rrt': RRTPlanner,
+    'rrtstar': RRTStarPlanner
+}
+
+def create_planner(algorithm, scenario, seed=None, deterministic=False, instrument=False, config=None,
+                   **planner_args):
+    """
+    根据算法名称创建规划器
+    :param algorithm: 算法名称（PLANNERS 中的键）
+    :param scenario: 场景字典
+    :param seed: 随机种子，None 表示随机生成一个
+    :param deterministic: 是否使用可复现模式
+    :param instrument: 是否统计搜索内部各阶段的耗时和计数
+    :param config: 规划参数配置（PlannerConfig），None 表示使用缺省配置
+    :param planner_args: 传给该规划器构造函数的其他参数（例如 ARA* 的 time_budget）
+    :return: 规划器对象
+    """
+    if algorithm not in PLANNERS:
+        raise ValueError(f"未知算法类型: {algorithm}")
+    return PLANNERS[algorithm](scenario, seed=seed, deterministic=deterministic, instrument=instrument, config=config,
+                               **planner_args)
+
+def plan(scenario, algorithm, budget=None, post_process=True, seed=None, deterministic=False, instrument=False,
+         config=None):
+    """
+    无界面运行一次完整的规划
+    :param scenario: 场景字典，包含 'obstacles'、'start'、'end'
+    :param algorithm: 算法名称（'astar'、'arastar'、'biastar'、'dstar'、'rrt' 或 'rrtstar'）
+    :param budget: 计算时间预算（秒），None 表示使用各算法自身的终止条件；
+                   RRT* 用完预算时结束优化并返回当前最优路径，ARA* 以它作为自身的时间预算
+    :param post_process: 是否对路径进行删减和随机捷径平滑
+    :param seed: 随机种子，None 表示随机生成一个（记录在结果的 'seed' 中）
+    :param deterministic: 可复现模式，同一种子得到完全相同的路径（budget 仍按计算时间截断）
+    :param instrument: 是否统计搜索内部各阶段的耗时和计数（结果的 'counters'）
+    :param config: 规划参数配置（PlannerConfig），None 表示使用缺省配置；参数记录在结果的 'params' 中
+    :return: 结果字典，包含路径、代价和各阶段计时
+    """
+    planner_args = {}
+    if algorithm == 'arastar' and budget is not None:
+        # ARA* 自身按时间预算结束，预算必须与其他算法相同，否则会停在缺省的 ARA_TIME_BUDGET
+        planner_args['time_budget'] = budget
+    planner = create_planner(algorithm, scenario, seed, deterministic, instrument, config, **planner_args)
+    wall_start = time.perf_counter()
+    while planner.phase != PlannerPhase.DONE:
+        planner.step()
+        if budget is not None and planner.compute_time >= budget:
+            planner.finish()
+    if post_process:
+        planner.post_process()
+    record = planner.result()
+    record['wall_time'] = time.perf_counter() - wall_start
+    return record
+
+class FrameScheduler:
+    """
+    按帧分配规划时间：每帧在给定的毫秒预算内尽可能多地执行规划步，并统计每秒执行的规划步数
+    """
+    def __init__(self, budget_ms=FRAME_PLANNING_BUDGET_MS):
+        """
+        :param budget_ms: 每帧的规划时间预算（毫秒）
+        """
+        self.budget_ms = budget_ms
+        self.total_steps = 0            # 累计执行的规划步数
+        self.frame_steps = 0            # 最近一帧执行的规划步数
+        self.steps_per_second = 0.0     # 最近一个统计窗口内每秒执行的规划步数
+        self._window_start = None
+        self._window_steps = 0
+
+    @classmethod
+    def for_algorithm(cls, algorithm):
+        """
+        使用 constants 中为该算法设置的预算创建调度器
+        :param algorithm: 算法名称
+        :return: FrameScheduler 对象
+        """
+        return cls(FRAME_PLANNING_BUDGETS_MS.get(algorithm, FRAME_PLANNING_BUDGET_MS))
+
+    def reset(self):
+        """清空步数统计（开始新的一次运行时调用）"""
+        self.total_steps = 0
+        self.frame_steps = 0
+        self.steps_per_second = 0.0
+        self._window_start = None
+        self._window_steps = 0
+
+    def run(self, planner, on_step=None):
+        """
+        在一帧的时间预算内执行规划步；规划器阶段发生变化（找到初始路径、完成等）时提前返回，
+        以便界面及时处理阶段切换。每帧至少执行一步
+        :param planner: 规划器对象
+        :param on_step: 可选的回调函数，每执行一步后调用一次（例如读取 ARA* 的新解）
+        :return: 本帧执行的规划步数
+        """
+        now = time.perf_counter()
+        if self._window_start is None:
+            self._window_start = now
+        steps = 0
+        phase = planner.phase
+        if phase != PlannerPhase.DONE:
+            deadline = now + self.budget_ms / 1000.0
+            while True:
+                planner.step()
+                steps += 1
+                if on_step is not None:
+                    on_step()
+                if planner.phase != phase or time.perf_counter() >= deadline:
+                    break
+        self.frame_steps = steps
+        self.total_steps += steps
+        self._window_steps += steps
+        # 步数按真实时间（包含绘制）统计，每秒更新一次；第一个统计窗口结束前先使用当前的估计值
+        now = time.perf_counter()
+        window = now - self._window_start
+        if window >= 1.0:
+            self.steps_per_second = self._window_steps / window
+            self._window_start = now
+            self._window_steps = 0
+        elif self.total_steps == self._window_steps and window > 0:
+            self.steps_per_second = self._window_steps / window
+        return steps
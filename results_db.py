@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+
+# SQLite 结果数据库：每次运行保存为一行，场景哈希、算法、种子、参数、各阶段计时和计数都是单独的列并建有索引，
+# 汇总报表（每个场景类型下每个算法的时间和代价中位数、百分位数）直接在数据库中计算，不把所有结果载入内存
+
+# 导入必要的库
+import argparse
+import csv
+import hashlib
+import json
+import sqlite3
+import uuid
+from datetime import datetime
+from constants import RESULTS_DB_FILE, RESULTS_STORE_FILE, RESULTS_REPORT_PERCENTILE
+from results_store import ResultsStore, to_json_value
+
+# 结果表的列（除自增主键外），counters 列以 JSON 保存其余的计数和计时
+RUN_COLUMNS = [
+    'record_id', 'source', 'logged_at', 'scenario', 'scenario_hash', 'kind', 'algorithm', 'seed', 'deterministic',
+    'params_hash', 'params', 'status', 'success', 'path_length', 'cost', 'initial_path_length', 'initial_path_time',
+    'time_taken', 'post_process_time', 'wall_time', 'iterations', 'expanded_nodes', 'counters'
+]
+
+# 可以用于筛选和分组的列
+FILTER_COLUMNS = {'source', 'scenario', 'scenario_hash', 'kind', 'algorithm', 'seed', 'params_hash', 'status'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    record_id TEXT NOT NULL UNIQUE,
+    source TEXT,
+    logged_at TEXT,
+    scenario TEXT,
+    scenario_hash TEXT,
+    kind TEXT,
+    algorithm TEXT NOT NULL,
+    seed INTEGER,
+    deterministic INTEGER,
+    params_hash TEXT,
+    params TEXT,
+    status TEXT,
+    success INTEGER NOT NULL,
+    path_length REAL,
+    cost REAL,
+    initial_path_length REAL,
+    initial_path_time REAL,
+    time_taken REAL,
+    post_process_time REAL,
+    wall_time REAL,
+    iterations INTEGER,
+    expanded_nodes INTEGER,
+    counters TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_scenario_hash ON runs (scenario_hash, algorithm);
+CREATE INDEX IF NOT EXISTS idx_runs_algorithm_seed ON runs (algorithm, seed);
+CREATE INDEX IF NOT EXISTS idx_runs_params_hash ON runs (params_hash);
+CREATE INDEX IF NOT EXISTS idx_runs_kind_time ON runs (kind, algorithm, success, time_taken);
+CREATE INDEX IF NOT EXISTS idx_runs_kind_cost ON runs (kind, algorithm, success, cost);
+"""
+
+def get_params_hash(params):
+    """
+    计算参数字典的哈希值，参数完全相同的运行哈希值相同
+    :param params: 参数字典
+    :return: 16 位十六进制字符串，参数为空时返回 None
+    """
+    if not params:
+        return None
+    content = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+def make_run_row(record, source, params=None, default_kind=None):
+    """
+    把一条结果记录（批量测试的结果字典或界面记录的结果）转换为结果表的一行
+    :param record: 结果字典
+    :param source: 结果来源（'benchmark' 或 'gui'）
+    :param params: 本次运行的参数字典，记录中带有 'params' 时以记录为准
+    :param default_kind: 记录中没有场景类型时使用的类型
+    :return: 按 RUN_COLUMNS 顺序排列的值元组
+    """
+    values = {key: to_json_value(value) for key, value in record.items() if key != 'trace'}
+    params = record.get('params') or params
+    path_length = values.get('path_length')
+    success = values['success'] if values.get('success') is not None else path_length is not None
+    if 'cost' in values:
+        cost = values['cost']
+    else:
+        # 界面记录中，经过路径点优化的结果以优化后的长度作为代价
+        cost = values.get('optimized_path_length') or path_length
+    row = {
+        'record_id': values.get('record_id') or uuid.uuid4().hex,
+        'source': source,
+        'logged_at': values.get('logged_at') or datetime.now().isoformat(timespec='seconds'),
+        'scenario': values.get('scenario'),
+        'scenario_hash': values.get('scenario_hash'),
+        'kind': values.get('kind') or default_kind,
+        'algorithm': values['algorithm'],
+        'seed': values.get('seed'),
+        'deterministic': values.get('deterministic'),
+        'params_hash': get_params_hash(params),
+        'params': json.dumps(params, sort_keys=True) if params else None,
+        'status': values.get('status') or ('ok' if success else 'failed'),
+        'success': int(bool(success)),
+        'path_length': path_length,
+        'cost': cost
+    }
+    for column in ('initial_path_length', 'initial_path_time', 'time_taken', 'post_process_time', 'wall_time',
+                   'iterations', 'expanded_nodes'):
+        row[column] = values.get(column)
+    # 其余的数值（各阶段耗时、计数、ARA* 次优上界等）保存在 counters 列中
+    counters = {key: value for key, value in values.items()
+                if key not in row and key not in ('params', 'optimized_path_length') and
+                isinstance(value, (int, float))}
+    row['counters'] = json.dumps(counters, sort_keys=True) if counters else None
+    return tuple(row[column] for column in RUN_COLUMNS)
+
+def build_where(filters):
+    """
+    根据筛选条件生成 WHERE 子句
+    :param filters: 列名到值的字典，值为 None 的条件被忽略
+    :return: (WHERE 子句, 命名参数字典)
+    """
+    conditions = []
+    values = {}
+    for column, value in filters.items():
+        if value is None:
+            continue
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"不支持按 {column} 筛选")
+        conditions.append(f"{column} = :{column}")
+        values[column] = value
+    return ("WHERE " + " AND ".join(conditions)) if conditions else "", values
+
+class ResultsDatabase:
+    """SQLite 结果数据库：写入批量测试和界面的运行结果，并直接在数据库中计算汇总报表"""
+
+    def __init__(self, filename=RESULTS_DB_FILE):
+        """
+        打开（必要时创建）结果数据库
+        :param filename: 数据库文件路径
+        """
+        self.filename = filename
+        self.connection = sqlite3.connect(filename)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """关闭数据库连接"""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def insert_runs(self, records, source, params=None, default_kind=None):
+        """
+        在一个事务中写入多条结果（逐条转换，不需要先把所有记录载入内存）；
+        record_id 已存在的记录被新版本替换
+        :param records: 结果字典的可迭代对象
+        :param source: 结果来源（'benchmark' 或 'gui'）
+        :param params: 这些运行共同的参数字典
+        :param default_kind: 记录中没有场景类型时使用的类型
+        :return: 写入的行数
+        """
+        placeholders = ', '.join('?' for _ in RUN_COLUMNS)
+        with self.connection:
+            cursor = self.connection.executemany(
+                f"INSERT OR REPLACE INTO runs ({', '.join(RUN_COLUMNS)}) VALUES ({placeholders})",
+                (make_run_row(record, source, params, default_kind) for record in records)
+            )
+        return cursor.rowcount
+
+    def import_results_store(self, store):
+        """
+        导入界面记录的结果存储（JSON Lines），同一记录的多个版本以最后一个为准
+        :param store: ResultsStore 对象
+        :return: 写入的行数
+        """
+        return self.insert_runs(store.iter_records(), 'gui', default_kind='gui')
+
+    def iter_runs(self, **filters):
+        """
+        逐行读取满足条件的运行结果
+        :param filters: 筛选条件，例如 algorithm='rrtstar'、kind='maze'
+        :return: 结果字典生成器
+        """
+        where, values = build_where(filters)
+        for row in self.connection.execute(f"SELECT * FROM runs {where} ORDER BY id", values):
+            yield dict(row)
+
+    def summarize(self, group_by=('kind', 'algorithm'), percentile=RESULTS_REPORT_PERCENTILE, **filters):
+        """
+        按分组汇总运行次数、成功率、超时次数，以及成功运行的计算时间和路径代价的中位数和百分位数。
+        排序和分组都在 SQLite 中完成（数据量大时使用临时文件），Python 只读取每组一行的汇总结果；
+        百分位数使用最近秩定义（第 ceil(p/100 * n) 小的值）
+        :param group_by: 分组的列（默认按场景类型和算法）
+        :param percentile: 百分位数（1~100 的整数）
+        :param filters: 筛选条件，例如 source='benchmark'
+        :return: 汇总字典列表
+        """
+        for column in group_by:
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"不支持按 {column} 分组")
+        percentile = int(percentile)
+        if not 1 <= percentile <= 100:
+            raise ValueError(f"百分位数必须在 1~100 之间: {percentile}")
+        groups = ', '.join(group_by)
+        where, values = build_where(filters)
+        # 在同一分组的成功运行中按时间和代价分别排名，然后取中间位置和百分位位置的值
+        query = f"""
+            WITH ranked AS (
+                SELECT {groups}, status, success, time_taken, cost,
+                       ROW_NUMBER() OVER (PARTITION BY {groups}, success ORDER BY time_taken) AS time_rank,
+                       ROW_NUMBER() OVER (PARTITION BY {groups}, success ORDER BY cost) AS cost_rank,
+                       SUM(success) OVER (PARTITION BY {groups}) AS successes
+                FROM runs {where}
+            )
+            SELECT {groups},
+                   COUNT(*) AS runs,
+                   SUM(success) AS successes,
+                   SUM(status = 'timeout') AS timeouts,
+                   AVG(CASE WHEN success AND time_rank IN ((successes + 1) / 2, (successes + 2) / 2)
+                            THEN time_taken END) AS median_time,
+                   MAX(CASE WHEN success AND time_rank = (:percentile * successes + 99) / 100
+                            THEN time_taken END) AS percentile_time,
+                   AVG(CASE WHEN success AND cost_rank IN ((successes + 1) / 2, (successes + 2) / 2)
+                            THEN cost END) AS median_cost,
+                   MAX(CASE WHEN success AND cost_rank = (:percentile * successes + 99) / 100
+                            THEN cost END) AS percentile_cost
+            FROM ranked
+            GROUP BY {groups}
+            ORDER BY {groups}
+        """
+        values['percentile'] = percentile
+        summary = []
+        for row in self.connection.execute(query, values):
+            item = dict(row)
+            item['success_rate'] = item['successes'] / item['runs']
+            summary.append(item)
+        return summary
+
+    def export_csv(self, filename, **filters):
+        """
+        把满足条件的运行结果逐行导出为 CSV 文件
+        :param filename: CSV 文件路径
+        :param filters: 筛选条件
+        :return: 导出的行数
+        """
+        count = 0
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['id'] + RUN_COLUMNS)
+            for row in self.iter_runs(**filters):
+                writer.writerow([row['id']] + [row[column] for column in RUN_COLUMNS])
+                count += 1
+        return count
+
+def format_value(value, spec):
+    """
+    格式化报表中的数值，没有数据时显示 '-'
+    :param value: 数值或 None
+    :param spec: 格式说明
+    :return: 字符串
+    """
+    return '-' if value is None else format(value, spec)
+
+def print_report(summary, group_by=('kind', 'algorithm'), percentile=RESULTS_REPORT_PERCENTILE):
+    """
+    打印汇总报表
+    :param summary: ResultsDatabase.summarize 返回的汇总字典列表
+    :param group_by: 分组的列
+    :param percentile: 百分位数
+    """
+    header = ''.join(f"{column:<18}" for column in group_by)
+    print(f"{header}{'次数':>6}{'成功率':>8}{'时间中位数':>12}{f'时间P{percentile}':>10}"
+          f"{'代价中位数':>12}{f'代价P{percentile}':>10}{'超时':>6}")
+    for item in summary:
+        groups = ''.join(f"{str(item[column]):<18}" for column in group_by)
+        print(f"{groups}{item['runs']:>6}{item['success_rate']:>8.0%}"
+              f"{format_value(item['median_time'], '.4f'):>12}{format_value(item['percentile_time'], '.4f'):>10}"
+              f"{format_value(item['median_cost'], '.2f'):>12}{format_value(item['percentile_cost'], '.2f'):>10}"
+              f"{item['timeouts']:>6}")
+
+def main():
+    """
+    命令行入口，例如
+    python results_db.py import algorithm_results.jsonl
+    python results_db.py report --by kind algorithm --percentile 95
+    python results_db.py export rrtstar_runs.csv --algorithm rrtstar
+    """
+    parser = argparse.ArgumentParser(description="SQLite 结果数据库：导入结果并生成汇总报表")
+    parser.add_argument('--db', default=RESULTS_DB_FILE, help="数据库文件")
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help="导入界面记录的结果存储（JSON Lines）")
+    import_parser.add_argument('stores', nargs='*', default=[RESULTS_STORE_FILE], help="结果存储文件")
+    report_parser = commands.add_parser('report', help="按分组打印时间和代价的中位数和百分位数")
+    report_parser.add_argument('--by', nargs='+', default=['kind', 'algorithm'], choices=sorted(FILTER_COLUMNS),
+                               help="分组的列")
+    report_parser.add_argument('--percentile', type=int, default=RESULTS_REPORT_PERCENTILE, help="百分位数（1~100）")
+    export_parser = commands.add_parser('export', help="把运行结果导出为 CSV 文件")
+    export_parser.add_argument('output', help="CSV 文件路径")
+    for subparser in (report_parser, export_parser):
+        subparser.add_argument('--algorithm', help="只统计该算法")
+        subparser.add_argument('--kind', help="只统计该场景类型")
+        subparser.add_argument('--source', choices=['benchmark', 'gui'], help="只统计该来源的结果")
+    args = parser.parse_args()
+
+    with ResultsDatabase(args.db) as database:
+        if args.command == 'import':
+            for filename in args.stores:
+                count = database.import_results_store(ResultsStore(filename))
+                print(f"已导入 {count} 条记录: {filename} -> {args.db}")
+            return
+        filters = {'algorithm': args.algorithm, 'kind': args.kind, 'source': args.source}
+        if args.command == 'report':
+            print_report(database.summarize(args.by, args.percentile, **filters), args.by, args.percentile)
+        else:
+            count = database.export_csv(args.output, **filters)
+            print(f"已导出 {count} 条记录: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+# 只追加的结果存储：每条记录在记录时立即以一行 JSON 追加到文件末尾并写入磁盘，
+# 程序崩溃也不会丢失已记录的数据；修改已有记录时追加该记录的新版本，读取时同一记录以最后一行为准
+
+# 导入必要的库
+import argparse
+import json
+import math
+import os
+import uuid
+from datetime import datetime
+from constants import RESULTS_STORE_FILE, RESULTS_EXCEL_FILE, RESULTS_FSYNC, RESULTS_COMPACT_BYTES
+
+def get_companion_filename(filename, suffix, ext=None):
+    """
+    根据结果文件名生成相关文件名，例如 algorithm_results.jsonl -> algorithm_results_trace.jsonl
+    :param filename: 结果文件路径
+    :param suffix: 追加在文件名后的后缀（可以为空字符串）
+    :param ext: 新的扩展名，None 表示保持不变
+    :return: 文件路径
+    """
+    root, old_ext = os.path.splitext(filename)
+    return f"{root}{suffix}{old_ext if ext is None else ext}"
+
+def to_json_value(value):
+    """
+    把记录中的值转换为 JSON 可以表示的值（numpy 数值转换为 Python 数值，inf、nan 转换为 None）
+    :param value: 原始值
+    :return: 转换后的值
+    """
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and (math.isinf(value) or math.isnan(value)):
+        return None
+    return value
+
+class ResultsStore:
+    """
+    JSON Lines 格式的结果存储：结果记录和收敛曲线分别追加到两个文件中，
+    可选地把已有记录定期压缩为 Parquet 文件（需要 pandas 和 pyarrow）
+    """
+
+    def __init__(self, filename=RESULTS_STORE_FILE, fsync=RESULTS_FSYNC, compact_bytes=RESULTS_COMPACT_BYTES):
+        """
+        :param filename: 结果记录文件路径（.jsonl），收敛曲线保存在同名的 _trace.jsonl 文件中
+        :param fsync: 每次追加后是否调用 os.fsync（断电也不丢失数据）；否则只刷新到操作系统
+        :param compact_bytes: 结果记录文件超过该大小（字节）时压缩为 Parquet，None 表示不压缩
+        """
+        self.filename = filename
+        self.trace_filename = get_companion_filename(filename, '_trace')
+        self.parquet_filename = get_companion_filename(filename, '', '.parquet')
+        self.fsync = fsync
+        self.compact_bytes = compact_bytes
+        self._checked_files = set()     # 已检查过末尾是否完整的文件
+
+    def _append_lines(self, filename, rows):
+        """
+        把若干行追加到文件末尾并写入磁盘
+        :param filename: 文件路径
+        :param rows: 字典列表，每个字典写成一行 JSON
+        """
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = ''.join(json.dumps({key: to_json_value(value) for key, value in row.items()}, ensure_ascii=False) + '\n'
+                       for row in rows)
+        # 上次运行崩溃时最后一行可能只写了一半，先换行，避免与新记录写在同一行
+        if filename not in self._checked_files:
+            self._checked_files.add(filename)
+            if os.path.exists(filename) and os.path.getsize(filename) > 0:
+                with open(filename, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        data = '\n' + data
+        with open(filename, 'a', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def append(self, record):
+        """
+        追加一条记录；记录中没有 'record_id' 时生成一个，并补充记录时间
+        :param record: 记录字典（会被加入 'record_id' 和 'logged_at'）
+        :return: 记录 ID
+        """
+        if 'record_id' not in record:
+            record['record_id'] = uuid.uuid4().hex
+            record['logged_at'] = datetime.now().isoformat(timespec='seconds')
+        self._append_lines(self.filename, [record])
+        if self.compact_bytes and os.path.getsize(self.filename) > self.compact_bytes:
+            self.compact()
+        return record['record_id']
+
+    def update(self, record):
+        """
+        记录被修改后追加它的新版本（读取时以最后一个版本为准）
+        :param record: 已经 append 过的记录字典
+        """
+        self.append(record)
+
+    def append_trace(self, rows):
+        """
+        追加一次运行的收敛曲线
+        :param rows: 收敛曲线行字典列表
+        """
+        if rows:
+            self._append_lines(self.trace_filename, rows)
+
+    @staticmethod
+    def _read_lines(filename):
+        """
+        逐行读取 JSON Lines 文件，跳过程序崩溃时可能写了一半的最后一行
+        :param filename: 文件路径
+        :return: 字典生成器
+        """
+        if not os.path.exists(filename):
+            return
+        with open(filename, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def iter_records(self):
+        """
+        逐条读取所有记录而不全部载入内存（同一记录的每个版本都会依次出现，最后一个版本为准）
+        :return: 记录字典生成器
+        """
+        if os.path.exists(self.parquet_filename):
+            import pandas as pd
+            for record in pd.read_parquet(self.parquet_filename).to_dict('records'):
+                yield record
+        yield from self._read_lines(self.filename)
+
+    def read_records(self):
+        """
+        读取所有记录（Parquet 压缩文件中的记录加上之后追加的记录），同一记录以最后一个版本为准
+        :return: 按首次记录顺序排列的记录字典列表
+        """
+        records = {}
+        for record in self.iter_records():
+            records[record.get('record_id')] = record
+        return list(records.values())
+
+    def read_traces(self):
+        """
+        读取所有收敛曲线行
+        :return: 字典列表
+        """
+        return list(self._read_lines(self.trace_filename))
+
+    def compact(self):
+        """
+        把所有记录（每条记录只保留最后一个版本）写入 Parquet 文件并清空 JSON Lines 文件。
+        先写临时文件再替换，替换后到清空前崩溃时重复的记录在读取时按 ID 去重
+        """
+        try:
+            import pandas as pd
+            records = self.read_records()
+            temp_filename = self.parquet_filename + '.tmp'
+            pd.DataFrame(records).to_parquet(temp_filename, index=False)
+            os.replace(temp_filename, self.parquet_filename)
+            open(self.filename, 'w').close()
+            self._checked_files.discard(self.filename)
+            print(f"结果记录已压缩: {len(records)}条 -> {self.parquet_filename}")
+        except Exception as e:
+            # 没有安装 pandas/pyarrow 时继续使用 JSON Lines 文件
+            print(f"压缩结果记录失败: {e}")
+            self.compact_bytes = None
+
+    def export_excel(self, filename):
+        """
+        把所有记录导出为 Excel 文件，收敛曲线保存在 'convergence' 工作表中
+        :param filename: Excel 文件路径
+        :return: 导出的记录数
+        """
+        import pandas as pd
+        records = self.read_records()
+        if not records:
+            return 0
+        traces = self.read_traces()
+        with pd.ExcelWriter(filename) as writer:
+            pd.DataFrame(records).to_excel(writer, index=False)
+            if traces:
+                pd.DataFrame(traces).to_excel(writer, sheet_name='convergence', index=False)
+        return len(records)
+
+def main():
+    """
+    命令行入口，例如
+    python results_store.py export-excel                      # 导出到 algorithm_results.xlsx
+    python results_store.py --store other.jsonl export-excel other.xlsx
+    """
+    parser = argparse.ArgumentParser(description="结果存储（JSON Lines）的维护命令")
+    parser.add_argument('--store', default=RESULTS_STORE_FILE, help="结果存储文件")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export-excel', help="把所有记录和收敛曲线导出为 Excel 文件")
+    export_parser.add_argument('output', nargs='?', default=RESULTS_EXCEL_FILE, help="Excel 文件路径")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.store)
+    count = store.export_excel(args.output)
+    if count:
+        print(f"已导出 {count} 条记录: {args.output}")
+    else:
+        print(f"没有数据可导出: {args.store}")
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,53 @@
 # -*- coding: utf-8 -*-
 
 # 导入必要的库
-from utils import get_distance, is_collision_free, is_point_in_game_area
+import time
+from utils import get_distance, is_collision_free, is_point_in_game_area, add_phase_time
+from planner_config import DEFAULT_CONFIG
+
+# RRT 核心算法
+def run_rrt_step(parent_map, target_point, step_size, obstacles, start_node, end_node, config=DEFAULT_CONFIG):
+    """
+    执行单步 RRT 扩展算法
+    :param parent_map: 存储树结构的字典，键为节点坐标，值为其父节点坐标
+    :param target_point: 随机采样点 (x, y)
+    :param step_size: 扩展步长
+    :param obstacles: 障碍物列表
+    :param start_node: 起点坐标
+    :param end_node: 终点坐标
+    :param config: 规划参数配置（提供地图范围和障碍物半径）
+    :return: (is_success, new_node) 是否成功扩展及新节点坐标
+    """
+    # 1. 寻找最近的节点
+    nearest_node = min(parent_map.keys(), key=lambda p: get_distance(p, target_point))
+
+    # 2. 计算朝向目标点的方向向量并归一化
+    direction = (target_point[0] - nearest_node[0], target_point[1] - nearest_node[1])
+    dist = get_distance(target_point, nearest_node)
+    if dist == 0:
+        return False, None
+
+    # 3. 生成新节点
+    new_node = (int(nearest_node[0] + direction[0] / dist * step_size),
+                int(nearest_node[1] + direction[1] / dist * step_size))
+
+    # 检查新节点是否在游戏区域内以及是否已经在树中
+    if not is_point_in_game_area(new_node[0], new_node[1], config) or new_node in parent_map:
+        return False, None
+
+    # 4. 检查路径是否无碰撞
+    if not is_collision_free(nearest_node, new_node, obstacles, config):
+        return False, None
+
+    # 5. 将新节点添加到树中
+    parent_map[new_node] = nearest_node
+
+    # 扩展成功，返回新节点
+    return True, new_node
 
 # RRT* 核心算法
-def run_rrt_star_step(parent_map, cost_map, target_point, step_size, rewire_radius, obstacles, start_node, end_node):
+def run_rrt_star_step(parent_map, cost_map, target_point, step_size, rewire_radius, obstacles, start_node, end_node,
+                      stats=None, rewired=None, config=DEFAULT_CONFIG):
     """
     执行单步 RRT* 扩展算法
     :param parent_map: 存储树结构的字典，键为节点坐标，值为其父节点坐标
@@ -15,12 +58,22 @@ def run_rrt_star_step(parent_map, cost_map, target_point, step_size, rewire_radi
     :param obstacles: 障碍物列表
     :param start_node: 起点坐标
     :param end_node: 终点坐标
+    :param stats: 可选的统计字典，累加各阶段（nearest、neighbors、choose_parent、rewire、update_descendants）
+                  的耗时和调用次数以及 'collision_checks'、'rewires'；为 None 时不做任何统计
+    :param rewired: 可选的列表，追加本次重连了父节点的节点（用于判断已绘制的树边是否失效）
+    :param config: 规划参数配置（提供地图范围和障碍物半径）
     :return: (is_success, new_node) 是否成功扩展及新节点坐标
     """
     try:
+        if stats is not None:
+            phase_start = time.perf_counter()
         # 1. 寻找最近的节点
         # 在现有树中找到距离目标点最近的节点
         nearest_node = min(parent_map.keys(), key=lambda p: get_distance(p, target_point))
+        if stats is not None:
+            now = time.perf_counter()
+            add_phase_time(stats, 'nearest', now - phase_start)
+            phase_start = now
 
         # 2. 计算朝向目标点的方向向量并归一化
         # 计算从最近节点指向目标点的方向向量
@@ -38,7 +91,7 @@ def run_rrt_star_step(parent_map, cost_map, target_point, step_size, rewire_radi
 
         # 检查新节点是否在游戏区域内以及是否已经在树中
         # 如果新节点不在游戏区域内或已经在树中，则此次扩展失败
-        if not is_point_in_game_area(new_node[0], new_node[1]) or new_node in parent_map:
+        if not is_point_in_game_area(new_node[0], new_node[1], config) or new_node in parent_map:
             return False, None
 
         # 4. 在邻域内为新节点选择最佳父节点
@@ -48,6 +101,10 @@ def run_rrt_star_step(parent_map, cost_map, target_point, step_size, rewire_radi
         # 如果邻域为空，则使用最近的节点作为候选
         if not neighbors:
             neighbors.append(nearest_node)
+        if stats is not None:
+            now = time.perf_counter()
+            add_phase_time(stats, 'neighbors', now - phase_start)
+            phase_start = now
             
         # 初始化最佳父节点为最近节点，最小成本为从最近节点到达新节点的总成本
         best_parent = nearest_node
@@ -58,12 +115,23 @@ def run_rrt_star_step(parent_map, cost_map, target_point, step_size, rewire_radi
             # 计算从该邻近节点到达新节点的总成本
             cost = cost_map[neighbor] + get_distance(neighbor, new_node)
             # 如果成本更低且路径无碰撞，则更新最佳父节点
-            if cost < min_cost and is_collision_free(neighbor, new_node, obstacles):
-                min_cost = cost
-                best_parent = neighbor
+            if cost < min_cost:
+                if stats is not None:
+                    stats['collision_checks'] = stats.get('collision_checks', 0) + 1
+                if is_collision_free(neighbor, new_node, obstacles, config):
+                    min_cost = cost
+                    best_parent = neighbor
                 
         # 如果从最佳父节点到新节点的路径有障碍，则此次扩展失败
-        if not is_collision_free(best_parent, new_node, obstacles):
+        if stats is not None:
+            stats['collision_checks'] = stats.get('collision_checks', 0) + 1
+        parent_reachable = is_collision_free(best_parent, new_node, obstacles, config)
+        if stats is not None:
+            now = time.perf_counter()
+            add_phase_time(stats, 'choose_parent', now - phase_start)
+            phase_start = now
+            update_time = 0.0
+        if not parent_reachable:
             return False, None
 
         # 5. 将新节点添加到树中
@@ -82,27 +150,47 @@ def run_rrt_star_step(parent_map, cost_map, target_point, step_size, rewire_radi
             # 计算通过新节点到达邻近节点的新潜在成本
             new_potential_cost = cost_map[new_node] + get_distance(new_node, neighbor)
             # 如果新潜在成本更低且路径无碰撞，则进行重连
-            if new_potential_cost < cost_map[neighbor] and is_collision_free(new_node, neighbor, obstacles):
+            if new_potential_cost >= cost_map[neighbor]:
+                continue
+            if stats is not None:
+                stats['collision_checks'] = stats.get('collision_checks', 0) + 1
+            if is_collision_free(new_node, neighbor, obstacles, config):
                 # 更新邻近节点的父节点为新节点
                 parent_map[neighbor] = new_node
+                if rewired is not None:
+                    rewired.append(neighbor)
                 # 更新邻近节点的成本
                 cost_map[neighbor] = new_potential_cost
                 # 更新所有依赖于该节点的后续节点的成本
-                update_descendant_costs(neighbor, parent_map, cost_map, obstacles)
-        
+                if stats is None:
+                    update_descendant_costs(neighbor, parent_map, cost_map, obstacles, config=config)
+                else:
+                    stats['rewires'] = stats.get('rewires', 0) + 1
+                    update_start = time.perf_counter()
+                    update_descendant_costs(neighbor, parent_map, cost_map, obstacles, stats, config)
+                    elapsed = time.perf_counter() - update_start
+                    update_time += elapsed
+                    add_phase_time(stats, 'update_descendants', elapsed)
+
+        # 重连阶段的耗时不包括后代成本更新
+        if stats is not None:
+            add_phase_time(stats, 'rewire', time.perf_counter() - phase_start - update_time)
+
         # 扩展成功，返回新节点
         return True, new_node
     except Exception as e:
         print(f"Error in run_rrt_star_step: {e}")
         return False, None
 
-def update_descendant_costs(node, parent_map, cost_map, obstacles):
+def update_descendant_costs(node, parent_map, cost_map, obstacles, stats=None, config=DEFAULT_CONFIG):
     """
     递归更新所有依赖于指定节点的后续节点的成本
     :param node: 已更新成本的节点
     :param parent_map: 存储树结构的字典
     :param cost_map: 存储节点成本的字典
     :param obstacles: 障碍物列表
+    :param stats: 可选的统计字典，累加 'collision_checks' 和 'descendant_updates'
+    :param config: 规划参数配置（提供地图范围和障碍物半径）
     """
     try:
         # 找到所有以该节点为父节点的子节点
@@ -110,15 +198,19 @@ def update_descendant_costs(node, parent_map, cost_map, obstacles):
         
         # 遍历所有子节点
         for child in children:
+            if stats is not None:
+                stats['collision_checks'] = stats.get('collision_checks', 0) + 1
             # 检查从当前节点到子节点的路径是否无碰撞
-            if is_collision_free(node, child, obstacles):
+            if is_collision_free(node, child, obstacles, config):
                 # 计算通过当前节点到达子节点的新成本
                 new_cost = cost_map[node] + get_distance(node, child)
                 
                 # 如果新成本更低，则更新子节点的成本
                 if new_cost < cost_map.get(child, float('inf')):
                     cost_map[child] = new_cost
+                    if stats is not None:
+                        stats['descendant_updates'] = stats.get('descendant_updates', 0) + 1
                     # 递归更新该子节点的所有后续节点的成本
-                    update_descendant_costs(child, parent_map, cost_map, obstacles)
+                    update_descendant_costs(child, parent_map, cost_map, obstacles, stats, config)
     except Exception as e:
         print(f"Error in update_descendant_costs: {e}")
\ No newline at end of file
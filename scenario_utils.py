@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+
+# 场景文件读写与程序化场景生成：
+# 场景 = 障碍物坐标数组 + 起点 + 终点 + 地图尺寸 + 随机种子（+ 可选的栅格地图文件引用），保存为紧凑的 JSON 文件，
+# 生成器根据种子确定性地生成随机杂乱、迷宫、狭窄通道和陷阱地图，便于在可复现的场景集上测试性能
+
+# 导入必要的库
+import argparse
+import json
+import math
+import os
+import random
+from datetime import datetime
+from constants import (
+    GAME_WIDTH, GAME_HEIGHT, OBSTACLE_RADIUS, SCENARIO_DIR, SCENARIO_VERSION,
+    CLUTTER_DENSITY, MAZE_CELL_SIZE, NARROW_PASSAGE_WIDTH, NARROW_PASSAGE_WALLS, BUG_TRAP_SIZE
+)
+from utils import get_distance
+from planning_engine import plan
+from planner_config import DEFAULT_CONFIG
+
+# 生成随机杂乱地图时，为保证可解而重新生成的最大次数
+MAX_GENERATION_ATTEMPTS = 20
+
+def make_scenario_record(obstacles, start_node, end_node, width=GAME_WIDTH, height=GAME_HEIGHT,
+                         seed=None, kind='manual', params=None, occupancy=None):
+    """
+    创建完整的场景字典（可直接传给规划引擎）
+    :param obstacles: 障碍物列表，每个障碍物是一个坐标点 (x, y)
+    :param start_node: 起点坐标 (x, y)，未设置时为 None
+    :param end_node: 终点坐标 (x, y)，未设置时为 None
+    :param width: 地图宽度（像素），地图左上角固定在游戏区域左上角
+    :param height: 地图高度（像素）
+    :param seed: 生成场景使用的随机种子，手绘场景为 None
+    :param kind: 场景类型（'manual'、'clutter'、'maze'、'narrow_passage'、'bug_trap'、'map'）
+    :param params: 生成参数字典
+    :param occupancy: 栅格占据地图（occupancy_map.OccupancyGrid），提供时地图尺寸取地图本身的尺寸
+    :return: 场景字典
+    """
+    if occupancy is not None:
+        width, height = occupancy.width, occupancy.height
+    return {
+        'obstacles': [(int(obstacle[0]), int(obstacle[1])) for obstacle in obstacles],
+        'start': (int(start_node[0]), int(start_node[1])) if start_node else None,
+        'end': (int(end_node[0]), int(end_node[1])) if end_node else None,
+        'width': width,
+        'height': height,
+        'seed': seed,
+        'kind': kind,
+        'params': params or {},
+        'occupancy': occupancy
+    }
+
+def save_scenario(scenario, filename):
+    """
+    将场景保存为 JSON 文件
+    :param scenario: 场景字典
+    :param filename: 文件路径
+    """
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    record = {
+        'version': SCENARIO_VERSION,
+        'kind': scenario.get('kind', 'manual'),
+        'seed': scenario.get('seed'),
+        'width': scenario.get('width', GAME_WIDTH),
+        'height': scenario.get('height', GAME_HEIGHT),
+        'params': scenario.get('params', {}),
+        'start': list(scenario['start']) if scenario.get('start') else None,
+        'end': list(scenario['end']) if scenario.get('end') else None,
+        'obstacles': [list(obstacle) for obstacle in scenario['obstacles']]
+    }
+    # 栅格地图只保存文件引用和读取参数（路径相对于场景文件所在目录）
+    if scenario.get('occupancy') is not None:
+        record['map'] = scenario['occupancy'].to_record(directory)
+    with open(filename, 'w', encoding='utf-8') as f:
+        # 障碍物数组可能很长，使用紧凑格式
+        json.dump(record, f, separators=(',', ':'))
+
+def load_scenario(filename):
+    """
+    从 JSON 文件读取场景
+    :param filename: 文件路径
+    :return: 场景字典
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        record = json.load(f)
+    if record.get('version') != SCENARIO_VERSION:
+        raise ValueError(f"不支持的场景文件版本: {record.get('version')}")
+    width = record.get('width', GAME_WIDTH)
+    height = record.get('height', GAME_HEIGHT)
+    occupancy = None
+    if record.get('map'):
+        # numpy 只在读取栅格地图时才需要
+        from occupancy_map import load_map_record
+        occupancy = load_map_record(record['map'], os.path.dirname(filename))
+    # 场景可以远大于游戏区域（用于无界面规划和批量测试），只有在界面中读取时才检查尺寸
+    check_map_size(width, height)
+    return make_scenario_record(record['obstacles'], record.get('start'), record.get('end'), width, height,
+                                record.get('seed'), record.get('kind', 'manual'), record.get('params'), occupancy)
+
+def list_scenarios(directory=SCENARIO_DIR):
+    """
+    列出目录中的场景文件（按文件名排序）
+    :param directory: 场景目录
+    :return: 场景文件路径列表
+    """
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.json'))
+
+def get_latest_scenario(directory=SCENARIO_DIR):
+    """
+    获取目录中最近修改的场景文件
+    :param directory: 场景目录
+    :return: 文件路径，没有场景文件时返回 None
+    """
+    files = list_scenarios(directory)
+    return max(files, key=os.path.getmtime) if files else None
+
+def get_scenario_filename(kind, seed=None, directory=SCENARIO_DIR):
+    """
+    生成场景文件名：生成的场景按类型和种子命名，手绘场景按时间戳命名
+    :param kind: 场景类型
+    :param seed: 随机种子
+    :param directory: 场景目录
+    :return: 文件路径
+    """
+    if seed is None:
+        suffix = datetime.now().strftime("%Y%m%d_%H%M%S")
+    else:
+        suffix = f"seed{seed}"
+    return os.path.join(directory, f"{kind}_{suffix}.json")
+
+# 场景生成辅助函数
+
+def get_wall_points(p1, p2, config=DEFAULT_CONFIG):
+    """
+    沿线段等间距放置障碍物，使相邻障碍物相互重叠形成连续的墙
+    :param p1: 墙的起点 (x, y)
+    :param p2: 墙的终点 (x, y)
+    :param config: PlannerConfig 对象，障碍物间距取其中的障碍物半径
+    :return: 障碍物坐标列表
+    """
+    length = get_distance(p1, p2)
+    count = max(1, int(math.ceil(length / config.obstacle_radius)))
+    points = []
+    for i in range(count + 1):
+        t = i / count
+        points.append((int(round(p1[0] + (p2[0] - p1[0]) * t)), int(round(p1[1] + (p2[1] - p1[1]) * t))))
+    return points
+
+def get_border_walls(width, height, config=DEFAULT_CONFIG):
+    """
+    当地图小于游戏区域时，在地图边界放置一圈墙
+    :param width: 地图宽度
+    :param height: 地图高度
+    :param config: PlannerConfig 对象
+    :return: 障碍物坐标列表
+    """
+    if width >= config.game_width and height >= config.game_height:
+        return []
+    x, y = config.game_x, config.game_y
+    corners = [(x, y), (x + width, y), (x + width, y + height), (x, y + height)]
+    points = []
+    for i in range(4):
+        points.extend(get_wall_points(corners[i], corners[(i + 1) % 4], config))
+    return points
+
+def remove_duplicates(points):
+    """
+    去除重复的障碍物坐标，保持原有顺序
+    :param points: 障碍物坐标列表
+    :return: 去重后的列表
+    """
+    seen = set()
+    unique_points = []
+    for point in points:
+        if point not in seen:
+            seen.add(point)
+            unique_points.append(point)
+    return unique_points
+
+def check_map_size(width, height):
+    """
+    检查地图尺寸是否有效（地图可以大于游戏区域，界面只显示放得下的场景）
+    :param width: 地图宽度
+    :param height: 地图高度
+    """
+    if not (width > 0 and height > 0):
+        raise ValueError(f"地图尺寸 {width}x{height} 必须为正数")
+
+def is_solvable(scenario, config=DEFAULT_CONFIG):
+    """
+    使用 A* 检查场景是否存在可行路径
+    :param scenario: 场景字典
+    :param config: PlannerConfig 对象（障碍物半径必须与生成场景时相同）
+    :return: 存在路径返回 True，否则返回 False
+    """
+    return plan(scenario, 'astar', post_process=False, config=config)['success']
+
+# 场景生成器
+
+def generate_clutter(seed=None, width=GAME_WIDTH, height=GAME_HEIGHT, density=CLUTTER_DENSITY, config=DEFAULT_CONFIG):
+    """
+    生成随机杂乱地图：在地图内随机散布障碍物，起点在左侧，终点在右侧；
+    生成的地图不可解时继续使用同一个随机数生成器重新生成，因此结果仍由种子唯一确定
+    :param seed: 随机种子
+    :param width: 地图宽度
+    :param height: 地图高度
+    :param density: 障碍物覆盖面积占地图面积的比例
+    :param config: PlannerConfig 对象，障碍物半径、终点半径和游戏区域原点取自其中
+    :return: 场景字典
+    """
+    check_map_size(width, height)
+    rng = random.Random(seed)
+    obstacle_count = int(density * width * height / (math.pi * config.obstacle_radius ** 2))
+    margin = config.obstacle_radius + config.goal_radius
+    scenario = None
+    for _ in range(MAX_GENERATION_ATTEMPTS):
+        start_node = (config.game_x + rng.randint(margin, max(margin, width // 6)), config.game_y + rng.randint(margin, height - margin))
+        end_node = (config.game_x + width - rng.randint(margin, max(margin, width // 6)), config.game_y + rng.randint(margin, height - margin))
+        obstacles = []
+        while len(obstacles) < obstacle_count:
+            point = (config.game_x + rng.randint(config.obstacle_radius, width - config.obstacle_radius),
+                     config.game_y + rng.randint(config.obstacle_radius, height - config.obstacle_radius))
+            # 障碍物不能覆盖起点和终点
+            if get_distance(point, start_node) < margin or get_distance(point, end_node) < margin:
+                continue
+            obstacles.append(point)
+        obstacles = remove_duplicates(obstacles + get_border_walls(width, height, config))
+        scenario = make_scenario_record(obstacles, start_node, end_node, width, height, seed, 'clutter',
+                                        {'density': density, 'obstacle_radius': config.obstacle_radius})
+        if is_solvable(scenario, config):
+            return scenario
+    print(f"警告：随机杂乱地图（种子 {seed}）在 {MAX_GENERATION_ATTEMPTS} 次尝试后仍不可解")
+    return scenario
+
+def generate_maze(seed=None, width=GAME_WIDTH, height=GAME_HEIGHT, cell_size=MAZE_CELL_SIZE, config=DEFAULT_CONFIG):
+    """
+    生成迷宫地图（深度优先回溯法），起点在左上角单元格，终点在右下角单元格
+    :param seed: 随机种子
+    :param width: 地图宽度
+    :param height: 地图高度
+    :param cell_size: 迷宫单元格边长（像素），通道宽度为 cell_size - 2 * 障碍物半径
+    :param config: PlannerConfig 对象，障碍物半径、终点半径和游戏区域原点取自其中
+    :return: 场景字典
+    """
+    check_map_size(width, height)
+    if cell_size <= 2 * config.obstacle_radius + config.goal_radius:
+        raise ValueError(f"迷宫单元格边长 {cell_size} 太小，通道无法通行")
+    rng = random.Random(seed)
+    cols = max(1, width // cell_size)
+    rows = max(1, height // cell_size)
+    # 迷宫在地图内居中
+    origin_x = config.game_x + (width - cols * cell_size) // 2
+    origin_y = config.game_y + (height - rows * cell_size) // 2
+
+    # 记录被打通的单元格之间的墙
+    opened = set()
+    visited = {(0, 0)}
+    stack = [(0, 0)]
+    while stack:
+        cx, cy = stack[-1]
+        neighbors = [(cx + dx, cy + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                     if 0 <= cx + dx < cols and 0 <= cy + dy < rows and (cx + dx, cy + dy) not in visited]
+        if not neighbors:
+            stack.pop()
+            continue
+        nxt = rng.choice(neighbors)
+        opened.add(frozenset(((cx, cy), nxt)))
+        visited.add(nxt)
+        stack.append(nxt)
+
+    obstacles = []
+    # 外墙
+    left, top = origin_x, origin_y
+    right, bottom = origin_x + cols * cell_size, origin_y + rows * cell_size
+    obstacles.extend(get_wall_points((left, top), (right, top), config))
+    obstacles.extend(get_wall_points((right, top), (right, bottom), config))
+    obstacles.extend(get_wall_points((right, bottom), (left, bottom), config))
+    obstacles.extend(get_wall_points((left, bottom), (left, top), config))
+    # 内墙：每个单元格只负责右侧和下侧的墙
+    for cx in range(cols):
+        for cy in range(rows):
+            x0, y0 = origin_x + cx * cell_size, origin_y + cy * cell_size
+            if cx + 1 < cols and frozenset(((cx, cy), (cx + 1, cy))) not in opened:
+                obstacles.extend(get_wall_points((x0 + cell_size, y0), (x0 + cell_size, y0 + cell_size), config))
+            if cy + 1 < rows and frozenset(((cx, cy), (cx, cy + 1))) not in opened:
+                obstacles.extend(get_wall_points((x0, y0 + cell_size), (x0 + cell_size, y0 + cell_size), config))
+    obstacles = remove_duplicates(obstacles + get_border_walls(width, height, config))
+
+    start_node = (origin_x + cell_size // 2, origin_y + cell_size // 2)
+    end_node = (origin_x + (cols - 1) * cell_size + cell_size // 2, origin_y + (rows - 1) * cell_size + cell_size // 2)
+    return make_scenario_record(obstacles, start_node, end_node, width, height, seed, 'maze',
+                                {'cell_size': cell_size, 'obstacle_radius': config.obstacle_radius})
+
+def generate_narrow_passage(seed=None, width=GAME_WIDTH, height=GAME_HEIGHT, passage_width=NARROW_PASSAGE_WIDTH,
+                            wall_count=NARROW_PASSAGE_WALLS, config=DEFAULT_CONFIG):
+    """
+    生成狭窄通道地图：若干道竖直的墙横跨地图，每道墙上只有一个狭窄的缺口，起点在左侧，终点在右侧
+    :param seed: 随机种子
+    :param width: 地图宽度
+    :param height: 地图高度
+    :param passage_width: 缺口的可通行宽度（像素）
+    :param wall_count: 墙的数量
+    :param config: PlannerConfig 对象，障碍物半径、终点半径和游戏区域原点取自其中
+    :return: 场景字典
+    """
+    check_map_size(width, height)
+    rng = random.Random(seed)
+    # 缺口两侧障碍物中心之间的距离（障碍物有半径）
+    half_gap = passage_width / 2 + config.obstacle_radius
+    obstacles = []
+    for i in range(wall_count):
+        x = config.game_x + int(width * (i + 1) / (wall_count + 1))
+        gap_center = config.game_y + rng.randint(int(half_gap) + config.obstacle_radius, int(height - half_gap - config.obstacle_radius))
+        gap_top = int(math.floor(gap_center - half_gap))
+        gap_bottom = int(math.ceil(gap_center + half_gap))
+        obstacles.extend(get_wall_points((x, config.game_y), (x, gap_top), config))
+        obstacles.extend(get_wall_points((x, gap_bottom), (x, config.game_y + height), config))
+    obstacles = remove_duplicates(obstacles + get_border_walls(width, height, config))
+
+    spacing = width / (wall_count + 1)
+    start_node = (config.game_x + int(spacing / 2), config.game_y + rng.randint(config.goal_radius * 2, height - config.goal_radius * 2))
+    end_node = (config.game_x + width - int(spacing / 2), config.game_y + rng.randint(config.goal_radius * 2, height - config.goal_radius * 2))
+    return make_scenario_record(obstacles, start_node, end_node, width, height, seed, 'narrow_passage',
+                                {'passage_width': passage_width, 'wall_count': wall_count,
+                                 'obstacle_radius': config.obstacle_radius})
+
+def generate_bug_trap(seed=None, width=GAME_WIDTH, height=GAME_HEIGHT, trap_size=BUG_TRAP_SIZE, density=0.0,
+                      config=DEFAULT_CONFIG):
+    """
+    生成陷阱地图：起点位于一个开口背向终点的 U 形陷阱内部，规划器必须先远离终点才能走出陷阱；
+    可以在陷阱外额外散布随机障碍物
+    :param seed: 随机种子
+    :param width: 地图宽度
+    :param height: 地图高度
+    :param trap_size: U 形陷阱的边长（像素）
+    :param density: 陷阱外随机障碍物覆盖面积的比例
+    :param config: PlannerConfig 对象，障碍物半径、终点半径和游戏区域原点取自其中
+    :return: 场景字典
+    """
+    check_map_size(width, height)
+    if trap_size + 4 * config.obstacle_radius > min(width // 2, height):
+        raise ValueError(f"陷阱边长 {trap_size} 对于 {width}x{height} 的地图太大")
+    rng = random.Random(seed)
+    half = trap_size // 2
+    # 陷阱位于地图左半部分，开口朝左（背向终点）
+    center_x = config.game_x + rng.randint(half + 3 * config.obstacle_radius, width // 2 - half)
+    center_y = config.game_y + rng.randint(half + 2 * config.obstacle_radius, height - half - 2 * config.obstacle_radius)
+    left, right = center_x - half, center_x + half
+    top, bottom = center_y - half, center_y + half
+    obstacles = []
+    obstacles.extend(get_wall_points((left, top), (right, top), config))
+    obstacles.extend(get_wall_points((right, top), (right, bottom), config))
+    obstacles.extend(get_wall_points((right, bottom), (left, bottom), config))
+
+    start_node = (center_x, center_y)
+    end_node = (config.game_x + width - rng.randint(config.goal_radius * 2, max(config.goal_radius * 2, width // 6)),
+                config.game_y + rng.randint(config.goal_radius * 2, height - config.goal_radius * 2))
+
+    # 陷阱外的随机障碍物，避开陷阱区域、起点和终点
+    obstacle_count = int(density * width * height / (math.pi * config.obstacle_radius ** 2))
+    margin = config.obstacle_radius + config.goal_radius
+    clutter = []
+    attempts = 0
+    while len(clutter) < obstacle_count and attempts < obstacle_count * 20:
+        attempts += 1
+        point = (config.game_x + rng.randint(config.obstacle_radius, width - config.obstacle_radius),
+                 config.game_y + rng.randint(config.obstacle_radius, height - config.obstacle_radius))
+        if left - margin <= point[0] <= right + margin and top - margin <= point[1] <= bottom + margin:
+            continue
+        if get_distance(point, end_node) < margin:
+            continue
+        clutter.append(point)
+    obstacles = remove_duplicates(obstacles + clutter + get_border_walls(width, height, config))
+    return make_scenario_record(obstacles, start_node, end_node, width, height, seed, 'bug_trap',
+                                {'trap_size': trap_size, 'density': density,
+                                 'obstacle_radius': config.obstacle_radius})
+
+# 场景类型与生成器的对应关系
+SCENARIO_GENERATORS = {
+    'clutter': generate_clutter,
+    'maze': generate_maze,
+    'narrow_passage': generate_narrow_passage,
+    'bug_trap': generate_bug_trap
+}
+
+def generate_scenario(kind, seed=None, width=GAME_WIDTH, height=GAME_HEIGHT, config=DEFAULT_CONFIG, **params):
+    """
+    根据场景类型生成场景
+    :param kind: 场景类型（SCENARIO_GENERATORS 中的键）
+    :param seed: 随机种子
+    :param width: 地图宽度
+    :param height: 地图高度
+    :param config: PlannerConfig 对象（墙上障碍物的间距由其中的障碍物半径决定）
+    :param params: 传给对应生成器的其他参数（例如 density、cell_size）
+    :return: 场景字典
+    """
+    if kind not in SCENARIO_GENERATORS:
+        raise ValueError(f"未知场景类型: {kind}")
+    return SCENARIO_GENERATORS[kind](seed=seed, width=width, height=height, config=config, **params)
+
+def fit_scenario_to_config(scenario, config):
+    """
+    生成的场景中墙上障碍物的间距取决于生成时的障碍物半径；规划使用的障碍物半径不同时（例如参数扫描中的
+    obstacle_radius），用同一个种子和生成参数按新的半径重新生成场景，否则墙会出现缝隙或通道被堵死
+    :param scenario: 场景字典
+    :param config: 规划使用的 PlannerConfig 对象
+    :return: 与配置一致的场景字典（无需重新生成时返回原场景）
+    """
+    kind = scenario.get('kind')
+    params = dict(scenario.get('params') or {})
+    # 旧的场景文件没有记录障碍物半径，按缺省半径生成
+    radius = params.pop('obstacle_radius', OBSTACLE_RADIUS)
+    if kind not in SCENARIO_GENERATORS or radius == config.obstacle_radius:
+        return scenario
+    return generate_scenario(kind, scenario.get('seed'), scenario['width'], scenario['height'], config, **params)
+
+def main():
+    """
+    命令行入口：批量生成场景文件，例如
+    python scenario_utils.py maze --count 10 --cell-size 40
+    """
+    parser = argparse.ArgumentParser(description="生成可复现的路径规划场景")
+    parser.add_argument('kind', choices=sorted(SCENARIO_GENERATORS), help="场景类型")
+    parser.add_argument('--count', type=int, default=1, help="生成的场景数量（种子依次递增）")
+    parser.add_argument('--seed', type=int, default=0, help="第一个场景的随机种子")
+    parser.add_argument('--width', type=int, default=GAME_WIDTH, help="地图宽度（像素）")
+    parser.add_argument('--height', type=int, default=GAME_HEIGHT, help="地图高度（像素）")
+    parser.add_argument('--density', type=float, help="障碍物密度（clutter、bug_trap）")
+    parser.add_argument('--cell-size', type=int, help="迷宫单元格边长（maze）")
+    parser.add_argument('--passage-width', type=int, help="缺口宽度（narrow_passage）")
+    parser.add_argument('--wall-count', type=int, help="墙的数量（narrow_passage）")
+    parser.add_argument('--trap-size', type=int, help="陷阱边长（bug_trap）")
+    parser.add_argument('--obstacle-radius', type=int, default=OBSTACLE_RADIUS,
+                        help="障碍物半径（像素），决定墙上障碍物的间距")
+    parser.add_argument('--out', default=SCENARIO_DIR, help="输出目录")
+    args = parser.parse_args()
+
+    params = {name: getattr(args, name) for name in ('density', 'cell_size', 'passage_width', 'wall_count', 'trap_size')
+              if getattr(args, name) is not None}
+    config = DEFAULT_CONFIG.replace(obstacle_radius=args.obstacle_radius)
+    for seed in range(args.seed, args.seed + args.count):
+        scenario = generate_scenario(args.kind, seed, args.width, args.height, config, **params)
+        filename = get_scenario_filename(args.kind, seed, args.out)
+        save_scenario(scenario, filename)
+        print(f"场景已保存: {filename}（障碍物数量: {len(scenario['obstacles'])}）")
+
+if __name__ == '__main__':
+    main()
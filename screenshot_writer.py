@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# 异步截图：主循环只复制屏幕表面，PNG 编码和写文件在后台线程中完成，截图不会阻塞界面
+
+# 导入必要的库
+import os
+import queue
+import threading
+from datetime import datetime
+import pygame
+from constants import SCREENSHOT_QUEUE_SIZE, STREAM_DIR, STREAM_EVERY_N_FRAMES
+
+class ScreenshotWriter:
+    """后台截图写入器：使用有界队列把表面副本交给后台线程保存为 PNG"""
+
+    def __init__(self, max_queue=SCREENSHOT_QUEUE_SIZE):
+        """
+        启动后台写入线程
+        :param max_queue: 队列中最多等待写入的截图数量
+        """
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0                # 队列已满而丢弃的截图数量
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def save(self, surface, filename, block=True, verbose=True):
+        """
+        复制表面并加入写入队列
+        :param surface: 要保存的 pygame 表面
+        :param filename: 文件路径
+        :param block: 队列已满时是否等待；为 False 时直接丢弃这张截图
+        :param verbose: 保存后是否打印文件名
+        :return: 是否成功加入队列
+        """
+        try:
+            self.queue.put((surface.copy(), filename, verbose), block=block)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        """后台线程：依次把队列中的表面编码并写入文件"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                break
+            surface, filename, verbose = item
+            try:
+                pygame.image.save(surface, filename)
+                if verbose:
+                    print(f"截图已保存: {filename}")
+            except Exception as e:
+                print(f"保存截图失败: {e}")
+            finally:
+                self.queue.task_done()
+
+    def close(self):
+        """等待队列中的截图全部写完后结束后台线程（退出程序前调用）"""
+        self.queue.put(None)
+        self.thread.join()
+
+class FrameStreamer:
+    """把每隔 N 帧的画面导出为图片序列（用于录制规划过程），队列已满时跳过该帧而不暂停主循环"""
+
+    def __init__(self, writer, every_n_frames=STREAM_EVERY_N_FRAMES, directory=STREAM_DIR):
+        """
+        :param writer: ScreenshotWriter 对象
+        :param every_n_frames: 每隔多少帧导出一帧
+        :param directory: 图片序列的保存目录（每次开始录制时在其中新建一个子目录）
+        """
+        self.writer = writer
+        self.every_n_frames = max(1, every_n_frames)
+        self.directory = directory
+        self.active = False
+        self.session_dir = None
+        self.frame_count = 0            # 录制开始后经过的帧数
+        self.exported = 0               # 已导出的帧数
+        self.dropped_at_start = 0
+
+    def start(self):
+        """开始录制：新建本次录制的子目录"""
+        self.session_dir = os.path.join(self.directory, datetime.now().strftime("%Y%m%d_%H%M%S"))
+        os.makedirs(self.session_dir, exist_ok=True)
+        self.frame_count = 0
+        self.exported = 0
+        self.dropped_at_start = self.writer.dropped
+        self.active = True
+        print(f"开始导出画面序列（每 {self.every_n_frames} 帧一张）: {self.session_dir}")
+
+    def stop(self):
+        """停止录制"""
+        if not self.active:
+            return
+        self.active = False
+        print(f"画面序列导出结束: {self.exported} 张，丢弃 {self.writer.dropped - self.dropped_at_start} 张")
+
+    def toggle(self):
+        """切换录制状态"""
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+
+    def capture(self, surface):
+        """
+        每帧调用一次，录制中每隔 N 帧把画面加入写入队列
+        :param surface: 屏幕表面
+        """
+        if not self.active:
+            return
+        self.frame_count += 1
+        if (self.frame_count - 1) % self.every_n_frames:
+            return
+        filename = os.path.join(self.session_dir, f"frame_{self.exported:06d}.png")
+        if self.writer.save(surface, filename, block=False, verbose=False):
+            self.exported += 1
@@ -3,29 +3,34 @@
 # 导入必要的库
 import math
 import random
-from constants import GAME_X, GAME_Y, GAME_WIDTH, GAME_HEIGHT, GAME_BORDER, OBSTACLE_RADIUS
+import time
+from constants import MAX_SHORTCUT_TIME, SHORTCUT_STALL_ATTEMPTS
+from planner_config import DEFAULT_CONFIG
 
 # 辅助函数
 
-def is_point_in_game_area(x, y):
+def is_point_in_game_area(x, y, config=DEFAULT_CONFIG):
     """
     检查点是否在有效的游戏区域内
     :param x: 点的 x 坐标
     :param y: 点的 y 坐标
+    :param config: 规划参数配置（提供地图范围）
     :return: 如果点在游戏区域内返回 True，否则返回 False
     """
     # 检查 x 和 y 坐标是否在游戏区域内（不包括边框）
-    return (GAME_X < x < GAME_X + GAME_WIDTH and
-            GAME_Y < y < GAME_Y + GAME_HEIGHT)
+    return (config.game_x < x < config.game_x + config.game_width and
+            config.game_y < y < config.game_y + config.game_height)
 
-def get_random_point_in_game_area():
+def get_random_point_in_game_area(rng=random, config=DEFAULT_CONFIG):
     """
     在游戏区域内生成一个随机点
+    :param rng: 随机数生成器（random.Random 实例，缺省使用全局 random 模块）
+    :param config: 规划参数配置（提供地图范围）
     :return: 随机点坐标 (x, y)
     """
     # 在游戏区域内部（避开边框）生成随机坐标
-    x_random = random.randint(GAME_X + GAME_BORDER, GAME_X + GAME_WIDTH - GAME_BORDER - 1)
-    y_random = random.randint(GAME_Y + GAME_BORDER, GAME_Y + GAME_HEIGHT - GAME_BORDER - 1)
+    x_random = rng.randint(config.game_x + config.game_border, config.game_x + config.game_width - config.game_border - 1)
+    y_random = rng.randint(config.game_y + config.game_border, config.game_y + config.game_height - config.game_border - 1)
     return (x_random, y_random)
 
 def get_distance(p1, p2):
@@ -75,40 +80,116 @@ def get_line_points(p1, p2):
             y1 += sy
     return points
 
+# 性能统计辅助函数
+def add_phase_time(stats, phase, elapsed):
+    """
+    在统计字典中累加某个阶段的耗时和调用次数（键为 '<阶段>_time' 和 '<阶段>_calls'）
+    :param stats: 统计字典
+    :param phase: 阶段名称
+    :param elapsed: 本次耗时（秒）
+    """
+    stats[phase + '_time'] = stats.get(phase + '_time', 0.0) + elapsed
+    stats[phase + '_calls'] = stats.get(phase + '_calls', 0) + 1
+
 # 碰撞检测函数
-def is_collision_free(p1, p2, obstacles):
+def is_collision_free(p1, p2, obstacles, config=DEFAULT_CONFIG):
     """
     检查两点之间的路径是否无碰撞（即路径上没有障碍物）
     :param p1: 起点 (x, y)
     :param p2: 终点 (x, y)
     :param obstacles: 障碍物列表，每个障碍物是一个坐标点 (x, y)
+    :param config: 规划参数配置（提供地图范围、障碍物半径和可选的栅格占据地图）
     :return: 如果路径无碰撞返回 True，否则返回 False
     """
     try:
+        max_x = config.game_x + config.game_width
+        max_y = config.game_y + config.game_height
+        radius = config.obstacle_radius
         # 获取两点之间连线上的所有整数坐标点
         path_points = get_line_points(p1, p2)
         # 遍历路径上的每个点
         for p in path_points:
             # 确保检测点在屏幕内
-            if not (0 <= p[0] < GAME_X + GAME_WIDTH and 0 <= p[1] < GAME_Y + GAME_HEIGHT):
+            if not (0 <= p[0] < max_x and 0 <= p[1] < max_y):
                 return False
             # 检查该点是否与任何障碍物重合或足够接近
             for obstacle in obstacles:
-                if get_distance(p, obstacle) < OBSTACLE_RADIUS:
+                if get_distance(p, obstacle) < radius:
                     return False
+        # 栅格地图只读取路径经过的像素
+        if config.occupancy is not None:
+            return config.occupancy.are_points_free(path_points)
         # 如果路径上所有点都不是障碍物，则无碰撞
         return True
     except Exception as e:
         print(f"Error in is_collision_free: {e}")
         return False
 
+# 快速碰撞检测：按障碍物半径把障碍物划分到网格桶中
+def build_obstacle_index(obstacles, config=DEFAULT_CONFIG):
+    """
+    构建障碍物空间索引，桶的边长等于障碍物半径
+    :param obstacles: 障碍物列表，每个障碍物是一个坐标点 (x, y)
+    :param config: 规划参数配置（提供障碍物半径）
+    :return: 字典，键为桶坐标 (bx, by)，值为该桶内的障碍物列表
+    """
+    radius = config.obstacle_radius
+    obstacle_index = {}
+    for obstacle in obstacles:
+        key = (obstacle[0] // radius, obstacle[1] // radius)
+        obstacle_index.setdefault(key, []).append(obstacle)
+    return obstacle_index
+
+def is_collision_free_fast(p1, p2, obstacle_index, config=DEFAULT_CONFIG):
+    """
+    与 is_collision_free 判定结果相同，但每个点只检查周围 3x3 个桶内的障碍物
+    :param p1: 起点 (x, y)
+    :param p2: 终点 (x, y)
+    :param obstacle_index: build_obstacle_index 返回的障碍物空间索引（使用同一个配置构建）
+    :param config: 规划参数配置（提供地图范围、障碍物半径和可选的栅格占据地图）
+    :return: 如果路径无碰撞返回 True，否则返回 False
+    """
+    try:
+        max_x = config.game_x + config.game_width
+        max_y = config.game_y + config.game_height
+        radius = config.obstacle_radius
+        path_points = get_line_points(p1, p2)
+        for p in path_points:
+            # 确保检测点在屏幕内
+            if not (0 <= p[0] < max_x and 0 <= p[1] < max_y):
+                return False
+            bx = p[0] // radius
+            by = p[1] // radius
+            for key in ((bx - 1, by - 1), (bx, by - 1), (bx + 1, by - 1),
+                        (bx - 1, by), (bx, by), (bx + 1, by),
+                        (bx - 1, by + 1), (bx, by + 1), (bx + 1, by + 1)):
+                for obstacle in obstacle_index.get(key, ()):
+                    if get_distance(p, obstacle) < radius:
+                        return False
+        if config.occupancy is not None:
+            return config.occupancy.are_points_free(path_points)
+        return True
+    except Exception as e:
+        print(f"Error in is_collision_free_fast: {e}")
+        return False
+
+def get_path_length(path_points):
+    """
+    计算路径点列表的总长度
+    :param path_points: 路径点列表
+    :return: 路径总长度
+    """
+    return sum(get_distance(path_points[i], path_points[i + 1]) for i in range(len(path_points) - 1))
+
 # 椭圆约束采样相关函数
-def get_random_point_in_ellipse(focus1, focus2, major_axis_length):
+def get_random_point_in_ellipse(focus1, focus2, major_axis_length, rng=random, config=DEFAULT_CONFIG):
     """
     在以focus1和focus2为焦点，major_axis_length为长轴长度的椭圆内生成随机点
     :param focus1: 第一个焦点坐标 (x, y)
     :param focus2: 第二个焦点坐标 (x, y)
     :param major_axis_length: 椭圆长轴长度
+    :param rng: 随机数生成器
+    :param config: 规划参数配置（提供地图范围）
     :return: 椭圆内的随机点坐标 (x, y)
     """
     try:
@@ -131,7 +212,7 @@ def get_random_point_in_ellipse(focus1, focus2, major_axis_length):
         
         # 处理退化椭圆（线段）
         if b == 0:
-            t = random.uniform(0, 1)
+            t = rng.uniform(0, 1)
             x = focus1[0] + t * (focus2[0] - focus1[0])
             y = focus1[1] + t * (focus2[1] - focus1[1])
             return (int(x), int(y))
@@ -145,8 +226,8 @@ def get_random_point_in_ellipse(focus1, focus2, major_axis_length):
         angle = math.atan2(dy, dx)
         
         # 在单位圆内随机采样
-        theta = random.uniform(0, 2 * math.pi)
-        r = math.sqrt(random.uniform(0, 1))
+        theta = rng.uniform(0, 2 * math.pi)
+        r = math.sqrt(rng.uniform(0, 1))
         
         # 转换为椭圆内的点
         x_ellipse = a * r * math.cos(theta)
@@ -161,43 +242,57 @@ def get_random_point_in_ellipse(focus1, focus2, major_axis_length):
         y = center[1] + y_rotated
         
         # 确保点在游戏区域内
-        x = max(GAME_X + GAME_BORDER, min(x, GAME_X + GAME_WIDTH - GAME_BORDER - 1))
-        y = max(GAME_Y + GAME_BORDER, min(y, GAME_Y + GAME_HEIGHT - GAME_BORDER - 1))
+        x = max(config.game_x + config.game_border, min(x, config.game_x + config.game_width - config.game_border - 1))
+        y = max(config.game_y + config.game_border, min(y, config.game_y + config.game_height - config.game_border - 1))
         
         return (int(x), int(y))
     except Exception as e:
         print(f"Error in get_random_point_in_ellipse: {e}")
-        return get_random_point_in_game_area()
+        return get_random_point_in_game_area(rng, config)
 
-def get_adaptive_random_point(start_node, end_node, path_length, use_ellipse=True):
+def get_adaptive_random_point(start_node, end_node, path_length, use_ellipse=True, rng=random, config=DEFAULT_CONFIG):
     """
     根据是否启用椭圆约束，返回适当的随机采样点
     :param start_node: 起点坐标 (x, y)
     :param end_node: 终点坐标 (x, y)
     :param path_length: 当前路径长度
     :param use_ellipse: 是否使用椭圆约束采样
+    :param rng: 随机数生成器
+    :param config: 规划参数配置（提供地图范围）
     :return: 随机采样点坐标 (x, y)
     """
     try:
-        if use_ellipse and random.random() < 0.9:  # 使用默认的ELLIPSE_PROBABILITY值
+        if use_ellipse and rng.random() < 0.9:  # 使用默认的ELLIPSE_PROBABILITY值
             # 在椭圆内采样
-            return get_random_point_in_ellipse(start_node, end_node, path_length)
+            return get_random_point_in_ellipse(start_node, end_node, path_length, rng, config)
         else:
             # 全局随机采样
-            return get_random_point_in_game_area()
+            return get_random_point_in_game_area(rng, config)
     except Exception as e:
         print(f"Error in get_adaptive_random_point: {e}")
-        return get_random_point_in_game_area()
+        return get_random_point_in_game_area(rng, config)
 
-def reduce_path_points(path_points, obstacles):
+def reduce_path_points(path_points, obstacles, fast=False, stats=None, config=DEFAULT_CONFIG):
     """
     删减路径点，保持路径无碰撞的情况下缩短路径
     :param path_points: 原始路径点列表（从起点到终点）
     :param obstacles: 障碍物列表
+    :param fast: 是否使用倍增加二分查找最远可见点（碰撞检测次数约为 O(n log n)）
+    :param stats: 可选的统计字典，'collision_checks' 键累加碰撞检测次数
+    :param config: 规划参数配置
     :return: 删减后的路径点列表
     """
     if len(path_points) <= 2:
         return path_points  # 如果路径已经很短，无需删减
+
+    def check(p1, p2):
+        # 统计碰撞检测次数
+        if stats is not None:
+            stats['collision_checks'] = stats.get('collision_checks', 0) + 1
+        return is_collision_free(p1, p2, obstacles, config)
+
+    if fast:
+        return _reduce_path_points_fast(path_points, check)
     
     reduced_points = [path_points[0]]  # 保留起点
     i = 0  # 当前点索引
@@ -207,7 +302,7 @@ def reduce_path_points(path_points, obstacles):
         
         while j > i + 1:
             # 检查当前点到j点是否无碰撞
-            if is_collision_free(path_points[i], path_points[j], obstacles):
+            if check(path_points[i], path_points[j]):
                 # 如果可以直接连接，则跳过中间点
                 reduced_points.append(path_points[j])
                 i = j  # 移动到j点继续处理
@@ -219,4 +314,140 @@ def reduce_path_points(path_points, obstacles):
             reduced_points.append(path_points[i + 1])
             i += 1
     
-    return reduced_points
\ No newline at end of file
+    return reduced_points
+
+def _reduce_path_points_fast(path_points, check):
+    """
+    从每个锚点出发，先按 1、2、4... 的步长倍增寻找第一个不可见点，
+    再在最后一个可见点与该点之间二分查找最远可见点
+    :param path_points: 原始路径点列表（从起点到终点）
+    :param check: 碰撞检测函数 check(p1, p2)
+    :return: 删减后的路径点列表
+    """
+    last = len(path_points) - 1
+    reduced_points = [path_points[0]]
+    i = 0
+
+    while i < last:
+        # 相邻点之间本来就是树上的无碰撞边，无需检测
+        visible = i + 1
+        step = 2
+        blocked = None
+        # 倍增阶段：短边检测代价低，先确定最远可见点所在的区间
+        while visible < last:
+            j = min(i + step, last)
+            if check(path_points[i], path_points[j]):
+                visible = j
+                step *= 2
+            else:
+                blocked = j
+                break
+        # 二分阶段：在 (visible, blocked) 区间内查找最远可见点
+        if blocked is not None:
+            low, high = visible, blocked
+            while high - low > 1:
+                mid = (low + high) // 2
+                if check(path_points[i], path_points[mid]):
+                    low = mid
+                else:
+                    high = mid
+            visible = low
+        reduced_points.append(path_points[visible])
+        i = visible
+
+    return reduced_points
+
+def shortcut_path(path_points, obstacles, time_budget=MAX_SHORTCUT_TIME, rng=random, stats=None, max_iterations=None,
+                  config=DEFAULT_CONFIG, max_stall=SHORTCUT_STALL_ATTEMPTS):
+    """
+    随机捷径平滑：在路径上任取两个位置（可以位于线段中间而不只是顶点），
+    如果两点之间无碰撞且连接后路径变短，就用直线替换中间的部分，直到时间预算或迭代次数用完，
+    或者连续 max_stall 次尝试都没能缩短路径（路径已收敛）；时间预算始终是硬上限
+    :param path_points: 路径点列表（从起点到终点，整数坐标）
+    :param obstacles: 障碍物列表
+    :param time_budget: 时间预算（秒），None 表示不限时间（此时必须指定 max_iterations）
+    :param rng: 随机数生成器（需提供 uniform 方法）
+    :param stats: 可选的统计字典，累加 'collision_checks' 和 'shortcuts'
+    :param max_iterations: 最大尝试次数，None 表示不限；只按次数终止时结果由随机数生成器唯一确定
+    :param config: 规划参数配置
+    :param max_stall: 连续失败（不能缩短或有碰撞）多少次后提前结束，None 表示只按时间预算和迭代次数结束
+    :return: 平滑后的路径点列表
+    """
+    if len(path_points) <= 2:
+        return list(path_points)
+    if time_budget is None and max_iterations is None:
+        raise ValueError("time_budget 和 max_iterations 不能同时为 None")
+
+    obstacle_index = build_obstacle_index(obstacles, config)
+    path = list(path_points)
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    iterations = 0
+    stalled = 0                 # 连续失败的尝试次数
+
+    def check(p1, p2):
+        # 统计碰撞检测次数
+        if stats is not None:
+            stats['collision_checks'] = stats.get('collision_checks', 0) + 1
+        return is_collision_free_fast(p1, p2, obstacle_index, config)
+
+    def point_at(cumulative, distance):
+        # 返回路径上指定弧长处的整数坐标点及其所在线段的下标
+        for i in range(len(cumulative) - 1):
+            if distance <= cumulative[i + 1] or i == len(cumulative) - 2:
+                segment = cumulative[i + 1] - cumulative[i]
+                t = (distance - cumulative[i]) / segment if segment > 0 else 0
+                x = path[i][0] + t * (path[i + 1][0] - path[i][0])
+                y = path[i][1] + t * (path[i + 1][1] - path[i][1])
+                return (int(round(x)), int(round(y))), i
+
+    while len(path) > 2:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        if max_iterations is not None and iterations >= max_iterations:
+            break
+        if max_stall is not None and stalled >= max_stall:
+            break
+        iterations += 1
+        # 先按失败计数，成功缩短路径后清零
+        stalled += 1
+        # 计算每个路径点处的累计弧长
+        cumulative = [0.0]
+        for i in range(len(path) - 1):
+            cumulative.append(cumulative[-1] + get_distance(path[i], path[i + 1]))
+        total_length = cumulative[-1]
+        if total_length <= 0:
+            break
+
+        d1 = rng.uniform(0, total_length)
+        d2 = rng.uniform(0, total_length)
+        if d1 > d2:
+            d1, d2 = d2, d1
+        a, i = point_at(cumulative, d1)
+        b, j = point_at(cumulative, d2)
+        # 两点在同一条线段上时无法缩短路径
+        if i == j:
+            continue
+
+        # 取整后的点可能略微偏离原线段，因此连接它们的三段都需要检测
+        new_section = [path[i], a, b, path[j + 1]]
+        old_length = cumulative[j + 1] - cumulative[i]
+        new_length = get_path_length(new_section)
+        if new_length >= old_length - 1e-6:
+            continue
+        if not (check(a, b) and check(path[i], a) and check(b, path[j + 1])):
+            continue
+
+        # 替换路径中间部分，并去掉重复的相邻点
+        new_path = path[:i + 1]
+        for p in (a, b):
+            if p != new_path[-1]:
+                new_path.append(p)
+        for p in path[j + 1:]:
+            if p != new_path[-1]:
+                new_path.append(p)
+        path = new_path
+        stalled = 0
+        if stats is not None:
+            stats['shortcuts'] = stats.get('shortcuts', 0) + 1
+
+    return path
\ No newline at end of file